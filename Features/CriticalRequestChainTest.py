@@ -0,0 +1,141 @@
+from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup
+
+# the classification Lighthouse uses: only these priorities hold up the first render
+CRITICAL_PRIORITIES = ("VeryHigh", "High", "Medium")
+NON_CRITICAL_TYPES = ("Image", "XHR", "Fetch", "EventSource", "Ping", "Media")
+# late-discovered requests of these types are worth a <link rel=preload>
+PRELOADABLE_TYPES = {"Stylesheet": "style", "Script": "script", "Font": "font"}
+MAX_REPORTED_CHAINS = 5
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+def _is_critical(request: dict, main_frame: str | None) -> bool:
+    if request.get("failed") or request.get("end") is None or request.get("from_cache"):
+        return False
+    if request.get("type") in NON_CRITICAL_TYPES or request.get("frame_id") != main_frame:
+        return False
+    return request.get("priority") in CRITICAL_PRIORITIES
+
+def critical_request_chain_test(network_requests: list, soup: BeautifulSoup, document_url: str) -> dict:
+    """
+    Builds the critical request chains of the page load from the network events
+    captured by the playwright worker: each request is linked to the document,
+    stylesheet or script that initiated it, and only render-critical requests
+    (high priority, not images/XHR, main frame) are kept.
+
+    Args:
+        network_requests: The worker's "network_requests" list (url, type,
+            priority, initiator_url, start/end in ms, encoded_bytes...).
+        soup: The rendered page, used to find existing preconnect/preload hints.
+        document_url: The final URL of the document.
+
+    Returns:
+        A dictionary with the longest chain's latency and byte cost, the
+        heaviest chains, and the preconnect/preload candidates that would
+        shorten them.
+    """
+    result = {
+        "chain_count": 0,
+        "longest_chain": None,
+        "chains": [],
+        "preconnect_candidates": [],
+        "preload_candidates": [],
+        "issues": [],
+    }
+    documents = [r for r in network_requests if r.get("type") == "Document"]
+    if not documents:
+        return result
+    root = min(documents, key=lambda r: r["start"])
+    main_frame = root.get("frame_id")
+
+    critical = [r for r in network_requests if r is root or _is_critical(r, main_frame)]
+    critical.sort(key=lambda r: r["start"])
+    # a URL may be requested more than once; the initiator is the earliest copy
+    by_url = {}
+    for request in critical:
+        by_url.setdefault(request["url"], request)
+
+    children = {id(r): [] for r in critical}
+    for request in critical:
+        if request is root:
+            continue
+        parent = by_url.get(request.get("initiator_url")) or root
+        if parent is request:
+            parent = root
+        children[id(parent)].append(request)
+
+    chains = []
+
+    def walk(request, path):
+        path = path + [request]
+        if not children[id(request)]:
+            if len(path) > 1:
+                chains.append(path)
+            return
+        for child in children[id(request)]:
+            walk(child, path)
+
+    walk(root, [])
+    if not chains:
+        return result
+
+    def describe(path):
+        return {
+            "requests": [{"url": r["url"], "type": r.get("type"), "priority": r.get("priority"),
+                          "end_ms": r["end"], "bytes": r.get("encoded_bytes", 0)} for r in path],
+            "latency_ms": round(path[-1]["end"] - path[0]["start"], 1),
+            "bytes": sum(r.get("encoded_bytes", 0) for r in path),
+        }
+
+    described = sorted((describe(path) for path in chains), key=lambda c: c["latency_ms"], reverse=True)
+    result["chain_count"] = len(described)
+    result["longest_chain"] = described[0]
+    result["chains"] = described[:MAX_REPORTED_CHAINS]
+
+    # existing resource hints
+    preconnected, preloaded = set(), set()
+    for link in soup.find_all("link", href=True):
+        rel = " ".join(link.get("rel") or []).lower()
+        href = urljoin(document_url, link["href"])
+        if "preconnect" in rel:
+            preconnected.add(_origin(href))
+        elif "preload" in rel:
+            preloaded.add(href)
+
+    document_origin = _origin(document_url)
+    seen_origins = set()
+    for request in critical:
+        origin = _origin(request["url"])
+        if origin in (document_origin, "://") or origin in preconnected or origin in seen_origins:
+            continue
+        seen_origins.add(origin)
+        result["preconnect_candidates"].append({"origin": origin, "first_request": request["url"], "start_ms": request["start"]})
+
+    depth = {id(root): 0}
+    for request in critical:
+        for child in children[id(request)]:
+            depth[id(child)] = depth.get(id(request), 0) + 1
+    for request in critical:
+        # discovered by a stylesheet or script instead of the HTML: a preload lets the parser find it
+        if depth.get(id(request), 0) >= 2 and request.get("type") in PRELOADABLE_TYPES and request["url"] not in preloaded:
+            result["preload_candidates"].append({
+                "url": request["url"],
+                "as": PRELOADABLE_TYPES[request["type"]],
+                "initiator": request.get("initiator_url"),
+                "crossorigin": request["type"] == "Font",
+            })
+
+    longest = result["longest_chain"]
+    if len(longest["requests"]) > 2:
+        result["issues"].append(
+            f"The longest critical request chain has {len(longest['requests'])} requests and takes "
+            f"{longest['latency_ms']:.0f} ms ({longest['bytes'] / 1024:.1f} KB)."
+        )
+    if result["preload_candidates"]:
+        result["issues"].append(f"{len(result['preload_candidates'])} late-discovered critical request(s) could be preloaded.")
+    if result["preconnect_candidates"]:
+        result["issues"].append(f"{len(result['preconnect_candidates'])} third-party origin(s) on the critical path lack a preconnect hint.")
+    return result
@@ -1,11 +1,20 @@
 import requests
 from urllib.parse import urlparse
+from utils.robots import get_robots_rules, get_cached_robots_rules
 
-def disallow_directive_test(url: str, robots_txt_content: str = None) -> dict:
+# robots.txt groups are matched against the crawler that matters most for SEO;
+# sites without a Googlebot group fall back to the "*" group
+DEFAULT_ROBOTS_AGENT = "Googlebot"
+
+def disallow_directive_test(url: str, robots_txt_content: str = None, user_agent: str = DEFAULT_ROBOTS_AGENT, session: requests.Session = None,
+                            robots_txt_status: int = None) -> dict:
     result = {
         "url": url,
         "robots_txt_url": "",
+        "user_agent": user_agent,
         "disallow_rules": [],
+        "is_allowed": True,
+        "blocking_rule": None,
         "issues": [],
         "robots_txt_found": False
     }
@@ -15,6 +24,7 @@ def disallow_directive_test(url: str, robots_txt_content: str = None) -> dict:
     result["robots_txt_url"] = robots_url
 
     content_to_parse = None
+    rules = None
 
     headers = {
         "User-Agent": "MySEOAnalyzerBot/1.0 (+https://example.com/contact)"
@@ -23,10 +33,19 @@ def disallow_directive_test(url: str, robots_txt_content: str = None) -> dict:
     if robots_txt_content:
         result["robots_txt_found"] = True
         content_to_parse = robots_txt_content
+    elif robots_txt_status is not None:
+        # already fetched in this audit; a missing robots.txt is not fetched again
+        if robots_txt_status == 200 and robots_txt_content is not None:
+            result["robots_txt_found"] = True
+        else:
+            result["issues"].append(f"robots.txt not found (HTTP {robots_txt_status}).")
+    elif (rules := get_cached_robots_rules(parsed.netloc)) is not None:
+        # compiled earlier in this audit or crawl, no need to fetch it again
+        result["robots_txt_found"] = bool(rules.groups or rules.sitemaps)
     else:
         try:
             # Use a timeout and a specific user-agent
-            resp = requests.get(robots_url, headers=headers, timeout=8)
+            resp = (session or requests).get(robots_url, headers=headers, timeout=8)
             if resp.status_code == 200:
                 result["robots_txt_found"] = True
                 content_to_parse = resp.text
@@ -36,17 +55,17 @@ def disallow_directive_test(url: str, robots_txt_content: str = None) -> dict:
             result["issues"].append(f"Error fetching robots.txt: {e}")
 
     if content_to_parse:
-        lines = content_to_parse.splitlines()
-        for line in lines:
-            line = line.strip()
-            # Check for disallow rules, case-insensitively
-            if line.lower().startswith("disallow:"):
-                rule = line[9:].strip()
-                if rule:
-                    result["disallow_rules"].append(rule)
+        rules = get_robots_rules(parsed.netloc, content_to_parse)
+
+    if rules is not None and result["robots_txt_found"]:
+        result["disallow_rules"] = rules.disallow_rules(user_agent)
+        result["blocking_rule"] = rules.blocking_rule(url, user_agent)
+        result["is_allowed"] = result["blocking_rule"] is None
 
         if not result["disallow_rules"]:
             result["issues"].append("No 'Disallow' rules found in robots.txt.")
+        if not result["is_allowed"]:
+            result["issues"].append(f"URL is blocked for {user_agent} by rule 'Disallow: {result['blocking_rule']}'.")
 
     return result
 
@@ -1,12 +1,14 @@
 import requests
 from urllib.parse import urljoin, urlparse
 
-def error_page_test(url: str) -> dict:
+def error_page_test(url: str, session: requests.Session = None) -> dict:
     """
     Tests if a website has a custom 404 error page.
 
     Args:
         url (str): The base URL of the site to check.
+        session (requests.Session, optional): Session to reuse (e.g. the audit's
+            policy-aware session). A new one is created if omitted.
 
     Returns:
         dict: A dictionary containing the test results.
@@ -27,7 +29,7 @@ def error_page_test(url: str) -> dict:
     result["test_url"] = test_url
 
     try:
-        session = requests.Session()
+        session = session or requests.Session()
         headers = {
             "User-Agent": (
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -1,27 +1,33 @@
-def html_compression_test(headers: dict, original_size_bytes: int) -> dict:
+def html_compression_test(headers: dict, original_size_bytes: int, savings: dict = None) -> dict:
     """
     Checks if the HTML response is compressed (Gzip or Brotli).
 
     Args:
         headers: A dictionary of response headers.
         original_size_bytes: The size of the HTML in bytes.
+        savings: Optional result of utils.text_savings.analyze_text() for the
+            HTML, used to report real compressed sizes.
 
     Returns:
         A dictionary with the test status and analysis.
     """
     content_encoding = headers.get("content-encoding", "").lower()
+    compressed = (savings or {}).get("compressed", {})
 
     if "gzip" in content_encoding or "br" in content_encoding:
-        # Note: Calculating exact savings without the compressed size is complex.
-        # We'll just confirm that compression is active. A more advanced
-        # version could compare compressed vs uncompressed sizes.
+        # the size on the wire, measured by compressing the body the same way
+        transfer = (savings or {}).get("current_transfer_bytes")
         return {
             "status": "pass",
             "analysis": f"The HTML is compressed using '{content_encoding}'.",
-            "savings_percent": "N/A" 
+            "savings_percent": round((1 - transfer / original_size_bytes) * 100, 1) if transfer and original_size_bytes else "N/A",
+            "compressed_sizes": compressed,
         }
     else:
+        best = min((size for size in compressed.values() if size is not None), default=None)
         return {
             "status": "fail",
-            "analysis": "The HTML response is not compressed. Enabling GZIP or Brotli can significantly reduce page size and improve load times."
+            "analysis": "The HTML response is not compressed. Enabling GZIP or Brotli can significantly reduce page size and improve load times.",
+            "potential_savings_percent": round((1 - best / original_size_bytes) * 100, 1) if best and original_size_bytes else "N/A",
+            "compressed_sizes": compressed,
         }
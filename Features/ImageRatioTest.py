@@ -1,15 +1,10 @@
 from bs4 import BeautifulSoup
+import asyncio
 import requests
 from urllib.parse import urljoin
 import re
 
-# Conditional import of Pillow for image analysis
-try:
-    from PIL import Image
-    from io import BytesIO
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+from utils.image_probe import probe_image_sizes
 
 def extract_css_dimensions(style: str):
     """Extracts width and height from an inline style string."""
@@ -24,10 +19,17 @@ def extract_css_dimensions(style: str):
             height = int(float(height_match.group(1)))
     return width, height
 
-def image_ratio_test(url: str, soup: BeautifulSoup, validate_real_size: bool = False) -> dict:
+def image_source_urls(url: str, soup: BeautifulSoup) -> list:
+    """Absolute URLs of every <img> on the page, without data URIs."""
+    return [urljoin(url, img["src"]) for img in soup.find_all("img", src=True) if img["src"] and not img["src"].startswith('data:')]
+
+def image_ratio_test(url: str, soup: BeautifulSoup, validate_real_size: bool = False, real_sizes: dict = None) -> dict:
     """
     Extracts image width/height from HTML attributes and inline CSS.
-    Optionally validates dimensions by fetching the image file if Pillow is installed.
+    Declared sizes are compared to the real ones read from each file's header
+    when `real_sizes` (from utils.image_probe) is passed, or when
+    validate_real_size is set, in which case they are probed here. Inside a
+    running event loop, use image_ratio_test_async instead.
     """
     result = {
         "url": url,
@@ -41,6 +43,10 @@ def image_ratio_test(url: str, soup: BeautifulSoup, validate_real_size: bool = F
     img_tags = soup.find_all("img")
     result["images_checked"] = len(img_tags)
 
+    validate_real_size = validate_real_size or real_sizes is not None
+    if validate_real_size and real_sizes is None:
+        real_sizes = asyncio.run(probe_image_sizes(image_source_urls(url, soup)))
+
     for img in img_tags:
         src = img.get("src")
         # Skip empty or data URIs
@@ -66,21 +72,20 @@ def image_ratio_test(url: str, soup: BeautifulSoup, validate_real_size: bool = F
                 aspect_ratio = round(w / h, 2) if h != 0 else 'N/A'
                 img_info = {"src": img_url, "declared_width": w, "declared_height": h, "declared_aspect_ratio": aspect_ratio}
 
-                # Optional: Validate real size with Pillow if requested and available
-                if validate_real_size and PIL_AVAILABLE:
-                    try:
-                        img_resp = requests.get(img_url, timeout=5, stream=True)
-                        img_resp.raise_for_status()
-                        pil_img = Image.open(BytesIO(img_resp.content))
-                        real_w, real_h = pil_img.size
-                        
+                # Validate against the real size read from the image header
+                if validate_real_size:
+                    real = real_sizes.get(img_url)
+                    if real and "error" not in real:
+                        real_w, real_h = real["width"], real["height"]
+
                         img_info["real_width"] = real_w
                         img_info["real_height"] = real_h
-                        
+                        img_info["format"] = real["format"]
+
                         if real_w != w or real_h != h:
                             result["images_dimension_mismatch"].append(img_info)
-                    except Exception as e:
-                        result["issues"].append(f"Could not validate real image size for {img_url}: {e}")
+                    elif real:
+                        result["issues"].append(f"Could not validate real image size for {img_url}: {real['error']}")
                 
                 result["images_with_dimensions"].append(img_info)
             except (ValueError, TypeError):
@@ -96,11 +101,13 @@ def image_ratio_test(url: str, soup: BeautifulSoup, validate_real_size: bool = F
         count = len(result['images_dimension_mismatch'])
         result["issues"].append(f"{count} image(s) have declared dimensions that mismatch their actual size.")
 
-    if validate_real_size and not PIL_AVAILABLE:
-        result["issues"].append("Pillow library not installed; real image size validation was skipped. Run 'pip install Pillow' to enable.")
-
     return result
 
+async def image_ratio_test_async(url: str, soup: BeautifulSoup, validate_real_size: bool = True) -> dict:
+    """image_ratio_test for coroutines: the real sizes are probed on the running loop."""
+    real_sizes = await probe_image_sizes(image_source_urls(url, soup)) if validate_real_size else None
+    return image_ratio_test(url, soup, validate_real_size=validate_real_size, real_sizes=real_sizes)
+
 # Standalone execution block for testing
 if __name__ == '__main__':
     import json
@@ -109,8 +116,7 @@ if __name__ == '__main__':
     try:
         response = requests.get(test_url, timeout=10)
         page_soup = BeautifulSoup(response.text, "lxml")
-        # Set validate_real_size to True to test Pillow functionality (can be slow)
-        test_result = image_ratio_test(test_url, page_soup, validate_real_size=False)
+        test_result = image_ratio_test(test_url, page_soup)
         print(json.dumps(test_result, indent=2))
     except requests.RequestException as e:
         print(f"Failed to fetch URL: {e}")
@@ -0,0 +1,82 @@
+import re
+from bisect import bisect_right
+
+from utils.multi_match import MultiPatternMatcher
+
+MAX_TARGET_KEYWORDS = 500
+# the same window the report has always used for the opening paragraph
+OPENING_PARAGRAPH_CHARS = 200
+# keeps a phrase from matching across two fields
+FIELD_SEPARATOR = "\0"
+
+_SPACE = re.compile(r"\s+")
+_WORD = re.compile(r"\w+")
+
+def _normalize(text: str) -> str:
+    return _SPACE.sub(" ", text or "").strip().lower()
+
+def keyword_placement_test(keywords: list, title: str = "", meta_description: str = "", h1s: list = (),
+                           headings: list = (), body_text: str = "", alt_texts: list = (), url_path: str = "") -> dict:
+    """
+    Checks where each target keyword appears on the page and how often, for a
+    whole keyword cluster at once. All phrases go into one automaton and all
+    fields are scanned in a single pass; a match counts only on word
+    boundaries.
+
+    Args:
+        keywords: Target phrases (up to MAX_TARGET_KEYWORDS).
+        title, meta_description, h1s, headings, body_text, alt_texts, url_path:
+            The page fields to check.
+
+    Returns:
+        A dictionary with per-keyword placement, body frequency and density,
+        plus which keywords are missing from each field.
+    """
+    phrases = list(dict.fromkeys(p for p in (_normalize(k) for k in keywords or []) if p))[:MAX_TARGET_KEYWORDS]
+    result = {"keywords": [], "missing": {}, "body_word_count": 0, "truncated": len(keywords or []) > MAX_TARGET_KEYWORDS}
+    if not phrases:
+        return result
+
+    url_words = re.sub(r"[-_/.+]+", " ", url_path or "")
+    fields = [
+        ("title", _normalize(title)),
+        ("meta_description", _normalize(meta_description)),
+        ("h1", "\n".join(_normalize(h) for h in h1s)),
+        ("headings", "\n".join(_normalize(h) for h in headings)),
+        ("alt_text", "\n".join(_normalize(a) for a in alt_texts)),
+        ("url", _normalize(url_words)),
+        ("body", _normalize(body_text)),
+    ]
+    text = FIELD_SEPARATOR.join(value for _, value in fields)
+    starts, offset = [], 0
+    for _, value in fields:
+        starts.append(offset)
+        offset += len(value) + 1
+    body_start = starts[-1]
+
+    stats = {p: {"keyword": p, "frequency": 0, "density": 0.0, "placement": {name: False for name, _ in fields[:-1]} | {"opening_paragraph": False}}
+             for p in phrases}
+    matcher = MultiPatternMatcher({p: p for p in phrases})
+    for start, end, phrase, _ in matcher.iter_matches(text):
+        # whole words only: "art" must not match inside "start"
+        if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+            continue
+        field = fields[bisect_right(starts, start) - 1][0]
+        if field == "body":
+            stats[phrase]["frequency"] += 1
+            if end - body_start <= OPENING_PARAGRAPH_CHARS:
+                stats[phrase]["placement"]["opening_paragraph"] = True
+        else:
+            stats[phrase]["placement"][field] = True
+
+    body_words = len(_WORD.findall(fields[-1][1]))
+    result["body_word_count"] = body_words
+    for phrase in phrases:
+        entry = stats[phrase]
+        if body_words:
+            # share of body words taken up by the phrase, the usual keyword density definition
+            entry["density"] = round(entry["frequency"] * len(phrase.split()) / body_words * 100, 2)
+        result["keywords"].append(entry)
+    for field in next(iter(stats.values()))["placement"]:
+        result["missing"][field] = [p for p in phrases if not stats[p]["placement"][field]]
+    return result
@@ -1,54 +1,63 @@
-import re
 from bs4 import BeautifulSoup
-from requests import Session, exceptions
 import logging
 
-def media_query_responsive_test(soup: BeautifulSoup, resources: list, session: Session) -> dict:
+from utils.css_engine import parse_stylesheet, stylesheet_closure
+from utils.resource_store import ResourceStore
+
+def media_query_responsive_test(soup: BeautifulSoup, resources: list, store: ResourceStore, import_graph: dict | None = None) -> dict:
     """
     Checks for the presence of CSS media queries in both inline styles and external stylesheets.
 
     Args:
         soup: The BeautifulSoup object of the page.
         resources: A list of resource dictionaries from the scraper.
-        session: The requests Session object to fetch external files.
+        store: The audit's resource bodies, fetched up front.
+        import_graph: The @import graph from expand_imports(); imported
+            stylesheets are checked as well.
 
     Returns:
-        A dictionary containing the test result.
+        A dictionary containing the test result and the width breakpoints used.
     """
-    has_media_queries = False
-    analysis = "No CSS media queries were found. The page may not be properly responsive."
+    inline_queries, external_queries, breakpoints = 0, 0, set()
 
-    # 1. Check for media queries in inline <style> tags
+    # 1. Media queries in inline <style> tags
     for style_tag in soup.find_all("style"):
-        if style_tag.string and re.search(r"@media", style_tag.string, re.IGNORECASE):
-            has_media_queries = True
-            analysis = "CSS media queries found in inline <style> tags."
-            break
-    
-    if has_media_queries:
-        return {"has_media_queries": True, "analysis": analysis}
-
-    # 2. If not found inline, check external CSS files
+        if style_tag.string:
+            sheet = parse_stylesheet(style_tag.string)
+            inline_queries += len(sheet.media_queries)
+            breakpoints.update(sheet.breakpoints)
+
+    # 2. External stylesheets and everything they @import; the parsed form is
+    # shared with the other CSS checks, so nothing is fetched or parsed twice
     css_urls = [
-        item['url'] for item in resources 
+        item['url'] for item in resources
         if item.get('url') and (
-            (item.get('content_type') and 'css' in item.get('content_type')) or 
+            (item.get('content_type') and 'css' in item.get('content_type')) or
             item['url'].lower().endswith('.css')
         )
     ]
-    
-    for css_url in css_urls:
-        try:
-            # Use the existing session to make the request, respecting existing headers
-            response = session.get(css_url, timeout=10)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            css_content = response.text
-            if re.search(r"@media", css_content, re.IGNORECASE):
-                has_media_queries = True
-                analysis = "CSS media queries found in external stylesheets."
-                break  # Exit as soon as we find the first one
-        except exceptions.RequestException as e:
-            logging.warning(f"Could not fetch or read CSS file {css_url} for media query check: {e}")
+    for css_url in stylesheet_closure(import_graph or {}, css_urls):
+        css_content = store.text(css_url)
+        if css_content is None:
+            entry = store.get(css_url)
+            logging.warning(f"Could not read CSS file {css_url} for media query check: {entry.error if entry else 'not fetched'}")
             continue
+        sheet = parse_stylesheet(css_content)
+        external_queries += len(sheet.media_queries)
+        breakpoints.update(sheet.breakpoints)
+
+    if inline_queries and external_queries:
+        analysis = "CSS media queries found in inline <style> tags and external stylesheets."
+    elif inline_queries:
+        analysis = "CSS media queries found in inline <style> tags."
+    elif external_queries:
+        analysis = "CSS media queries found in external stylesheets."
+    else:
+        analysis = "No CSS media queries were found. The page may not be properly responsive."
 
-    return {"has_media_queries": has_media_queries, "analysis": analysis}
+    return {
+        "has_media_queries": bool(inline_queries or external_queries),
+        "media_query_count": inline_queries + external_queries,
+        "breakpoints": sorted(breakpoints),
+        "analysis": analysis,
+    }
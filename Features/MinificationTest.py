@@ -1,6 +1,7 @@
-import requests
 import logging
 
+from utils.resource_store import ResourceStore
+
 # Configure logging to see warnings about failed fetches
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
@@ -13,20 +14,20 @@ def is_minified(content: str) -> bool:
         return False
     
     total_chars = len(content)
-    # Efficiently count non-whitespace characters
-    non_whitespace_chars = len("".join(content.split()))
+    # count whitespace in place instead of building a stripped copy of the file
+    non_whitespace_chars = total_chars - sum(map(content.count, " \t\n\r\f\v"))
     
     # If the ratio is very high (e.g., > 95%), it's almost certainly minified.
     ratio = non_whitespace_chars / total_chars if total_chars > 0 else 0
     return ratio > 0.95
 
-def minification_test(resources: list, session: requests.Session) -> dict:
+def minification_test(resources: list, store: ResourceStore) -> dict:
     """
-    Checks a sample of linked CSS and JavaScript files for minification.
+    Checks the linked CSS and JavaScript files for minification.
 
     Args:
         resources (list): A list of resource dictionaries from the scraper.
-        session (requests.Session): The session to use for making requests.
+        store (ResourceStore): The audit's resource bodies, fetched up front.
 
     Returns:
         dict: A dictionary containing the minification test results.
@@ -36,43 +37,26 @@ def minification_test(resources: list, session: requests.Session) -> dict:
         "css": {"total_checked": 0, "minified_count": 0, "unminified_list": []}
     }
 
-    # Get up to 5 JS and 5 CSS files to check to avoid excessive requests
-    js_to_check = [r['url'] for r in resources if r.get('type') == 'js' and r.get('url')][:5]
-    css_to_check = [r['url'] for r in resources if r.get('type') == 'css' and r.get('url')][:5]
-
-    for url in js_to_check:
-        results["js"]["total_checked"] += 1
-        try:
-            res = session.get(url, timeout=10)
-            res.raise_for_status()  # Raise an exception for bad status codes
-            content = res.text
-            if is_minified(content):
-                results["js"]["minified_count"] += 1
-            else:
-                results["js"]["unminified_list"].append(url)
-        except requests.RequestException as e:
-            # Log the error instead of silently passing
-            logging.warning(f"Could not fetch JS file for minification check: {url}, Error: {e}")
-
-    for url in css_to_check:
-        results["css"]["total_checked"] += 1
-        try:
-            res = session.get(url, timeout=10)
-            res.raise_for_status()
-            content = res.text
+    # bodies were fetched once, concurrently, by the resource store; nothing is requested here
+    for kind in ("js", "css"):
+        for url in dict.fromkeys(r['url'] for r in resources if r.get('type') == kind and r.get('url')):
+            results[kind]["total_checked"] += 1
+            content = store.text(url)
+            if content is None:
+                entry = store.get(url)
+                logging.warning(f"No body available for minification check: {url}, Error: {entry.error if entry else 'not fetched'}")
+                continue
             if is_minified(content):
-                results["css"]["minified_count"] += 1
+                results[kind]["minified_count"] += 1
             else:
-                results["css"]["unminified_list"].append(url)
-        except requests.RequestException as e:
-            # Log the error instead of silently passing
-            logging.warning(f"Could not fetch CSS file for minification check: {url}, Error: {e}")
+                results[kind]["unminified_list"].append(url)
 
     return results
 
 # Standalone execution block for testing
 if __name__ == '__main__':
     import json
+    import asyncio
     # Mock resources for a standalone test
     mock_resources = [
         # A minified JS file from a CDN
@@ -82,7 +66,7 @@ if __name__ == '__main__':
     ]
     
     print("Running Minification Test with mock resources...")
-    with requests.Session() as s:
-        test_results = minification_test(mock_resources, s)
+    store = asyncio.run(ResourceStore().fetch_all([r['url'] for r in mock_resources]))
+    test_results = minification_test(mock_resources, store)
     
     print(json.dumps(test_results, indent=2))
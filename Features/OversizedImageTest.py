@@ -0,0 +1,88 @@
+import math
+from urllib.parse import urlparse
+
+# the same cut-off Lighthouse uses: smaller savings are not worth reporting
+WASTED_BYTES_THRESHOLD = 4096
+
+def _is_vector(src: str) -> bool:
+    return src.startswith("data:image/svg") or urlparse(src).path.lower().endswith(".svg")
+
+def oversized_image_test(image_layout: dict, threshold_bytes: int = WASTED_BYTES_THRESHOLD) -> dict:
+    """
+    Finds images that are sent at a larger resolution than they are displayed
+    at, using the rendered layout collected by the playwright worker.
+
+    Args:
+        image_layout: The worker's "image_layout" dict (device_pixel_ratio and
+            one entry per <img> with natural size, rendered box and body size).
+        threshold_bytes: Minimum wasted bytes for an image to be reported.
+
+    Returns:
+        A dictionary with oversized images, their estimated wasted bytes and
+        lazy-loading problems.
+    """
+    result = {
+        "images_checked": 0,
+        "oversized_images": [],
+        "total_wasted_bytes": 0,
+        "offscreen_eager_images": [],
+        "lazy_above_fold_images": [],
+        "issues": []
+    }
+    if not image_layout:
+        return result
+
+    dpr = image_layout.get("device_pixel_ratio") or 1
+    seen = set()
+    for image in image_layout.get("images", []):
+        src = image.get("src") or ""
+        if not src or src in seen:
+            continue
+        seen.add(src)
+        result["images_checked"] += 1
+
+        loading = (image.get("loading") or "").lower()
+        if image.get("above_fold") and loading == "lazy":
+            result["lazy_above_fold_images"].append(src)
+        elif not image.get("above_fold") and loading != "lazy" and image.get("rendered_width"):
+            result["offscreen_eager_images"].append(src)
+
+        natural_w, natural_h = image.get("natural_width") or 0, image.get("natural_height") or 0
+        rendered_w, rendered_h = image.get("rendered_width") or 0, image.get("rendered_height") or 0
+        # not loaded yet, hidden, or scalable: nothing to compare
+        if not (natural_w and natural_h and rendered_w and rendered_h) or _is_vector(src):
+            continue
+
+        displayed_pixels = math.ceil(rendered_w * dpr) * math.ceil(rendered_h * dpr)
+        natural_pixels = natural_w * natural_h
+        if natural_pixels <= displayed_pixels:
+            continue
+
+        size = image.get("encoded_bytes")
+        wasted_ratio = 1 - displayed_pixels / natural_pixels
+        wasted_bytes = int(size * wasted_ratio) if size else None
+        if wasted_bytes is not None and wasted_bytes < threshold_bytes:
+            continue
+        result["oversized_images"].append({
+            "src": src,
+            "natural_size": [natural_w, natural_h],
+            "displayed_size": [round(rendered_w), round(rendered_h)],
+            "scale_factor": round(natural_pixels / displayed_pixels, 1),
+            "bytes": size,
+            "wasted_bytes": wasted_bytes,
+            "above_fold": bool(image.get("above_fold")),
+        })
+
+    result["oversized_images"].sort(key=lambda i: i["wasted_bytes"] or 0, reverse=True)
+    result["total_wasted_bytes"] = sum(i["wasted_bytes"] or 0 for i in result["oversized_images"])
+
+    if result["oversized_images"]:
+        result["issues"].append(
+            f"{len(result['oversized_images'])} image(s) are larger than their displayed size, wasting about {result['total_wasted_bytes'] / 1024:.1f} KB."
+        )
+    if result["offscreen_eager_images"]:
+        result["issues"].append(f"{len(result['offscreen_eager_images'])} below-the-fold image(s) are not lazy-loaded.")
+    if result["lazy_above_fold_images"]:
+        result["issues"].append(f"{len(result['lazy_above_fold_images'])} above-the-fold image(s) use loading='lazy', which delays them.")
+
+    return result
@@ -2,6 +2,8 @@ import sys
 import json
 import logging
 
+from utils.grammar_check import check_text, MAX_CHECK_CHARS
+
 try:
     import language_tool_python
 except ImportError:
@@ -37,55 +39,29 @@ def spell_check_test(body_text: str) -> dict:
         return result
 
     try:
-        # Initialize the tool (downloads the Java server on first run automatically)
-        tool = language_tool_python.LanguageTool('en-US')
-        
-        # Limit text length to prevent timeouts on massive pages
-        checked_text = body_text[:20000]
-        matches = tool.check(checked_text) 
-
-        for match in matches:
-            # --- ROBUST ATTRIBUTE FETCHING ---
-            
-            # 1. Get Offset
-            offset = getattr(match, 'offset', getattr(match, 'fromx', 0))
-            
-            # 2. Get Length (Check ALL casing variations)
-            error_length = getattr(match, 'errorLength', None)
-            if error_length is None: error_length = getattr(match, 'error_length', None) # snake_case
-            if error_length is None: error_length = getattr(match, 'len', None)
-            if error_length is None: error_length = getattr(match, 'length', None)
-            
-            # 3. Calculate from positions if explicit length is missing
-            if error_length is None:
-                tox = getattr(match, 'tox', None)
-                fromx = getattr(match, 'fromx', None)
-                if tox is not None and fromx is not None:
-                    error_length = tox - fromx
-            
-            # 4. Final Fallback
-            if error_length is None:
-                error_length = 0
+        # Very large pages are capped; everything below the cap is checked in
+        # sentence-aligned chunks spread over the warm LanguageTool pool;
+        # sentences seen on earlier pages are answered from the grammar cache
+        checked_text = body_text[:MAX_CHECK_CHARS]
+        result["words_checked"] = len(checked_text.split())
+        result["truncated"] = len(body_text) > MAX_CHECK_CHARS
+        result["cache"] = {}
+        issues = check_text(checked_text, stats=result["cache"])
 
-            # 5. Extract other attributes
-            rule_id = getattr(match, 'ruleId', getattr(match, 'rule_id', 'UNKNOWN'))
-            message = getattr(match, 'message', getattr(match, 'msg', ''))
-            context = getattr(match, 'context', '')
-            replacements = getattr(match, 'replacements', [])
+        for issue in issues:
+            offset, error_length = issue["offset"], issue["length"]
+            rule_id, replacements, context = issue["rule_id"], issue["replacements"], issue["context"]
+            rule_type, category = issue["rule_issue_type"], issue["category"]
 
-            issue = {
-                "message": message,
+            report_issue = {
+                "message": issue["message"],
                 "context": context,
                 "replacements": replacements[:3], # Top 3 suggestions
                 "offset": offset,
                 "length": error_length,
                 "rule_id": rule_id
             }
-            
-            # --- Categorization ---
-            rule_type = getattr(match, 'ruleIssueType', getattr(match, 'rule_issue_type', ''))
-            category = getattr(match, 'category', '')
-            
+
             # Extract the actual word from the text using offset
             bad_word = ""
             if error_length > 0:
@@ -103,14 +79,11 @@ def spell_check_test(body_text: str) -> dict:
                 })
             elif rule_type == 'style' or category == 'STYLE':
                 result["style_issues_count"] += 1
-                result["style_issues"].append(issue)
+                result["style_issues"].append(report_issue)
             else:
                 # Default everything else (typographical, grammar, etc.) to Grammar
                 result["grammar_issues_count"] += 1
-                result["grammar_issues"].append(issue)
-
-        # close the tool to free memory
-        tool.close()
+                result["grammar_issues"].append(report_issue)
 
     except Exception as e:
         logging.error(f"Error in SpellCheckTest: {e}")
@@ -0,0 +1,57 @@
+# smaller per-file waste is not worth reporting (the Lighthouse cut-off)
+WASTED_BYTES_THRESHOLD = 20 * 1024
+
+def _summarize(entries: list, threshold_bytes: int) -> dict:
+    resources, total_bytes, unused_bytes = [], 0, 0
+    for entry in entries:
+        total = entry.get("total_bytes") or 0
+        unused = max(0, total - (entry.get("used_bytes") or 0))
+        total_bytes += total
+        unused_bytes += unused
+        if total and unused >= threshold_bytes:
+            resources.append({
+                "url": entry["url"],
+                "total_bytes": total,
+                "unused_bytes": unused,
+                "unused_percent": round(unused / total * 100, 1),
+            })
+    resources.sort(key=lambda r: r["unused_bytes"], reverse=True)
+    return {
+        "total_bytes": total_bytes,
+        "unused_bytes": unused_bytes,
+        "unused_percent": round(unused_bytes / total_bytes * 100, 1) if total_bytes else 0.0,
+        "resources": resources,
+    }
+
+def unused_code_test(coverage: dict, threshold_bytes: int = WASTED_BYTES_THRESHOLD) -> dict:
+    """
+    Reports how much of the shipped JavaScript and CSS the page load actually
+    used, from the coverage the playwright worker recorded during the render.
+
+    Args:
+        coverage: The worker's "coverage" dict ({"js": [...], "css": [...]},
+            each entry with url, total_bytes and used_bytes).
+        threshold_bytes: Minimum unused bytes for a resource to be listed.
+
+    Returns:
+        A dictionary with per-resource and aggregate unused bytes for JS and CSS.
+    """
+    result = {"js": None, "css": None, "total_unused_bytes": 0, "issues": [], "error": None}
+    if not coverage:
+        result["error"] = "Coverage was not collected."
+        return result
+    if coverage.get("error"):
+        result["error"] = coverage["error"]
+        return result
+
+    result["js"] = _summarize(coverage.get("js", []), threshold_bytes)
+    result["css"] = _summarize(coverage.get("css", []), threshold_bytes)
+    result["total_unused_bytes"] = result["js"]["unused_bytes"] + result["css"]["unused_bytes"]
+
+    for kind, label in (("js", "JavaScript"), ("css", "CSS")):
+        if result[kind]["resources"]:
+            result["issues"].append(
+                f"{len(result[kind]['resources'])} {label} file(s) carry code unused during page load, "
+                f"{result[kind]['unused_bytes'] / 1024:.1f} KB ({result[kind]['unused_percent']}%) in total."
+            )
+    return result
@@ -1053,6 +1053,7 @@ from Features.DirectiveTest import disallow_directive_test
 from Features.MetaRefreshTest import meta_refresh_test
 from Features.ErrorPageTest import error_page_test
 from Features.MediaQueryResponsiveTest import media_query_responsive_test
+from Features.KeywordPlacementTest import keyword_placement_test
 from Features.KeywordCloudTest import generate_keyword_cloud
 
 # Ensure NLTK data is available
@@ -1387,6 +1388,44 @@ FEATURE_ANALYSIS_MAP = {
         "fail_messages": {"html_compression_missing": "The HTML response is not compressed. This is a missed opportunity for a major performance improvement."},
         "recommendation": "Enable GZIP or Brotli compression on your web server."
     },
+    "text_compression": {
+        "feature_name": "Text Resource Savings", "category": "Performance",
+        "description": "Measures how many bytes the HTML, CSS and JavaScript could shed with minification and GZIP/Brotli compression.",
+        "pros": "Text resources compress extremely well; serving them minified and Brotli-compressed is one of the cheapest speed wins.",
+        "pass_message": "Text resources are already served close to their smallest size.",
+        "fail_messages": {"text_savings_available": "Minifying and compressing the listed resources would noticeably reduce the bytes transferred."},
+        "recommendation": "Minify CSS/JS in your build and enable Brotli (or at least GZIP) compression for HTML, CSS and JavaScript. The resources with the largest savings are listed first."
+    },
+    "critical_request_chains": {
+        "feature_name": "Critical Request Chains", "category": "Performance",
+        "description": "Follows the render-critical requests of the page load (document, stylesheets, scripts, fonts) from initiator to initiator, measured in a real browser.",
+        "pros": "Short critical chains let the browser discover everything it needs for the first paint early, instead of one round trip after another.",
+        "pass_message": "The critical request chains are short.",
+        "fail_messages": {
+            "critical_chain_long": "The longest chain of render-critical requests is deep and slow; each level waits for the previous one.",
+            "critical_chain_hints_missing": "Some render-critical requests are discovered late or need new connections and could be sped up with resource hints."
+        },
+        "recommendation": "Flatten the chain: avoid CSS @import and script-injected critical resources, <link rel=preload> late-discovered fonts and stylesheets, and <link rel=preconnect> to third-party origins on the critical path."
+    },
+    "third_party_cost": {
+        "feature_name": "Third-Party Cost", "category": "Performance",
+        "description": "Attributes every request to the company that serves it (analytics, ads, fonts, tag managers, CDNs...) and totals the bytes and, when rendered, the main-thread time each one costs.",
+        "pros": "Third-party code is often the largest share of a page's weight and script execution; knowing which vendor costs what makes it possible to trim it.",
+        "pass_message": "Third-party resources add little weight and script time to the page.",
+        "fail_messages": {"third_party_heavy": "Third-party resources account for a large share of the page's bytes or main-thread time."},
+        "recommendation": "Remove unused vendors, load the remaining ones after the main content (defer/async, facades for embeds), and self-host fonts and libraries where possible."
+    },
+    "unused_code": {
+        "feature_name": "Unused JavaScript and CSS", "category": "Performance",
+        "description": "Measures, with browser coverage recorded during the page load, how much of the downloaded JavaScript and CSS is actually used.",
+        "pros": "Shipping only the code a page needs cuts download, parse and compile time, especially on mobile devices.",
+        "pass_message": "Most of the JavaScript and CSS loaded by the page is used.",
+        "fail_messages": {
+            "unused_javascript": "A large share of the JavaScript downloaded during page load is never executed.",
+            "unused_css": "A large share of the CSS downloaded during page load matches nothing on the page."
+        },
+        "recommendation": "Split JavaScript bundles and lazy-load code that is not needed for the initial view; remove unused CSS rules or load page-specific stylesheets only where they apply."
+    },
     "cdn_usage": {
         "feature_name": "Content Delivery Network (CDN)", "category": "Performance",
         "description": "A CDN is a network of servers distributed globally that deliver content to users based on their geographic location.",
@@ -1403,7 +1442,10 @@ FEATURE_ANALYSIS_MAP = {
         "fail_messages": {
             "image_modern_format_missing": "The page does not use modern image formats like WebP or AVIF, which offer better compression.",
             "images_too_heavy": "The total image payload is large, which can significantly slow down page load time.",
-            "responsive_images_missing": "Images are not responsive; they lack `srcset` or `<picture>` elements to serve different sizes to different devices."
+            "responsive_images_missing": "Images are not responsive; they lack `srcset` or `<picture>` elements to serve different sizes to different devices.",
+            "images_compressible": "Re-encoding the heaviest images (WebP/AVIF or optimized JPEG) would save a significant number of bytes.",
+            "images_oversized": "Some images are served at a much higher resolution than they are displayed at, wasting bandwidth.",
+            "images_lazy_above_fold": "Some images in the initial viewport use loading='lazy', which delays the content visitors see first."
         },
         "recommendation": "Convert images to modern formats (WebP/AVIF), compress them, and use the `srcset` attribute to serve responsive images."
     },
@@ -1430,8 +1472,12 @@ FEATURE_ANALYSIS_MAP = {
         "description": "Identifies scripts and stylesheets that block the browser from rendering the page until they are downloaded and processed.",
         "pros": "Minimizing render-blocking resources is key to achieving a fast First Contentful Paint (FCP).",
         "pass_message": "No significant render-blocking resources were found.",
-        "fail_messages": {"render_blocking_resources": "Render-blocking resources were found, delaying how quickly users can see content."},
-        "recommendation": "Defer non-critical JavaScript using `defer` or `async` attributes, and inline critical CSS needed for above-the-fold content."
+        "fail_messages": {
+            "render_blocking_resources": "Render-blocking resources were found, delaying how quickly users can see content.",
+            "css_import_chain": "Stylesheets load further stylesheets with @import, adding a sequential round trip before the page can render.",
+            "font_display_missing": "Some web fonts have no font-display value, so text stays invisible while they download."
+        },
+        "recommendation": "Defer non-critical JavaScript using `defer` or `async` attributes, inline critical CSS needed for above-the-fold content, replace @import with <link> tags, and add `font-display: swap` to @font-face rules."
     },
     "text_html_ratio": {
         "feature_name": "Text-to-HTML Ratio", "category": "Performance",
@@ -1492,7 +1538,8 @@ FEATURE_ANALYSIS_MAP = {
         "pass_message": "The URL does not have any redirects and loads directly.",
         "fail_messages": {
             "url_has_redirect": "The requested URL redirects. This is acceptable, but direct links are always faster.",
-            "url_has_redirect_chain": "The URL goes through a redirect chain (multiple redirects), which can harm performance and SEO."
+            "url_has_redirect_chain": "The URL goes through a redirect chain (multiple redirects), which can harm performance and SEO.",
+            "internal_links_redirect": "Some internal links point to URLs that redirect. Each one costs crawlers and visitors an extra round trip."
         },
         "recommendation": "If a redirect is present, ensure it's a single 301 (permanent) redirect. Avoid redirect chains by updating all internal links to point directly to the final destination URL."
     },
@@ -1596,6 +1643,8 @@ IMPACT_LEVELS = {
     "sitemap_missing": "Medium", "cdn_missing": "Medium", "open_graph_missing": "Medium",
     "keyword_missing_meta": "Medium", "image_modern_format_missing": "Medium",
     "cache_missing_resources": "Medium", "images_too_heavy": "Medium", "responsive_images_missing": "Medium",
+    "images_oversized": "Medium", "images_lazy_above_fold": "Low", "images_compressible": "Medium",
+    "text_savings_available": "Medium", "third_party_heavy": "Medium", "critical_chain_long": "Medium", "critical_chain_hints_missing": "Low", "unused_javascript": "Medium", "unused_css": "Medium", "css_import_chain": "Medium", "font_display_missing": "Low",
     "meta_refresh_found": "Medium", "custom_404_missing": "Medium",
     "keyword_missing_opening_paragraph": "Medium", "http2_missing": "Medium", "unsafe_links_found": "Medium",
     "url_has_redirect_chain": "Medium", "grammar_issues_found": "Medium",
@@ -1610,6 +1659,7 @@ IMPACT_LEVELS = {
     "charset_missing": "Low",
     "ads_txt_missing": "Low",
     "url_has_redirect": "Low",
+    "internal_links_redirect": "Low",
     "spell_check_error": "Low"
 }
 
@@ -1624,7 +1674,30 @@ def extract_keywords_tfidf(text: str, num_keywords: int = 12) -> list:
     except Exception:
         return []
 
-def generate_seo_report(seo_data: dict, target_keyword: str = "") -> dict:
+def describe_document_timing(timing: dict | None) -> list:
+    """Turns the main-document timing breakdown into report lines, ending with a slow-origin vs slow-network verdict."""
+    if not timing:
+        return []
+    cold = timing.get("cold", {})
+    ttfb = timing.get("ttfb", {})
+    ms = lambda seconds: f"{seconds * 1000:.0f} ms" if seconds is not None else "N/A"
+    lines = [
+        f"DNS lookup: {ms(cold.get('dns'))}",
+        f"TCP connect: {ms(cold.get('connect'))}",
+        f"TLS handshake: {ms(cold.get('tls'))}",
+        f"Server response (TTFB): median {ms(ttfb.get('median'))}, p90 {ms(ttfb.get('p90'))} over {ttfb.get('samples', 0)} sample(s)",
+        f"Content download: median {ms(timing.get('download', {}).get('median'))}",
+    ]
+    # TCP connect is roughly one network round trip; a TTFB far above it is time spent on the server
+    rtt = cold.get("connect") or 0
+    if ttfb.get("median") is not None:
+        if ttfb["median"] - rtt > max(0.3, 2 * rtt):
+            lines.append("Most of the delay is server processing time (slow origin).")
+        else:
+            lines.append("Most of the delay is network latency rather than server processing.")
+    return lines
+
+def generate_seo_report(seo_data: dict, target_keyword: str = "", target_keywords: list | None = None) -> dict:
     report = {
         "url": seo_data.get("url"),
         "overall_score": 100,
@@ -1664,7 +1737,9 @@ def generate_seo_report(seo_data: dict, target_keyword: str = "") -> dict:
     word_count = seo_data.get("word_count", 0)
     if 0 < word_count < 300: findings["word_count_low"] = {"value": word_count}
 
-    body_text = seo_data.get("body_text", "")
+    # readability, keyword and TF-IDF analysis run on the main content; reports
+    # made before main-content extraction only have body_text
+    body_text = seo_data.get("main_text") or seo_data.get("body_text", "")
     flesch_score = None
     if body_text:
         try:
@@ -1682,13 +1757,24 @@ def generate_seo_report(seo_data: dict, target_keyword: str = "") -> dict:
     low_quality_alts = sum(1 for text in image_data.get("alt_texts", []) if text.lower() in ["image", "picture", "graphic", "photo", "alt text", "logo"] or len(text) < 5 or len(text) > 125)
     if low_quality_alts > 0: findings["images_low_quality_alts"] = {"value": low_quality_alts}
 
-    if target_keyword:
-        tk_lower = target_keyword.lower()
-        if tk_lower not in title.lower(): findings["keyword_missing_title"] = {}
-        if tk_lower not in seo_data.get("meta_description", "").lower(): findings["keyword_missing_meta"] = {}
-        if not any(tk_lower in h1.lower() for h1 in h1_list): findings["keyword_missing_h1"] = {}
-        if tk_lower not in body_text[:200].lower(): findings["keyword_missing_opening_paragraph"] = {}
-        if tk_lower not in " ".join(image_data.get("alt_texts", [])).lower(): findings["keyword_missing_alt_text"] = {}
+    keywords = list(dict.fromkeys(([target_keyword] if target_keyword else []) + (target_keywords or [])))
+    keyword_analysis = None
+    if keywords:
+        # every keyword is matched in one pass; the scraper usually did it already
+        keyword_analysis = seo_data.get("keyword_placement") or keyword_placement_test(
+            keywords, title=title if title != "No Title Tag Found" else "",
+            meta_description=meta_desc_text if meta_desc_text != "No Meta Description Found" else "",
+            h1s=h1_list, headings=[h for level in ("h2", "h3", "h4", "h5", "h6") for h in headers.get(level, [])],
+            body_text=body_text, alt_texts=image_data.get("alt_texts", []),
+        )
+        primary = " ".join(keywords[0].split()).lower()
+        if placement := next((k["placement"] for k in keyword_analysis["keywords"] if k["keyword"] == primary), None):
+            others_missing = lambda field: [k for k in keyword_analysis["missing"].get(field, []) if k != primary]
+            for field, finding in (("title", "keyword_missing_title"), ("meta_description", "keyword_missing_meta"),
+                                   ("h1", "keyword_missing_h1"), ("opening_paragraph", "keyword_missing_opening_paragraph"),
+                                   ("alt_text", "keyword_missing_alt_text")):
+                if not placement[field]:
+                    findings[finding] = {"details": others_missing(field)[:10]} if len(keywords) > 1 else {}
 
     # Updated Grammar/Spell Check Findings
     spell_data = seo_data.get("spell_check", {})
@@ -1738,7 +1824,14 @@ def generate_seo_report(seo_data: dict, target_keyword: str = "") -> dict:
         findings["url_has_redirect_chain"] = {"value": f"{len(redirect_chain)} redirects", "details": [f"{r['status_code']} -> {r['url']}" for r in redirect_chain]}
     elif len(redirect_chain) == 1:
         findings["url_has_redirect"] = {"value": "1 redirect", "details": [f"{redirect_chain[0]['status_code']} -> {redirect_chain[0]['url']}"]}
-        spf_check = seo_data.get("spf_record_check", {})
+    redirecting_links = seo_data.get("link_analysis", {}).get("redirecting_links", {})
+    if redirecting_links.get("count"):
+        findings["internal_links_redirect"] = {
+            "value": f"{redirecting_links['count']} internal links redirect",
+            "details": [f"{item['url']} -> {item['final_url']} ({item['hops']} hops)" for item in redirecting_links.get("items", [])[:20]],
+        }
+
+    spf_check = seo_data.get("spf_record_check", {})
     if spf_check.get("status") == "missing":
         findings["spf_record_missing"] = {"value": spf_check.get("error", "No record found.")}
     elif spf_check.get("status") == "error":
@@ -1776,10 +1869,26 @@ def generate_seo_report(seo_data: dict, target_keyword: str = "") -> dict:
     if not snapshot_data or not snapshot_data.get("success"):
         findings["snapshot_failed"] = {"value": snapshot_data.get("error", "Not run") if snapshot_data else "Not run"}
 
+    text_savings = seo_data.get("text_savings") or {}
+    minify_savings = {r["url"]: r["minify_savings_bytes"] for r in text_savings.get("resources", [])}
+
+    def by_minify_savings(urls):
+        # largest measured savings first
+        ranked = sorted(urls, key=lambda u: minify_savings.get(u, 0), reverse=True)
+        return [f"{u} (-{minify_savings[u] / 1024:.1f} KB minified)" if u in minify_savings else u for u in ranked]
+
     if (js_minify := seo_data.get("minification_test", {}).get("js", {})) and js_minify.get("unminified_list"):
-        findings["js_unminified"] = {"value": f"{len(js_minify['unminified_list'])} file(s)", "details": js_minify['unminified_list']}
+        findings["js_unminified"] = {"value": f"{len(js_minify['unminified_list'])} file(s)", "details": by_minify_savings(js_minify['unminified_list'])}
     if (css_minify := seo_data.get("minification_test", {}).get("css", {})) and css_minify.get("unminified_list"):
-        findings["css_unminified"] = {"value": f"{len(css_minify['unminified_list'])} file(s)", "details": css_minify['unminified_list']}
+        findings["css_unminified"] = {"value": f"{len(css_minify['unminified_list'])} file(s)", "details": by_minify_savings(css_minify['unminified_list'])}
+
+    if (text_total := text_savings.get("total_potential_savings_bytes", 0)) > 10 * 1024:
+        candidates = ([text_savings["html"]] if text_savings.get("html") else []) + text_savings.get("resources", [])
+        candidates = sorted((r for r in candidates if r["potential_savings_bytes"] > 0), key=lambda r: r["potential_savings_bytes"], reverse=True)
+        findings["text_savings_available"] = {
+            "value": f"~{text_total / 1024:.1f} KB",
+            "details": [f"{r['url']}: {r['current_transfer_bytes'] / 1024:.1f} KB -> {r['best_transfer_bytes'] / 1024:.1f} KB" for r in candidates[:10]],
+        }
 
     if not seo_data.get("hsts_test", {}).get("status") == "pass":
         findings["hsts_missing"] = {}
@@ -1787,7 +1896,8 @@ def generate_seo_report(seo_data: dict, target_keyword: str = "") -> dict:
     if not seo_data.get("html_compression_test", {}).get("status") == "pass":
         findings["html_compression_missing"] = {}
 
-    if (ttfb := seo_data.get("performance", {}).get("ttfb")) and ttfb > 0.8: findings["ttfb_slow"] = {"value": f"{ttfb:.2f}s"}
+    if (ttfb := seo_data.get("performance", {}).get("ttfb")) and ttfb > 0.8:
+        findings["ttfb_slow"] = {"value": f"{ttfb:.2f}s", "details": describe_document_timing(seo_data.get("performance", {}).get("timing"))}
     if 0 < (text_ratio := seo_data.get("performance", {}).get("text_to_html_ratio", 0)) < 25:
         findings["text_ratio_low"] = {"value": f"{text_ratio:.2f}%"}
     if (html_kb := seo_data.get("html_size_bytes", 0) / 1024) > 150:
@@ -1813,15 +1923,70 @@ def generate_seo_report(seo_data: dict, target_keyword: str = "") -> dict:
     if (image_payload_kb := seo_data.get("resources", {}).get("content_size_by_type", {}).get("image", 0) / 1024) > 500:
         findings["images_too_heavy"] = {"value": f"{image_payload_kb:.1f} KB"}
 
+    recompression = seo_data.get("image_recompression") or {}
+    if (savings := recompression.get("total_savings_bytes", 0)) > 20 * 1024 and savings >= 0.2 * recompression.get("total_original_bytes", 0):
+        findings["images_compressible"] = {
+            "value": f"~{savings / 1024:.1f} KB ({savings / recompression['total_original_bytes'] * 100:.0f}%) at quality {recompression.get('quality')}",
+            "details": [f"{i['url']}: {i['original_bytes'] / 1024:.1f} KB -> {i['best_format']} saves {i['savings_bytes'] / 1024:.1f} KB"
+                        for i in recompression.get("images", []) if i.get("savings_bytes")][:10],
+        }
+
     if rb_count := len(seo_data.get("render_blocking_resources", {}).get("details", [])):
         findings["render_blocking_resources"] = {"value": rb_count}
 
+    chains = seo_data.get("critical_request_chains") or {}
+    hints = [f"preload {c['url']} (as={c['as']})" for c in chains.get("preload_candidates", [])] + \
+            [f"preconnect {c['origin']}" for c in chains.get("preconnect_candidates", [])]
+    if (longest := chains.get("longest_chain")) and len(longest["requests"]) > 2 and longest["latency_ms"] > 1000:
+        findings["critical_chain_long"] = {
+            "value": f"{len(longest['requests'])} requests, {longest['latency_ms']:.0f} ms, {longest['bytes'] / 1024:.1f} KB",
+            "details": [" -> ".join(r["url"] for r in longest["requests"])] + hints,
+        }
+    elif hints:
+        findings["critical_chain_hints_missing"] = {"value": f"{len(hints)} hint(s)", "details": hints}
+
+    third_party = seo_data.get("third_party") or {}
+    if third_party.get("third_party_transfer_bytes", 0) > 500 * 1024 or (third_party.get("third_party_main_thread_ms") or 0) > 250:
+        value = f"{third_party['third_party_requests']} request(s), {third_party['third_party_transfer_bytes'] / 1024:.1f} KB"
+        if third_party.get("third_party_main_thread_ms") is not None:
+            value += f", {third_party['third_party_main_thread_ms']:.0f} ms main thread"
+        findings["third_party_heavy"] = {
+            "value": value,
+            "details": [f"{e['entity']} ({e['category']}): {e['transfer_bytes'] / 1024:.1f} KB"
+                        + (f", {e['main_thread_ms']:.0f} ms" if e["main_thread_ms"] is not None else "") for e in third_party.get("entities", [])[:10]],
+        }
+
+    unused_code = seo_data.get("unused_code_test") or {}
+    for kind, finding in (("js", "unused_javascript"), ("css", "unused_css")):
+        if (summary := unused_code.get(kind)) and summary.get("resources"):
+            findings[finding] = {
+                "value": f"~{summary['unused_bytes'] / 1024:.1f} KB unused ({summary['unused_percent']}%)",
+                "details": [f"{r['url']}: {r['unused_bytes'] / 1024:.1f} KB of {r['total_bytes'] / 1024:.1f} KB unused" for r in summary["resources"][:10]],
+            }
+
+    css_analysis = seo_data.get("css_analysis") or {}
+    if chains := css_analysis.get("import_chains"):
+        findings["css_import_chain"] = {"value": f"{len(chains)} chain(s), up to {max(len(c) for c in chains) - 1} level(s)",
+                                        "details": [" -> ".join(chain) for chain in chains[:10]]}
+    if blocking_fonts := css_analysis.get("font_faces_blocking_text"):
+        findings["font_display_missing"] = {"value": f"{len(blocking_fonts)} @font-face rule(s)",
+                                            "details": list(dict.fromkeys(f"{f['family'] or 'unnamed'} ({f['font_display'] or 'no font-display'})" for f in blocking_fonts))[:10]}
+
     if (disallow_check := seo_data.get("disallow_directive", {})) and not disallow_check.get("is_allowed"):
         findings["url_disallowed"] = {"value": f"Blocked by rule: '{disallow_check.get('blocking_rule')}'"}
 
     if (responsive_issues := seo_data.get("responsive_image_test", {}).get("issues")):
         findings["responsive_images_missing"] = {"value": len(responsive_issues)}
 
+    oversized = seo_data.get("oversized_image_test") or {}
+    if oversized.get("oversized_images"):
+        findings["images_oversized"] = {
+            "value": f"{len(oversized['oversized_images'])} image(s), ~{oversized['total_wasted_bytes'] / 1024:.1f} KB wasted",
+            "details": [f"{i['src']}: {i['natural_size'][0]}x{i['natural_size'][1]} shown at {i['displayed_size'][0]}x{i['displayed_size'][1]}" for i in oversized["oversized_images"][:10]],
+        }
+    if oversized.get("lazy_above_fold_images"):
+        findings["images_lazy_above_fold"] = {"value": len(oversized["lazy_above_fold_images"])}
+
     if not seo_data.get("branding", {}).get("has_favicon"): findings["favicon_missing"] = {}
     if not seo_data.get("branding", {}).get("open_graph_tags"): findings["open_graph_missing"] = {}
     if not seo_data.get("has_google_analytics"): findings["google_analytics_missing"] = {}
@@ -1937,10 +2102,13 @@ def generate_seo_report(seo_data: dict, target_keyword: str = "") -> dict:
         "ttfb_seconds": seo_data.get("performance", {}).get("ttfb"),
         "broken_links": broken_links_count,
         "broken_link_urls": link_data.get("broken_links", {}).get("urls", []),
+        "skipped_link_urls": link_data.get("skipped_links", {}).get("urls", []),
         "total_requests": total_requests,
         "extracted_keywords": extract_keywords_tfidf(body_text),
         **psi_summary
     }
+    if keyword_analysis:
+        report["keyword_analysis"] = keyword_analysis
     return report
 
 def export_to_json(report: dict, filename: str):
@@ -2021,6 +2189,18 @@ def export_to_markdown(report: dict, raw_data: dict, filename: str):
         f.write("#### By Domain\n\n")
         f.write(format_table(domain_header, domain_rows))
 
+        if technologies := (raw_data.get("technologies") or {}).get("technologies"):
+            tech_rows = [[t["name"], t["category"], ", ".join(t["evidence"])] for t in technologies]
+            f.write("#### Detected Technologies\n\n")
+            f.write(format_table(["Technology", "Category", "Evidence"], tech_rows))
+
+        if entities := (raw_data.get("third_party") or {}).get("entities"):
+            entity_header = ["Entity", "Category", "Requests", "Size (KB)", "Main Thread (ms)"]
+            entity_rows = [[e["entity"], e["category"], e["requests"], f"{e['transfer_bytes'] / 1024:.1f}",
+                            f"{e['main_thread_ms']:.0f}" if e["main_thread_ms"] is not None else "-"] for e in entities]
+            f.write("#### By Third-Party Entity\n\n")
+            f.write(format_table(entity_header, entity_rows))
+
 
         f.write("## ⚙️ Detailed Feature Analysis\n\n")
         status_emoji = {"pass": "✅", "fail": "❌", "warning": "⚠️"}
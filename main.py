@@ -2,10 +2,11 @@ import os
 import logging
 from urllib.parse import urlparse
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, Field
 from fastapi.concurrency import run_in_threadpool
 import asyncio
 import sys
+import threading
 if sys.platform == "win32":
     try:
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
@@ -23,6 +24,9 @@ from Features.DirectiveTest import disallow_directive_test
 from Features.MetaRefreshTest import meta_refresh_test
 from Features.ErrorPageTest import error_page_test
 from Features.SpellCheckTest import spell_check_test
+from utils.grammar_cache import grammar_cache
+from utils.timing import DEFAULT_TIMING_SAMPLES
+from utils.languagetool_pool import get_language_tool_pool, shutdown_language_tool_pool
 from Features.ResponsiveImageTest import responsive_image_test
 from Features.ImageRatioTest import image_ratio_test
 from Features.MediaQueryResponsiveTest import media_query_responsive_test
@@ -32,6 +36,7 @@ from Features.MixedContentTest import mixed_content_test
 from Features.MobileSnapTest import mobile_snapshot_test_sync
 from Features.PageSpeedInsightsTest import pagespeed_insights_test
 from Features.RelatedKeywordsTest import related_keywords_test
+from Features.KeywordPlacementTest import MAX_TARGET_KEYWORDS
 import uvicorn
 logging.basicConfig(
     level=logging.INFO,
@@ -41,13 +46,27 @@ logging.basicConfig(
 
 app = FastAPI(title="SEO Scraper/Analyzer API")
 
+@app.on_event("startup")
+def start_language_tool():
+    # the Java servers take seconds to boot; warm them without delaying startup,
+    # early spell checks simply queue until an instance is ready
+    threading.Thread(target=get_language_tool_pool().start, daemon=True).start()
+
+@app.on_event("shutdown")
+def stop_language_tool():
+    shutdown_language_tool_pool()
+
 # Generic request models
 class URLRequest(BaseModel):
     url: HttpUrl
     run_playwright: bool = False
     target_keyword: str | None = None
+    # a whole keyword cluster, analysed in one pass; target_keyword (if set) stays the primary one
+    target_keywords: list[str] | None = Field(default=None, max_length=MAX_TARGET_KEYWORDS)
     validate_real_size: bool = False
     api_key: str | None = None
+    timing_samples: int = DEFAULT_TIMING_SAMPLES
+    collect_coverage: bool = False
 
 class TextRequest(BaseModel):
     text: str
@@ -66,7 +85,10 @@ async def analyze(req: URLRequest):
             run_full_analysis,
             url=str(req.url),
             target_keyword=req.target_keyword,
-            use_playwright=req.run_playwright
+            target_keywords=req.target_keywords,
+            use_playwright=req.run_playwright,
+            timing_samples=req.timing_samples,
+            collect_coverage=req.collect_coverage
         )
 
         if not final_report:
@@ -79,7 +101,8 @@ async def analyze(req: URLRequest):
         logging.exception("An internal error occurred during analysis.")
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
-def run_full_analysis(url: str, target_keyword: str | None, use_playwright: bool) -> dict:
+def run_full_analysis(url: str, target_keyword: str | None, use_playwright: bool, timing_samples: int = DEFAULT_TIMING_SAMPLES, collect_coverage: bool = False,
+                      target_keywords: list[str] | None = None) -> dict:
     # Set the event loop policy *in this thread* before creating a new loop
     if sys.platform == "win32":
         try:
@@ -88,17 +111,20 @@ def run_full_analysis(url: str, target_keyword: str | None, use_playwright: bool
             # Policy might already be set or another issue, but try to continue
             pass
             
+    keywords = list(dict.fromkeys(([target_keyword] if target_keyword else []) + (target_keywords or [])))
     raw_data = asyncio.run(
         extract_seo_data(
             url,
-            target_keywords=[target_keyword] if target_keyword else None,
-            run_playwright=use_playwright
+            target_keywords=keywords or None,
+            run_playwright=use_playwright,
+            timing_samples=timing_samples,
+            collect_coverage=collect_coverage
         )
     )
     if not raw_data:
         return None
 
-    final_report = generate_seo_report(raw_data, target_keyword or "")
+    final_report = generate_seo_report(raw_data, target_keyword or "", target_keywords=keywords)
     return final_report
 
 @app.post("/check/seo_friendly")
@@ -158,6 +184,10 @@ async def check_pagespeed(req: URLRequest):
 async def check_related_keywords(req: KeywordRequest):
     return await run_in_threadpool(related_keywords_test, req.keyword, req.limit or 10)
 
+@app.get("/health")
+def health():
+    return {"status": "ok", "language_tool": get_language_tool_pool().stats(), "grammar_cache": grammar_cache.stats()}
+
 @app.get("/")
 def root():
     return {"message": "SEO Scraper / Analyzer API. Use POST /analyze or POST /check/<tool> to run individual tools."}
@@ -1,5 +1,6 @@
 import sys
 import json
+import time
 import asyncio
 import random
 
@@ -17,12 +18,135 @@ except Exception as e:
     print(json.dumps({"error": f"playwright_import_failed: {e}"}))
     sys.exit(1)
 
+# one round trip for every <img>: intrinsic size, laid-out box, loading hints
+# and the body size the browser recorded for it in resource timing
+IMAGE_LAYOUT_JS = """() => {
+    const sizes = {};
+    for (const entry of (performance.getEntriesByType ? performance.getEntriesByType('resource') : [])) {
+        sizes[entry.name] = {transfer: entry.transferSize || 0, encoded: entry.encodedBodySize || 0};
+    }
+    const vw = window.innerWidth, vh = window.innerHeight;
+    const images = Array.from(document.images).map(img => {
+        const rect = img.getBoundingClientRect();
+        const src = img.currentSrc || img.src;
+        const timing = sizes[src] || {};
+        return {
+            src: src,
+            natural_width: img.naturalWidth, natural_height: img.naturalHeight,
+            rendered_width: rect.width, rendered_height: rect.height,
+            above_fold: rect.width > 0 && rect.height > 0 && rect.bottom > 0 && rect.top < vh && rect.right > 0 && rect.left < vw,
+            loading: img.getAttribute('loading'),
+            has_srcset: img.hasAttribute('srcset'),
+            encoded_bytes: timing.encoded || null,
+            transfer_bytes: timing.transfer || null
+        };
+    });
+    return {device_pixel_ratio: window.devicePixelRatio || 1, viewport: {width: vw, height: vh}, images: images};
+}"""
+
+def redirect_chain_of(response) -> list:
+    """Walks request.redirected_from back from the final navigation response."""
+    chain = []
+    if response is None:
+        return chain
+    request = response.request
+    while request.redirected_from is not None:
+        previous = request.redirected_from
+        status = None
+        try:
+            hop = previous.response()
+            status = hop.status if hop else None
+        except Exception:
+            pass
+        chain.append({"from": previous.url, "url": request.url, "status_code": status})
+        request = previous
+    chain.reverse()
+    return chain
+
+def js_coverage_summary(scripts: list) -> list:
+    """
+    Turns Profiler.takePreciseCoverage block ranges into used/total bytes per
+    script URL. Ranges nest (function, then blocks inside it), so painting them
+    outermost first leaves each byte with the count of its innermost range.
+    """
+    by_url = {}
+    for script in scripts:
+        url = script.get("url") or ""
+        ranges = [r for f in script.get("functions", []) for r in f.get("ranges", [])]
+        if not url or url.startswith(("extensions::", "chrome-extension://")) or not ranges:
+            continue
+        # the script's top-level function spans the whole source
+        length = max(r["endOffset"] for r in ranges)
+        covered = bytearray(length)
+        for r in sorted(ranges, key=lambda r: (r["startOffset"], -r["endOffset"])):
+            size = r["endOffset"] - r["startOffset"]
+            covered[r["startOffset"]:r["endOffset"]] = (b"\x01" if r["count"] else b"\x00") * size
+        entry = by_url.setdefault(url, {"url": url, "total_bytes": 0, "used_bytes": 0})
+        entry["total_bytes"] += length
+        entry["used_bytes"] += length - covered.count(0)
+    return list(by_url.values())
+
+def css_coverage_summary(sheets: dict, rule_usage: list) -> list:
+    """Used/total bytes per stylesheet URL from CSS.stopRuleUsageTracking."""
+    unused = {}
+    for rule in rule_usage:
+        if not rule.get("used"):
+            sheet_id = rule["styleSheetId"]
+            unused[sheet_id] = unused.get(sheet_id, 0) + rule["endOffset"] - rule["startOffset"]
+    by_url = {}
+    for sheet_id, header in sheets.items():
+        url = header.get("sourceURL") or ""
+        length = int(header.get("length") or 0)
+        if not url or not length:
+            continue
+        entry = by_url.setdefault(url, {"url": url, "total_bytes": 0, "used_bytes": 0})
+        entry["total_bytes"] += length
+        entry["used_bytes"] += max(0, length - unused.get(sheet_id, 0))
+    return list(by_url.values())
+
+def script_time_by_url(profile: dict) -> dict:
+    """
+    Main-thread milliseconds per script URL from a sampled CPU profile. Each
+    sample is charged to the nearest frame on its stack that has a URL, so
+    native and builtin calls count towards the script that made them.
+    """
+    nodes = {node["id"]: node for node in profile.get("nodes", [])}
+    parent = {child: node["id"] for node in nodes.values() for child in node.get("children", [])}
+    owner = {}
+
+    def url_of(node_id):
+        if node_id not in owner:
+            url, current = None, node_id
+            while current is not None and not url:
+                url = nodes[current].get("callFrame", {}).get("url") or None
+                current = parent.get(current)
+            owner[node_id] = url
+        return owner[node_id]
+
+    totals = {}
+    for node_id, delta in zip(profile.get("samples", []), profile.get("timeDeltas", [])):
+        if node_id in nodes and (url := url_of(node_id)):
+            totals[url] = totals.get(url, 0.0) + delta / 1000
+    return {url: round(ms, 1) for url, ms in totals.items()}
+
+def initiator_url_of(initiator: dict) -> str | None:
+    """The URL that caused a request: the parsing document/stylesheet or the calling script."""
+    if initiator.get("url"):
+        return initiator["url"]
+    stack = initiator.get("stack")
+    while stack:
+        for frame in stack.get("callFrames", []):
+            if frame.get("url"):
+                return frame["url"]
+        stack = stack.get("parent")
+    return None
+
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
 ]
 
-def run_worker(url: str, timeout: int = 30):
+def run_worker(url: str, timeout: int = 30, collect_coverage: bool = False):
     out = {"error": None}
     
     try:
@@ -45,6 +169,7 @@ def run_worker(url: str, timeout: int = 30):
             # ... rest of your existing code remains the same ...
             console_errors = []
             main_response_data = {}
+            image_content_lengths = {}
 
             def on_response(response):
                 try:
@@ -66,6 +191,11 @@ def run_worker(url: str, timeout: int = 30):
                             main_response_data["headers"] = dict(response.headers)
                         except Exception:
                             main_response_data["headers"] = {}
+                    elif response.request.resource_type == 'image':
+                        # fallback for cross-origin images whose resource timing sizes are hidden
+                        length = response.headers.get("content-length")
+                        if length and length.isdigit():
+                            image_content_lengths[response.url] = int(length)
                 except Exception:
                     pass
 
@@ -79,8 +209,78 @@ def run_worker(url: str, timeout: int = 30):
             page.on("response", on_response)
             page.on("console", on_console)
 
+            # network events with initiator and priority, for the critical request chains
+            network_requests = {}
+
+            def on_request_will_be_sent(event):
+                request = event.get("request", {})
+                if request.get("url", "").startswith("data:"):
+                    return
+                entry = network_requests.get(event["requestId"])
+                if entry is not None and event.get("redirectResponse"):
+                    # a redirect hop keeps its request id; the chain pays for every hop
+                    entry["url"] = request["url"]
+                    return
+                initiator = event.get("initiator", {})
+                network_requests[event["requestId"]] = {
+                    "url": request.get("url"), "type": event.get("type"), "frame_id": event.get("frameId"),
+                    "priority": request.get("initialPriority"),
+                    "initiator_type": initiator.get("type"), "initiator_url": initiator_url_of(initiator),
+                    "start": event.get("timestamp"), "end": None, "encoded_bytes": 0,
+                    "status": None, "from_cache": False, "failed": False,
+                }
+
+            def on_response_received(event):
+                if entry := network_requests.get(event["requestId"]):
+                    response = event.get("response", {})
+                    entry["status"] = response.get("status")
+                    entry["from_cache"] = bool(response.get("fromDiskCache") or response.get("fromServiceWorker"))
+
+            def on_loading_done(event):
+                if entry := network_requests.get(event["requestId"]):
+                    entry["end"] = event.get("timestamp")
+                    entry["encoded_bytes"] = int(event.get("encodedDataLength") or 0)
+                    entry["failed"] = "errorText" in event
+
+            # one CDP session serves the network capture and, optionally, coverage;
+            # both are recorded during the same navigation, never a second load
+            cdp = None
+            coverage_started = False
+            stylesheets = {}
+            try:
+                cdp = context.new_cdp_session(page)
+                cdp.on("Network.requestWillBeSent", on_request_will_be_sent)
+                cdp.on("Network.responseReceived", on_response_received)
+                cdp.on("Network.loadingFinished", on_loading_done)
+                cdp.on("Network.loadingFailed", on_loading_done)
+                cdp.send("Network.enable")
+            except Exception:
+                cdp = None
+            profiling = False
+            if cdp is not None:
+                try:
+                    cdp.send("Profiler.enable")
+                    cdp.send("Profiler.setSamplingInterval", {"interval": 200})
+                    cdp.send("Profiler.start")
+                    profiling = True
+                except Exception:
+                    pass
+            if collect_coverage and cdp is not None:
+                try:
+                    cdp.on("CSS.styleSheetAdded", lambda event: stylesheets.__setitem__(event["header"]["styleSheetId"], event["header"]))
+                    cdp.send("Profiler.startPreciseCoverage", {"callCount": False, "detailed": True})
+                    cdp.send("DOM.enable")
+                    cdp.send("CSS.enable")
+                    cdp.send("CSS.startRuleUsageTracking")
+                    coverage_started = True
+                except Exception:
+                    pass
+
+            redirect_chain = []
+            nav_started = time.monotonic()
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+                nav_response = page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+                redirect_chain = redirect_chain_of(nav_response)
             except Exception as e:
                 rendered_html = ""
                 try:
@@ -133,12 +333,57 @@ def run_worker(url: str, timeout: int = 30):
             except Exception:
                 metrics = {}
 
+            # images still decoding report naturalWidth 0 and have no resource
+            # timing yet, so the layout probe waits for the load event
+            try:
+                remaining = timeout - (time.monotonic() - nav_started)
+                page.wait_for_load_state("load", timeout=max(1.0, remaining) * 1000)
+            except PlaywrightTimeoutError:
+                pass
+
+            image_layout = {}
+            try:
+                image_layout = page.evaluate(IMAGE_LAYOUT_JS)
+                for image in image_layout.get("images", []):
+                    if not image.get("encoded_bytes"):
+                        image["encoded_bytes"] = image_content_lengths.get(image["src"])
+            except Exception:
+                image_layout = {}
+
+            coverage = None
+            if coverage_started:
+                try:
+                    js_coverage = cdp.send("Profiler.takePreciseCoverage").get("result", [])
+                    rule_usage = cdp.send("CSS.stopRuleUsageTracking").get("ruleUsage", [])
+                    coverage = {"js": js_coverage_summary(js_coverage), "css": css_coverage_summary(stylesheets, rule_usage)}
+                except Exception as e:
+                    coverage = {"error": f"coverage_failed: {e}"}
+
+            script_main_thread_ms = {}
+            if profiling:
+                try:
+                    script_main_thread_ms = script_time_by_url(cdp.send("Profiler.stop").get("profile", {}))
+                except Exception:
+                    script_main_thread_ms = {}
+
+            # timestamps become milliseconds since the first request
+            requests_list = [r for r in network_requests.values() if r["start"] is not None]
+            origin_ts = min((r["start"] for r in requests_list), default=0)
+            for request in requests_list:
+                request["start"] = round((request["start"] - origin_ts) * 1000, 1)
+                request["end"] = round((request["end"] - origin_ts) * 1000, 1) if request["end"] is not None else None
+
             browser.close()
             out.update({
+                "network_requests": requests_list,
+                "script_main_thread_ms": script_main_thread_ms,
+                "coverage": coverage,
                 "metrics": metrics,
                 "console_errors": console_errors,
                 "rendered_html": rendered_html,
-                "response": main_response_data
+                "response": main_response_data,
+                "redirect_chain": redirect_chain,
+                "image_layout": image_layout
             })
             print(json.dumps(out), flush=True)
             
@@ -153,4 +398,4 @@ if __name__ == "__main__":
         sys.exit(1)
     url = sys.argv[1]
     timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-    run_worker(url, timeout)
\ No newline at end of file
+    run_worker(url, timeout, collect_coverage="--coverage" in sys.argv[3:])
\ No newline at end of file
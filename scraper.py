@@ -1,8 +1,6 @@
 import json
 import pprint
 import sys
-import socket
-import ssl
 import io
 import asyncio
 import re
@@ -15,15 +13,13 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 from collections import defaultdict
+from contextlib import AsyncExitStack
 from urllib.parse import urljoin, urlparse
-from datetime import datetime
 import os
 import asyncio
 from fastapi.concurrency import run_in_threadpool
 from bs4 import BeautifulSoup
-from requests import Session, exceptions
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from requests import exceptions
 from dotenv import load_dotenv
 from Features.seo_friendly import seo_friendly_url_test
 from Features.DirectiveTest import disallow_directive_test
@@ -31,17 +27,37 @@ from Features.MetaRefreshTest import meta_refresh_test
 from Features.ErrorPageTest import error_page_test
 from Features.SpellCheckTest import spell_check_test
 from Features.ResponsiveImageTest import responsive_image_test
-from Features.ImageRatioTest import image_ratio_test
+from Features.ImageRatioTest import image_ratio_test, image_source_urls
+from Features.OversizedImageTest import oversized_image_test
+from Features.UnusedCodeTest import unused_code_test
+from Features.CriticalRequestChainTest import critical_request_chain_test
 from Features.MediaQueryResponsiveTest import media_query_responsive_test
 from Features.MixedContentTest import mixed_content_test
 from Features.MinificationTest import minification_test
 from Features.RelatedKeywordsTest import related_keywords_test
+from Features.KeywordPlacementTest import keyword_placement_test
 from Features.PageSpeedInsightsTest import pagespeed_insights_test
 from Features.HSTSHeaderTest import hsts_header_test
 from Features.HTMLCompressionTest import html_compression_test
 from Features.MobileSnapTest import mobile_snapshot_test_sync
 
 from utils.async_helper import check_urls_async,get_url_headers_async
+from utils.http_policy import build_session
+from utils.tls_probe import probe_tls
+from utils.timing import measure_document_timing, DEFAULT_TIMING_SAMPLES
+from utils.redirects import redirect_graph
+from utils.site_files import probe_site_files
+from utils.dns_lookup import check_email_dns
+from utils.image_probe import probe_image_sizes
+from utils.image_recompress import estimate_image_savings, DEFAULT_RECOMPRESS_IMAGES
+from utils.resource_store import ResourceStore
+from utils.text_savings import estimate_text_savings
+from utils.third_party import third_party_breakdown
+from utils.tech_detector import detect_technologies
+from utils.css_engine import parse_stylesheet, expand_imports, import_chains, analyze_stylesheets
+from utils.link_cache import normalize_url, get_link_cache
+from utils.link_checker import LinkChecker, SKIPPED_STATUS
+from utils.main_content import extract_main_content, get_template_learner
 
 load_dotenv()
 try:
@@ -62,18 +78,11 @@ USER_AGENTS = [
 ]
 
 #maps http respponse headers to there correspondng cdn providers
-CDN_HEADERS = {
-    "cf-ray": "Cloudflare", "cf-cache-status": "Cloudflare",
-    "x-amz-cf-id": "Amazon CloudFront", "x-amz-cf-pop": "Amazon CloudFront",
-    "x-served-by": "Fastly", "x-cache": "Fastly",
-    "x-akamai-transformed": "Akamai",
-    "x-sp-cache": "StackPath", "x-ec-cache": "Edgecast", "server": "Google Frontend"
-}
 #combining playwright asyncio with processpoolexecutor causes issues on windows
 #to avoid this we run playwright in a separate python process using subprocess
-def collect_browser_data_with_playwright(url: str, timeout: int = 30):
+def collect_browser_data_with_playwright(url: str, timeout: int = 30, collect_coverage: bool = False):
     worker = os.path.join(os.path.dirname(__file__), "playwright_worker.py")
-    cmd = [sys.executable, "-u", worker, url, str(timeout)]
+    cmd = [sys.executable, "-u", worker, url, str(timeout)] + (["--coverage"] if collect_coverage else [])
     try:
         proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + 15)
     except subprocess.TimeoutExpired:
@@ -98,28 +107,10 @@ def collect_browser_data_with_playwright(url: str, timeout: int = 30):
 
     return data
 
-def get_ssl_info(hostname: str, port: int = 443, timeout: int = 5):
-    try:
-        ctx = ssl.create_default_context()
-        with socket.create_connection((hostname, port), timeout=timeout) as sock:
-            with ctx.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert = ssock.getpeercert()
-                expires = datetime.strptime(cert.get("notAfter"), "%b %d %H:%M:%S %Y %Z")
-                days_left = (expires - datetime.utcnow()).days
-                return {
-                    "days_to_expiry": days_left,
-                    "issuer": cert.get("issuer", ()),
-                    "subjectAltName": cert.get("subjectAltName", ()),
-                }
-    except Exception:
-        return None
-
-async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bool = False,link_check_limit:int =30, resource_check_limit: int = 120, timeout: int = 60) -> dict | None:
-    session = Session()
-    retries = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retries)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
+async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bool = False,link_check_limit:int | None = None, resource_check_limit: int = 120, timeout: int = 60, timing_samples: int = DEFAULT_TIMING_SAMPLES, image_recompress_limit: int = DEFAULT_RECOMPRESS_IMAGES, collect_coverage: bool = False) -> dict | None:
+    # retries, back-off and circuit breaking come from the shared per-host policy,
+    # each request (with its retries) bounded by the audit timeout
+    session = build_session(request_budget_seconds=timeout)
     session.headers.update({
         'User-Agent': random.choice(USER_AGENTS),
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -129,14 +120,24 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
 
     playwright_data = {}
     response_headers = {}
+    document_url = url
+    redirect_chain = []
     ttfb = None
     html_size_bytes = 0
+    html_body = b""
     http_version = "unknown"
 
+    # SPF/DMARC only depend on the host name, so the lookups start now and
+    # resolve while the page itself is being fetched
+    email_dns_task = asyncio.create_task(check_email_dns(urlparse(url).hostname or ""))
+    audit_resources = AsyncExitStack()
+
     try:
         if run_playwright:
             logging.info("... Running headless browser to render JavaScript ...")
-            playwright_data = collect_browser_data_with_playwright(url, timeout=timeout)
+            playwright_data = await asyncio.get_event_loop().run_in_executor(
+                None, collect_browser_data_with_playwright, url, timeout, collect_coverage
+            )
             if not playwright_data or not playwright_data.get("rendered_html"):
                 logging.error("Error: Playwright failed to fetch rendered HTML.")
                 return None
@@ -146,15 +147,29 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
             response_headers = {k.lower(): v for k, v in response_data.get("headers", {}).items()}
             ttfb_ms = response_data.get("ttfb_ms")
             ttfb = ttfb_ms / 1000 if ttfb_ms is not None else None
-            html_size_bytes = len(playwright_data["rendered_html"].encode('utf-8'))
+            html_body = playwright_data["rendered_html"].encode('utf-8')
+            html_size_bytes = len(html_body)
             http_version = "2.0" if response_data.get('http_version') else "1.1" # Simplified for playwright
+            redirect_chain = playwright_data.get("redirect_chain", [])
+            for hop in redirect_chain:
+                redirect_graph.add(hop["from"], hop["status_code"], hop["url"])
+            if redirect_chain:
+                document_url = redirect_chain[-1]["url"]
         else:
-            response = session.get(url, timeout=15, stream=True)
-            response.raise_for_status()
+            def fetch_document():
+                r = session.get(url, timeout=15, stream=True)
+                r.raise_for_status()
+                r.content  # read the body off the event loop too
+                return r
+
+            response = await asyncio.get_event_loop().run_in_executor(None, fetch_document)
             soup = BeautifulSoup(response.text, "lxml")
             response_headers = {k.lower(): v for k, v in response.headers.items()}
             ttfb = response.elapsed.total_seconds()
-            html_size_bytes = len(response.content)
+            document_url = response.url
+            redirect_chain = redirect_graph.record(response)
+            html_body = response.content
+            html_size_bytes = len(html_body)
             http_version_code = response.raw.version
             if http_version_code == 10: http_version = "1.0"
             elif http_version_code == 11: http_version = "1.1"
@@ -163,13 +178,14 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
 
         seo_data = {
             "url": url, "title": "No Title Tag Found", "meta_description": "No Meta Description Found",
-            "meta_robots": "Not Found", "canonical": "", "word_count": 0, "body_text": "", "structured_data": {},
-            "performance": {"ttfb": ttfb, "has_viewport": False, "is_https": False, "text_to_html_ratio": 0.0, "http_version": http_version},
-            "site_files": {"has_robots_txt": False, "has_sitemap": False},
+            "meta_robots": "Not Found", "canonical": "", "word_count": 0, "body_text": "", "main_text": "", "main_content": None, "structured_data": {},
+            "performance": {"ttfb": ttfb, "timing": None, "has_viewport": False, "is_https": False, "text_to_html_ratio": 0.0, "http_version": http_version},
+            "site_files": {"has_robots_txt": False, "has_sitemap": False, "has_ads_txt": False, "has_security_txt": False, "has_favicon_ico": False},
             "branding": {"has_favicon": False, "open_graph_tags": {}},
             "image_analysis": {"count": 0, "missing_alt_count": 0, "alt_texts": []},
             "h1": [], "headers": defaultdict(list),
-            "link_analysis": {"internal_links": {"count": 0, "urls": []}, "external_links": {"count": 0, "urls": []}, "broken_links": {"count": 0, "urls": []}},
+            "link_analysis": {"internal_links": {"count": 0, "urls": []}, "external_links": {"count": 0, "urls": []}, "broken_links": {"count": 0, "urls": []}, "redirecting_links": {"count": 0, "items": []}, "skipped_links": {"count": 0, "urls": []}},
+            "redirect_chain": redirect_chain,
             "response_headers": response_headers, "html_size_bytes": html_size_bytes, "dom_nodes": 0,
             "charset": None, "deprecated_tags": {}, "has_google_analytics": False,
             "resources": {"items": [], "content_size_by_type": {}, "requests_by_type": {}},
@@ -183,6 +199,7 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
             "error_page_test": None, "spell_check": None, "responsive_image_test": None, "image_ratio_test": None,
             "media_query_responsive_test": None, "mobile_snapshot_test": None, "minification_test": None,
             "related_keyword_test": None, "pagespeed_insights": None, "hsts_test": None, "html_compression_test": None,
+            "spf_record_check": None, "oversized_image_test": None, "image_recompression": None, "text_savings": None, "css_analysis": None, "unused_code_test": None, "critical_request_chains": None, "third_party": None, "technologies": None, "keyword_placement": None,
         }
 
         if run_playwright and playwright_data.get("error"):
@@ -200,28 +217,6 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
         if soup.find("meta", {"name": "viewport"}): seo_data["performance"]["has_viewport"] = True
         if meta_robots := soup.find("meta", {"name": "robots"}): seo_data["meta_robots"] = meta_robots.get("content", "Not Found")
 
-        robots_txt_content = None
-        sitemap_url_from_robots = None
-        try:
-            robots_res = session.get(f"{base_url}/robots.txt", timeout=6)
-            if robots_res.status_code == 200:
-                seo_data["site_files"]["has_robots_txt"] = True
-                robots_txt_content = robots_res.text
-                match = re.search(r"Sitemap:\s*(.*)", robots_txt_content, re.IGNORECASE)
-                if match:
-                    sitemap_url_from_robots = match.group(1).strip()
-        except exceptions.RequestException as e:
-            logging.warning(f"Could not fetch robots.txt: {e}")
-
-
-        try:
-            sitemap_to_check = sitemap_url_from_robots if sitemap_url_from_robots else f"{base_url}/sitemap.xml"
-            sitemap_res = session.head(sitemap_to_check, timeout=6)
-            if sitemap_res.status_code == 200:
-                seo_data["site_files"]["has_sitemap"] = True
-        except exceptions.RequestException:
-            pass 
-
         if soup.find("link", rel=lambda x: x and x.lower() in ["icon", "shortcut icon"]):
             seo_data["branding"]["has_favicon"] = True
         for tag in soup.find_all("meta", property=lambda x: x and x.startswith("og:")):
@@ -229,9 +224,14 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
                 seo_data["branding"]["open_graph_tags"][prop] = tag.get("content", "")
 
         if soup.body:
-            body_text = soup.body.get_text(separator=" ", strip=True)
+            # NLP stages and the word count use main_text; nav, menus and
+            # footers stay in body_text for the page-wide checks
+            content = extract_main_content(soup, page_url=document_url, host=urlparse(document_url).netloc, learner=get_template_learner())
+            body_text = content.pop("body_text")
             seo_data["body_text"] = body_text
-            seo_data["word_count"] = len(body_text.split())
+            seo_data["main_text"] = content.pop("main_text")
+            seo_data["main_content"] = content
+            seo_data["word_count"] = content["main_word_count"]
             if html_size_bytes > 0: seo_data["performance"]["text_to_html_ratio"] = (len(body_text.encode('utf-8')) / html_size_bytes) * 100
             
             found_emails = re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", body_text)
@@ -258,14 +258,6 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
         
         seo_data["dom_nodes"] = len(soup.find_all(True))
         
-        ga_present = False
-        for script in soup.find_all("script"):
-            combined = (script.get("src", "") or "") + (script.string or "")
-            if re.search(r"google-analytics\.com|googletagmanager\.com|gtag\(|ga\(", combined, re.I):
-                ga_present = True
-                break
-        seo_data["has_google_analytics"] = ga_present
-        
         deprecated_tags_list = ["center", "font", "marquee", "bgsound", "blink"]
         seo_data["deprecated_tags"] = {tag: len(soup.find_all(tag)) for tag in deprecated_tags_list if soup.find(tag)}
 
@@ -288,14 +280,48 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
         
         unique_resource_urls = sorted(list(set(resource_urls)))
         
+        # the link checker is bounded per host and globally, so every link can be checked
+        links_to_check = unique_links if link_check_limit is None else unique_links[:link_check_limit]
+
+        async def _probe_tls():
+            if parsed_url.scheme != "https":
+                return None
+            return await probe_tls(parsed_url.hostname, port=parsed_url.port or 443)
+
+        # one checker for every request of the audit, so its per-host concurrency
+        # and rate limits hold across links, resources, site files and images
+        audit_checker = await audit_resources.enter_async_context(LinkChecker(timeout=10, cache=get_link_cache()))
+
         async def _gather_async_data():
             results = await asyncio.gather(
-                check_urls_async(unique_links[:link_check_limit], per_request_timeout=10),
-                get_url_headers_async(unique_resource_urls[:resource_check_limit], per_request_timeout=10)
+                check_urls_async(links_to_check, checker=audit_checker),
+                get_url_headers_async(unique_resource_urls[:resource_check_limit], checker=audit_checker),
+                _probe_tls(),
+                probe_site_files(base_url, checker=audit_checker),
+                probe_image_sizes(image_source_urls(url, soup)[:resource_check_limit], checker=audit_checker),
+                measure_document_timing(document_url, samples=timing_samples, headers={"User-Agent": session.headers["User-Agent"]})
             )
             return results
 
-        link_statuses, resource_details = await _gather_async_data()
+        link_statuses, resource_details, tls_info, site_files, image_sizes, document_timing = await _gather_async_data()
+
+        try:
+            seo_data["spf_record_check"] = await email_dns_task
+        except Exception as e:
+            logging.warning(f"SPF/DMARC lookup failed: {e}")
+            seo_data["spf_record_check"] = {"status": "error", "error": str(e)}
+
+        robots_txt_content, robots_txt_status = site_files["robots_txt_content"], site_files["robots_txt_status"]
+        seo_data["site_files"].update({k: v for k, v in site_files.items() if k not in ("robots_txt_content", "robots_txt_status")})
+        if site_files["has_favicon_ico"]:
+            # browsers request /favicon.ico on their own, so it counts without a <link> tag
+            seo_data["branding"]["has_favicon"] = True
+
+        if document_timing:
+            seo_data["performance"]["timing"] = document_timing
+            # median request->first-byte time over the samples, instead of one mixed-phase number
+            if (ttfb_median := document_timing["ttfb"]["median"]) is not None:
+                seo_data["performance"]["ttfb"] = ttfb_median
         
         for link in unique_links:
             if urlparse(link).netloc == parsed_url.netloc:
@@ -305,11 +331,25 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
                 seo_data["link_analysis"]["external_links"]["count"] += 1
                 seo_data["link_analysis"]["external_links"]["urls"].append(link)
 
-        broken_links = [url for url, status in link_statuses if status is None or status >= 400]
+        skipped_links = [url for url, status in link_statuses if status == SKIPPED_STATUS]
+        broken_links = [url for url, status in link_statuses if status != SKIPPED_STATUS and (status is None or status >= 400)]
         if broken_links:
             seo_data["link_analysis"]["broken_links"] = {"count": len(broken_links), "urls": broken_links}
+        # hosts that kept failing are not requested again; their links are neither broken nor verified
+        seo_data["link_analysis"]["skipped_links"] = {"count": len(skipped_links), "urls": skipped_links}
+
+        # the link checks recorded every hop they followed, so internal links that
+        # redirect can be resolved to their final target without re-requesting them
+        redirecting_links = []
+        for link in seo_data["link_analysis"]["internal_links"]["urls"]:
+            resolved = redirect_graph.resolve(link)
+            if resolved["chain"]:
+                redirecting_links.append({
+                    "url": link, "final_url": resolved["final_url"],
+                    "hops": len(resolved["chain"]), "chain": resolved["chain"],
+                })
+        seo_data["link_analysis"]["redirecting_links"] = {"count": len(redirecting_links), "items": redirecting_links}
         
-        detected_cdns = {cdn for header, cdn in CDN_HEADERS.items() if header in response_headers}
         content_size_by_type = defaultdict(int)
         requests_by_type = defaultdict(int)
 
@@ -317,9 +357,6 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
             resource_item = {"url": details["url"]}
             status_code = details.get("status")
             if status_code is not None and status_code < 400:
-                for header, cdn in CDN_HEADERS.items():
-                    if header in details.get("headers", {}): detected_cdns.add(cdn)
-                
                 ct = details.get("content_type") or ""
                 if "javascript" in ct: r_type = "js"
                 elif "css" in ct: r_type = "css"
@@ -327,20 +364,83 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
                 else: r_type = "other"
 
                 requests_by_type[r_type] += 1
+                resource_item["type"] = r_type
                 if length := details.get("content_length"):
                     content_size_by_type[r_type] += length
                 
                 resource_item.update(details) 
             seo_data["resources"]["items"].append(resource_item)
 
-        seo_data["cdn_providers"] = list(detected_cdns)
+        # one scan of the document plus indexed header/cookie/generator lookups
+        generator = soup.find("meta", attrs={"name": "generator"})
+        cookie_names = [cookie.name for cookie in session.cookies]
+        cookie_names += re.findall(r"(?:^|[\n,]\s*)([^=;,\s]+)=", response_headers.get("set-cookie", ""))
+        seo_data["technologies"] = detect_technologies(
+            html_body.decode("utf-8", errors="replace"),
+            headers=response_headers,
+            resource_headers=[d["headers"] for d in resource_details if d.get("headers") and (d.get("status") or 500) < 400],
+            cookies=cookie_names,
+            meta_generator=generator.get("content") if generator else None,
+        )
+        detected = {tech["name"] for tech in seo_data["technologies"]["technologies"]}
+        seo_data["has_google_analytics"] = bool(detected & {"Google Analytics", "Google Tag Manager"})
+        seo_data["cdn_providers"] = seo_data["technologies"]["by_category"].get("cdn", [])
         seo_data["resources"]["content_size_by_type"] = dict(content_size_by_type)
         seo_data["resources"]["requests_by_type"] = dict(requests_by_type)
+        seo_data["third_party"] = third_party_breakdown(
+            document_url, seo_data["resources"]["items"],
+            network_requests=playwright_data.get("network_requests"),
+            script_main_thread_ms=playwright_data.get("script_main_thread_ms"),
+        )
+
+        # re-encoding is CPU-bound and runs in a process pool; only the heaviest
+        # raster images are worth it
+        heaviest_images = sorted(
+            (r for r in seo_data["resources"]["items"]
+             if r.get("type") == "image" and r.get("content_length") and "svg" not in (r.get("content_type") or "")),
+            key=lambda r: r["content_length"], reverse=True,
+        )[:image_recompress_limit]
+        # every CSS/JS body is fetched once, concurrently, together with the image
+        # recompression stage; the text-based tests below read them from the store
+        resource_store = ResourceStore(checker=audit_checker)
+        text_resource_urls = [
+            r["url"] for r in seo_data["resources"]["items"]
+            if r.get("type") in ("css", "js") or (r.get("type") is None and r["url"].lower().endswith(".css"))
+        ]
+        _, seo_data["image_recompression"] = await asyncio.gather(
+            resource_store.fetch_all(text_resource_urls),
+            estimate_image_savings([r["url"] for r in heaviest_images], checker=audit_checker) if heaviest_images else asyncio.sleep(0),
+        )
+        # @import targets are only known once the stylesheets are parsed
+        css_urls = [
+            r["url"] for r in seo_data["resources"]["items"]
+            if r.get("type") == "css" or (r.get("type") is None and r["url"].lower().endswith(".css"))
+        ]
+        css_imports = await expand_imports(resource_store, css_urls)
+        seo_data["text_savings"] = await estimate_text_savings(
+            resource_store, seo_data["resources"]["items"], html=html_body, html_encoding=response_headers.get("content-encoding")
+        )
+        inline_styles = [tag.string for tag in soup.find_all("style") if tag.string]
+        seo_data["css_analysis"] = analyze_stylesheets(resource_store, css_imports, css_urls, inline_styles)
 
         if head_tag := soup.find("head"):
             for link in head_tag.find_all("link", rel="stylesheet"):
-                if href := link.get("href"):
-                    seo_data["render_blocking_resources"]["details"].append({"type": "css", "url": urljoin(url, href)})
+                media = (link.get("media") or "all").strip().lower()
+                # print/speech sheets are downloaded without blocking the first paint
+                if not (href := link.get("href")) or link.has_attr("disabled") or media in ("print", "speech"):
+                    continue
+                sheet_url = urljoin(url, href)
+                seo_data["render_blocking_resources"]["details"].append({"type": "css", "url": sheet_url})
+                seo_data["render_blocking_resources"]["found"] = True
+                # each @import is discovered only after its parent arrives: one more round trip per level
+                for chain in import_chains(css_imports, sheet_url):
+                    for parent, imported in zip(chain, chain[1:]):
+                        item = {"type": "css-import", "url": imported, "imported_by": parent}
+                        if item not in seo_data["render_blocking_resources"]["details"]:
+                            seo_data["render_blocking_resources"]["details"].append(item)
+            for style_tag in head_tag.find_all("style"):
+                for imported in parse_stylesheet(style_tag.string or "").imports:
+                    seo_data["render_blocking_resources"]["details"].append({"type": "css-import", "url": urljoin(url, imported["url"]), "imported_by": "inline"})
                     seo_data["render_blocking_resources"]["found"] = True
             for script in head_tag.find_all("script", src=True):
                 if not script.has_attr("defer") and not script.has_attr("async"):
@@ -348,35 +448,67 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
                         seo_data["render_blocking_resources"]["details"].append({"type": "script", "url": urljoin(url, src)})
                         seo_data["render_blocking_resources"]["found"] = True
         
-        if parsed_url.scheme == "https":
-            seo_data["ssl"] = get_ssl_info(parsed_url.hostname, port=parsed_url.port or 443)
+        if tls_info:
+            seo_data["ssl"] = tls_info
+            # ALPN is what a browser would negotiate; requests itself never speaks HTTP/2
+            if tls_info.get("alpn_protocol") == "h2":
+                seo_data["performance"]["http_version"] = "2.0"
         
         try:
             host = parsed_url.netloc
             alt_host = f"www.{host}" if not host.startswith("www.") else host[4:]
-            r1 = session.head(f"{parsed_url.scheme}://{host}", timeout=8, allow_redirects=True, verify=False)
-            r2 = session.head(f"{parsed_url.scheme}://{alt_host}", timeout=8, allow_redirects=True, verify=False)
-            seo_data["canonicalization_check"] = {"base_url_final": r1.url, "alt_url_final": r2.url, "consistent": r1.url == r2.url}
+
+            def resolve_final(start_url):
+                # reuse memoized hops when this host variant was already followed
+                if (final := redirect_graph.final_url(start_url)) is not None:
+                    return final, redirect_graph.resolve(start_url)["chain"]
+                r = session.head(start_url, timeout=8, allow_redirects=True, verify=False)
+                return r.url, redirect_graph.record(r)
+
+            base_final, base_chain = resolve_final(f"{parsed_url.scheme}://{host}/")
+            alt_final, alt_chain = resolve_final(f"{parsed_url.scheme}://{alt_host}/")
+            seo_data["canonicalization_check"] = {
+                "base_url_final": base_final, "alt_url_final": alt_final,
+                "base_redirect_chain": base_chain, "alt_redirect_chain": alt_chain,
+                "consistent": normalize_url(base_final) == normalize_url(alt_final),
+            }
         except Exception as e:
             logging.error(f"Canonicalization check failed: {e}")
             seo_data["canonicalization_check"] = {"error": "Failed to check canonicalization.", "consistent": False}
 
 
         if target_keywords:
-            seo_data["related_keywords_test"] = related_keywords_test(body_text=seo_data["body_text"], target_keyword=target_keywords[0])
+            # semantic similarity is per keyword and expensive, so it stays on the primary keyword
+            seo_data["related_keywords_test"] = related_keywords_test(body_text=seo_data["main_text"], target_keyword=target_keywords[0])
             seo_data["seo_friendly_url"] = seo_friendly_url_test(url, keywords=target_keywords)
+            seo_data["keyword_placement"] = keyword_placement_test(
+                target_keywords,
+                title=seo_data["title"] if seo_data["title"] != "No Title Tag Found" else "",
+                meta_description=seo_data["meta_description"] if seo_data["meta_description"] != "No Meta Description Found" else "",
+                h1s=seo_data["h1"],
+                headings=[h for level in ("h2", "h3", "h4", "h5", "h6") for h in seo_data["headers"].get(level, [])],
+                body_text=seo_data["main_text"], alt_texts=seo_data["image_analysis"]["alt_texts"],
+                url_path=urlparse(document_url).path,
+            )
         
-        seo_data["disallow_directive"] = disallow_directive_test(url=url, robots_txt_content=robots_txt_content)
+        seo_data["disallow_directive"] = disallow_directive_test(url=url, robots_txt_content=robots_txt_content, session=session,
+                                                               robots_txt_status=robots_txt_status)
         seo_data["meta_refresh"] = meta_refresh_test(soup)
-        seo_data["error_page_test"] = error_page_test(url)
-        seo_data["spell_check"] = spell_check_test(seo_data["body_text"])
+        seo_data["error_page_test"] = error_page_test(url, session=session)
+        # waits for a free LanguageTool instance, so it must not block the event loop
+        seo_data["spell_check"] = await asyncio.to_thread(spell_check_test, seo_data["main_text"])
         seo_data["responsive_image_test"] = responsive_image_test(soup)
-        seo_data["image_ratio_test"] = image_ratio_test(url, soup)
-        seo_data["media_query_responsive_test"] = media_query_responsive_test(soup, seo_data["resources"]["items"], session)
+        seo_data["image_ratio_test"] = image_ratio_test(url, soup, real_sizes=image_sizes)
+        if run_playwright:
+            seo_data["oversized_image_test"] = oversized_image_test(playwright_data.get("image_layout"))
+            seo_data["critical_request_chains"] = critical_request_chain_test(playwright_data.get("network_requests") or [], soup, document_url)
+            if collect_coverage:
+                seo_data["unused_code_test"] = unused_code_test(playwright_data.get("coverage"))
+        seo_data["media_query_responsive_test"] = media_query_responsive_test(soup, seo_data["resources"]["items"], resource_store, import_graph=css_imports)
         seo_data["mixed_content_test"] = mixed_content_test(is_https=seo_data["performance"]["is_https"], resources=seo_data["resources"]["items"])
-        seo_data["minification_test"] = minification_test(resources=seo_data["resources"]["items"], session=session)
+        seo_data["minification_test"] = minification_test(resources=seo_data["resources"]["items"], store=resource_store)
         seo_data["hsts_test"] = hsts_header_test(response_headers)
-        seo_data["html_compression_test"] = html_compression_test(response_headers, html_size_bytes)
+        seo_data["html_compression_test"] = html_compression_test(response_headers, html_size_bytes, savings=seo_data["text_savings"]["html"])
 
 
         if run_playwright:
@@ -409,4 +541,11 @@ async def extract_seo_data(url: str,target_keywords:list=None,run_playwright: bo
     except Exception as e:
         logging.exception(f"An error occurred during parsing: {e}")
         return None
+    finally:
+        # early returns never await the SPF/DMARC lookup
+        if not email_dns_task.done():
+            email_dns_task.cancel()
+        elif not email_dns_task.cancelled():
+            email_dns_task.exception()  # marks a failed lookup as retrieved
+        await audit_resources.aclose()
 
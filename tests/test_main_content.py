@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from utils.main_content import extract_main_content
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def test_article_inside_wrapper_named_after_sidebar_is_kept():
+    soup = BeautifulSoup((FIXTURES / "main_content_sidebar_wrapper.html").read_text(), "html.parser")
+    result = extract_main_content(soup)
+
+    assert "prune most garden roses" in result["main_text"]
+    assert "outward facing bud" in result["main_text"]
+    assert result["main_word_count"] > 0.6 * result["body_word_count"]
+    # the real chrome is still dropped
+    assert "Popular posts" not in result["main_text"]
+    assert "Copyright" not in result["main_text"]
+    assert "Share:" not in result["main_text"]
@@ -1,38 +1,45 @@
 import asyncio
-import httpx
+from contextlib import nullcontext
+from utils.link_checker import LinkChecker
+from utils.link_cache import get_link_cache
 
-async def check_urls_async(urls_to_check: list, timeout: int = 8):
+async def check_urls_async(urls_to_check: list, timeout: int = 8, use_cache: bool = True, checker: LinkChecker | None = None, **limits):
+    """
+    Checks every URL with a HEAD request through the bounded LinkChecker.
+    Statuses already in the shared link cache are returned without a request.
+    Extra keyword arguments (max_concurrency, per_host_concurrency,
+    requests_per_second) are passed through to the checker. Pass the audit's
+    `checker` to share its per-host limits; its own cache setting then applies.
+    """
     results = []
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        tasks = [client.head(url) for url in urls_to_check]
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for url, response in zip(urls_to_check, responses):
-            if isinstance(response, httpx.Response):
-                results.append((url, response.status_code))
-            else:
-                results.append((url, None))
-                
+    cache = get_link_cache() if use_cache else None
+    async with nullcontext(checker) if checker is not None else LinkChecker(timeout=timeout, cache=cache, **limits) as checker:
+        async for url, status in checker.stream(urls_to_check):
+            results.append((url, status))
     return results
 
-async def get_url_headers_async(urls_to_check: list, timeout: int = 8):
+async def get_url_headers_async(urls_to_check: list, timeout: int = 8, checker: LinkChecker | None = None, **limits):
     """
-    Performs an async HEAD request on each URL and returns detailed header info.
+    Probes each URL (HEAD, or a ranged GET where HEAD is unreliable) and
+    returns detailed header info.
     """
     results = []
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        
+    async with nullcontext(checker) if checker is not None else LinkChecker(timeout=timeout, **limits) as checker:
+
         async def fetch_headers(url):
             try:
-                response = await client.head(url)
+                probe = await checker.probe(url, need_size=True)
+                headers = probe["headers"]
                 # Return a dictionary with the data we need
                 return {
                     "url": url,
-                    "status": response.status_code,
-                    "content_type": response.headers.get("Content-Type"),
-                    "content_length": int(response.headers.get("Content-Length", 0)),
-                    "cache_control": response.headers.get("Cache-Control"),
-                    "content_encoding": response.headers.get("Content-Encoding"),
+                    "status": probe["status"],
+                    "content_type": headers.get("Content-Type"),
+                    "content_length": probe["content_length"] or 0,
+                    "cache_control": headers.get("Cache-Control"),
+                    "content_encoding": headers.get("Content-Encoding"),
+                    "probe_method": probe["method"],
+                    "headers": {k.lower(): v for k, v in headers.items()},
                     "error": None
                 }
             except Exception as e:
@@ -41,5 +48,5 @@ async def get_url_headers_async(urls_to_check: list, timeout: int = 8):
 
         tasks = [fetch_headers(url) for url in urls_to_check]
         results = await asyncio.gather(*tasks)
-        
-    return results
\ No newline at end of file
+
+    return results
@@ -0,0 +1,241 @@
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import urljoin
+
+PARSED_CSS_CACHE_MAX_ENTRIES = 512
+MAX_IMPORT_DEPTH = 4
+# browsers resolve em/rem in media queries against the initial 16px font size
+MEDIA_EM_PX = 16
+
+_TOKEN = re.compile(r"""/\*.*?\*/|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[{};]|[^{};"'/]+|/""", re.S)
+_IMPORT = re.compile(r"""@import\s+(?:url\(\s*["']?([^"')]+?)["']?\s*\)|["']([^"']+)["'])\s*(.*)$""", re.I | re.S)
+_BREAKPOINT = re.compile(r"(?:(?:min|max)-width\s*:\s*|width\s*[<>]=?\s*)([\d.]+)(px|em|rem)\b", re.I)
+_SPACE = re.compile(r"\s+")
+
+# at-rules whose blocks contain ordinary rules
+_GROUPING_AT_RULES = ("@supports", "@layer", "@container", "@document", "@scope", "@starting-style")
+
+_parsed_cache = OrderedDict()
+_parsed_cache_lock = threading.Lock()
+
+
+def _split_top_level(text: str, separator: str = ",") -> list:
+    # commas inside :is(), :not() or attribute selectors do not split the list
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(0, depth - 1)
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+class ParsedStylesheet:
+    """
+    The parsed form of one stylesheet: style rules with their selectors and
+    enclosing media conditions, media queries, @import statements and
+    @font-face blocks. Built once per distinct stylesheet text.
+    """
+
+    __slots__ = ("rules", "media_queries", "imports", "font_faces")
+
+    def __init__(self):
+        self.rules = []          # (selectors tuple, media conditions tuple)
+        self.media_queries = []  # condition text of every @media block
+        self.imports = []        # {"url", "media"}
+        self.font_faces = []     # {"family", "font_display", "src"}
+
+    @property
+    def selectors(self) -> list:
+        return [selector for selectors, _ in self.rules for selector in selectors]
+
+    @property
+    def breakpoints(self) -> list:
+        """Distinct width breakpoints of the media queries, in px."""
+        points = set()
+        for query in self.media_queries:
+            for value, unit in _BREAKPOINT.findall(query):
+                points.add(round(float(value) * (MEDIA_EM_PX if unit.lower() in ("em", "rem") else 1)))
+        return sorted(points)
+
+
+def _parse(text: str) -> ParsedStylesheet:
+    sheet = ParsedStylesheet()
+    # each frame: (kind, data); kinds are "top", "group", "rule", "font-face", "skip"
+    stack = [("top", ())]
+    prelude = []
+    declarations = []
+    # browsers ignore @import once any other rule has appeared
+    imports_allowed = True
+
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        if token.startswith("/*"):
+            continue
+        kind, data = stack[-1]
+
+        if token == "{":
+            head = _SPACE.sub(" ", "".join(prelude)).strip()
+            prelude = []
+            lowered = head.lower()
+            imports_allowed = False
+            media = data if kind in ("top", "group", "rule") else ()
+            if kind == "skip":
+                stack.append(("skip", ()))
+            elif lowered.startswith("@media"):
+                condition = head[6:].strip()
+                sheet.media_queries.append(condition)
+                stack.append(("group", media + (condition,)))
+            elif lowered.startswith(_GROUPING_AT_RULES):
+                stack.append(("group", media))
+            elif lowered.startswith("@font-face"):
+                declarations = []
+                stack.append(("font-face", ()))
+            elif lowered.startswith("@"):
+                # @keyframes, @page, @property...: nothing inside is a page selector
+                stack.append(("skip", ()))
+            else:
+                sheet.rules.append((tuple(_split_top_level(head)), media))
+                stack.append(("rule", media))
+        elif token == ";":
+            statement = "".join(prelude).strip()
+            prelude = []
+            lowered = statement.lower()
+            if kind == "top" and lowered.startswith("@import"):
+                if imports_allowed and (imported := _IMPORT.match(statement)):
+                    sheet.imports.append({
+                        "url": (imported.group(1) or imported.group(2)).strip(),
+                        "media": _SPACE.sub(" ", imported.group(3)).strip() or None,
+                    })
+            elif kind == "font-face":
+                declarations.append(statement)
+            elif kind == "top" and not lowered.startswith(("@charset", "@layer")):
+                imports_allowed = False
+        elif token == "}":
+            if kind == "font-face":
+                declarations.append("".join(prelude).strip())
+                props = {}
+                for declaration in declarations:
+                    name, _, value = declaration.partition(":")
+                    if value:
+                        props[name.strip().lower()] = value.strip()
+                sheet.font_faces.append({
+                    "family": props.get("font-family", "").strip("\"'") or None,
+                    "font_display": (props.get("font-display") or "").lower() or None,
+                    "src": props.get("src"),
+                })
+            prelude = []
+            if len(stack) > 1:
+                stack.pop()
+        else:
+            prelude.append(token)
+    return sheet
+
+
+def parse_stylesheet(text: str) -> ParsedStylesheet:
+    """Returns the parsed form of `text`, cached by content hash across audits."""
+    key = hashlib.sha1(text.encode("utf-8", errors="replace")).hexdigest()
+    with _parsed_cache_lock:
+        if (sheet := _parsed_cache.get(key)) is not None:
+            _parsed_cache.move_to_end(key)
+            return sheet
+    sheet = _parse(text)
+    with _parsed_cache_lock:
+        _parsed_cache[key] = sheet
+        while len(_parsed_cache) > PARSED_CSS_CACHE_MAX_ENTRIES:
+            _parsed_cache.popitem(last=False)
+    return sheet
+
+
+def imported_urls(store, sheet_url: str) -> list:
+    """Absolute URLs @imported by a stylesheet held in the store."""
+    text = store.text(sheet_url)
+    if text is None:
+        return []
+    return [urljoin(sheet_url, imported["url"]) for imported in parse_stylesheet(text).imports]
+
+
+async def expand_imports(store, css_urls: list) -> dict:
+    """
+    Fetches @imported stylesheets into the store, level by level, up to
+    MAX_IMPORT_DEPTH. Returns the import graph {sheet_url: [imported urls]}.
+    """
+    graph = {}
+    level = list(dict.fromkeys(css_urls))
+    for _ in range(MAX_IMPORT_DEPTH):
+        next_level = []
+        for url in level:
+            if url in graph:
+                continue
+            graph[url] = imported_urls(store, url)
+            next_level.extend(u for u in graph[url] if u not in graph)
+        if not next_level:
+            break
+        await store.fetch_all(next_level)
+        level = next_level
+    for url in level:
+        graph.setdefault(url, imported_urls(store, url))
+    return graph
+
+
+def import_chains(graph: dict, root: str) -> list:
+    """Every @import path starting at `root`, e.g. [[root, a.css, b.css]]."""
+    chains = []
+
+    def walk(url, path):
+        children = [child for child in graph.get(url, []) if child not in path]
+        if not children and len(path) > 1:
+            chains.append(path)
+        for child in children:
+            walk(child, path + [child])
+
+    walk(root, [root])
+    return chains
+
+
+def stylesheet_closure(graph: dict, roots: list) -> list:
+    """The roots followed by every stylesheet they import, without duplicates."""
+    ordered = []
+    pending = list(roots)
+    while pending:
+        url = pending.pop(0)
+        if url not in ordered:
+            ordered.append(url)
+            pending.extend(graph.get(url, []))
+    return ordered
+
+
+def analyze_stylesheets(store, graph: dict, css_urls: list, inline_styles: list = ()) -> dict:
+    """
+    Summarises the page's CSS from the parsed stylesheets: media queries and
+    breakpoints, @import chains and @font-face rules with their font-display.
+    """
+    sheets = [(url, store.text(url)) for url in stylesheet_closure(graph, css_urls)]
+    sheets += [("inline", text) for text in inline_styles]
+
+    media_queries, breakpoints, font_faces, rule_count = [], set(), [], 0
+    for url, text in sheets:
+        if text is None:
+            continue
+        sheet = parse_stylesheet(text)
+        rule_count += len(sheet.rules)
+        media_queries.extend(sheet.media_queries)
+        breakpoints.update(sheet.breakpoints)
+        font_faces.extend(dict(face, stylesheet=url) for face in sheet.font_faces)
+
+    return {
+        "stylesheets": len(sheets),
+        "rule_count": rule_count,
+        "media_queries": list(dict.fromkeys(media_queries)),
+        "breakpoints": sorted(breakpoints),
+        "import_chains": [chain for url in css_urls for chain in import_chains(graph, url)],
+        "font_faces": font_faces,
+        # "swap", "optional" and "fallback" keep text visible while web fonts load
+        "font_faces_blocking_text": [face for face in font_faces if face["font_display"] not in ("swap", "optional", "fallback")],
+    }
@@ -0,0 +1,253 @@
+import os
+import time
+import random
+import struct
+import ipaddress
+import asyncio
+import logging
+import threading
+
+from utils.domains import parent_domains
+
+# answers are cached for their own TTL, within these bounds
+MIN_DNS_CACHE_TTL = 30
+MAX_DNS_CACHE_TTL = 24 * 3600
+# used for negative answers that carry no SOA record
+DEFAULT_NEGATIVE_TTL = 300
+DNS_CACHE_MAX_ENTRIES = 10000
+FALLBACK_RESOLVER = "1.1.1.1"
+
+TYPE_TXT = 16
+TYPE_SOA = 6
+TYPE_OPT = 41
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+EDNS_UDP_SIZE = 1232
+
+_dns_cache = {}
+_dns_cache_lock = threading.Lock()
+
+
+class DNSLookupError(Exception):
+    """The resolver could not be reached or answered with an error (other than NXDOMAIN)."""
+
+
+def default_resolver() -> tuple:
+    """
+    The resolver to query, as (host, port). DNS_RESOLVER ("host" or "host:port",
+    "[v6]:port" for IPv6) wins over the first nameserver in /etc/resolv.conf.
+    """
+    configured = os.getenv("DNS_RESOLVER")
+    if not configured:
+        try:
+            with open("/etc/resolv.conf") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[0] == "nameserver":
+                        configured = parts[1]
+                        break
+        except OSError:
+            pass
+    return parse_resolver(configured or FALLBACK_RESOLVER)
+
+
+def parse_resolver(value: str) -> tuple:
+    value = value.strip()
+    if value.startswith("["):
+        host, _, rest = value[1:].partition("]")
+        return host, int(rest.lstrip(":") or 53)
+    if value.count(":") == 1:
+        host, port = value.split(":")
+        return host, int(port)
+    # a bare IPv6 address or a plain host
+    return value, 53
+
+
+def _build_query(query_id: int, name: str, qtype: int) -> bytes:
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 1)  # recursion desired, one OPT record
+    qname = b"".join(bytes([len(label)]) + label for label in (l.encode("idna") for l in name.strip(".").split(".")) if label)
+    question = qname + b"\x00" + struct.pack("!HH", qtype, 1)
+    # EDNS0 so longer TXT sets still fit in one UDP answer
+    opt = b"\x00" + struct.pack("!HHIH", TYPE_OPT, EDNS_UDP_SIZE, 0, 0)
+    return header + question + opt
+
+
+def _skip_name(data: bytes, offset: int) -> int:
+    while True:
+        length = data[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:
+            # compression pointer: two bytes, ends the name
+            return offset + 2
+        offset += length + 1
+
+
+def _parse_response(data: bytes, query_id: int, qtype: int) -> dict:
+    response_id, flags, qdcount, ancount, nscount, _ = struct.unpack("!HHHHHH", data[:12])
+    if response_id != query_id:
+        raise DNSLookupError("DNS response id does not match the query.")
+    offset = 12
+    for _ in range(qdcount):
+        offset = _skip_name(data, offset) + 4
+
+    records, ttls, negative_ttl = [], [], None
+    for index in range(ancount + nscount):
+        offset = _skip_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+        offset += 10
+        rdata = data[offset:offset + rdlength]
+        offset += rdlength
+        if index < ancount and rtype == qtype == TYPE_TXT:
+            # a TXT record is one or more length-prefixed strings, joined without separators
+            strings, pos = [], 0
+            while pos < len(rdata):
+                length = rdata[pos]
+                strings.append(rdata[pos + 1:pos + 1 + length])
+                pos += 1 + length
+            records.append(b"".join(strings).decode("utf-8", "replace"))
+            ttls.append(ttl)
+        elif index >= ancount and rtype == TYPE_SOA and len(rdata) >= 4:
+            # negative answers are cached for min(SOA TTL, SOA minimum) (RFC 2308)
+            negative_ttl = min(ttl, struct.unpack("!I", rdata[-4:])[0])
+
+    return {
+        "rcode": flags & 0x000F,
+        "truncated": bool(flags & 0x0200),
+        "records": records,
+        "ttl": min(ttls) if ttls else (negative_ttl if negative_ttl is not None else DEFAULT_NEGATIVE_TTL),
+    }
+
+
+class _DatagramQuery(asyncio.DatagramProtocol):
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.answer = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport):
+        transport.sendto(self.payload)
+
+    def datagram_received(self, data, addr):
+        if not self.answer.done():
+            self.answer.set_result(data)
+
+    def error_received(self, exc):
+        if not self.answer.done():
+            self.answer.set_exception(exc)
+
+
+async def _query_udp(resolver: tuple, payload: bytes, timeout: float) -> bytes:
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(lambda: _DatagramQuery(payload), remote_addr=resolver)
+    try:
+        return await asyncio.wait_for(protocol.answer, timeout)
+    finally:
+        transport.close()
+
+
+async def _query_tcp(resolver: tuple, payload: bytes, timeout: float) -> bytes:
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(*resolver), timeout)
+    try:
+        writer.write(struct.pack("!H", len(payload)) + payload)
+        await writer.drain()
+        length = struct.unpack("!H", await asyncio.wait_for(reader.readexactly(2), timeout))[0]
+        return await asyncio.wait_for(reader.readexactly(length), timeout)
+    finally:
+        writer.close()
+
+
+async def lookup_txt(name: str, resolver: tuple | str | None = None, timeout: float = 3,
+                     attempts: int = 2, use_cache: bool = True) -> list:
+    """
+    Returns the TXT records of `name` (an empty list for NXDOMAIN or no data).
+    Answers, negative ones included, are cached for their TTL per resolver.
+    Raises DNSLookupError when the resolver fails or does not answer.
+    """
+    if resolver is None:
+        resolver = default_resolver()
+    elif isinstance(resolver, str):
+        resolver = parse_resolver(resolver)
+    key = (resolver, name.lower().strip("."))
+    if use_cache:
+        with _dns_cache_lock:
+            entry = _dns_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+    last_error = None
+    for _ in range(max(1, attempts)):
+        query_id = random.randint(0, 0xFFFF)
+        payload = _build_query(query_id, name, TYPE_TXT)
+        try:
+            answer = _parse_response(await _query_udp(resolver, payload, timeout), query_id, TYPE_TXT)
+            if answer["truncated"]:
+                answer = _parse_response(await _query_tcp(resolver, payload, timeout), query_id, TYPE_TXT)
+        except (OSError, asyncio.TimeoutError, struct.error, IndexError, DNSLookupError) as e:
+            last_error = e
+            continue
+        if answer["rcode"] not in (RCODE_NOERROR, RCODE_NXDOMAIN):
+            last_error = DNSLookupError(f"DNS server returned rcode {answer['rcode']} for {name}")
+            continue
+
+        ttl = min(MAX_DNS_CACHE_TTL, max(MIN_DNS_CACHE_TTL, answer["ttl"]))
+        with _dns_cache_lock:
+            if key not in _dns_cache and len(_dns_cache) >= DNS_CACHE_MAX_ENTRIES:
+                _dns_cache.pop(next(iter(_dns_cache)))
+            _dns_cache[key] = (time.monotonic() + ttl, answer["records"])
+        return answer["records"]
+
+    raise DNSLookupError(f"TXT lookup for {name} failed: {last_error or 'timeout'}")
+
+
+async def check_email_dns(hostname: str, resolver: tuple | str | None = None, timeout: float = 3) -> dict:
+    """
+    Looks up the SPF (v=spf1 TXT) and DMARC (_dmarc TXT) records for a host,
+    falling back to its parent domains. Returns the `spf_record_check` dict the
+    analyzer reads; `status` is "found", "missing", "error" or "skipped"
+    (for IP address hosts).
+    """
+    try:
+        ipaddress.ip_address(hostname)
+        return {"status": "skipped", "domain": hostname, "error": "The URL uses an IP address, not a domain.", "record": None, "dmarc": None}
+    except ValueError:
+        pass
+    # the policy usually lives on the registered domain rather than on www.;
+    # walk up the labels but stop there, never at a public suffix like co.uk
+    candidates = parent_domains(hostname)
+
+    async def first_policy(prefix: str, tag: str):
+        for domain in candidates:
+            records = await lookup_txt(f"{prefix}{domain}", resolver=resolver, timeout=timeout)
+            matching = [r for r in records if r.lower().startswith(tag)]
+            if matching:
+                return domain, matching
+        return None, []
+
+    spf, dmarc = await asyncio.gather(
+        first_policy("", "v=spf1"), first_policy("_dmarc.", "v=dmarc1"), return_exceptions=True
+    )
+    if isinstance(spf, Exception):
+        logging.warning(f"SPF lookup failed for {hostname}: {spf}")
+        return {"status": "error", "domain": hostname, "error": str(spf), "record": None, "dmarc": None}
+
+    spf_domain, spf_records = spf
+    result = {"domain": spf_domain or candidates[-1], "record": spf_records[0] if spf_records else None, "issues": []}
+    if not spf_records:
+        result.update({"status": "missing", "error": f"No SPF record found for {hostname} or its parent domains."})
+    else:
+        result["status"] = "found"
+        if len(spf_records) > 1:
+            # RFC 7208: more than one SPF record is a permanent error for receivers
+            result["issues"].append("Multiple SPF records published; receivers will treat SPF as failing.")
+
+    if isinstance(dmarc, Exception):
+        result["dmarc"] = {"status": "error", "error": str(dmarc)}
+    else:
+        dmarc_domain, dmarc_records = dmarc
+        if dmarc_records:
+            tags = dict(part.strip().split("=", 1) for part in dmarc_records[0].split(";") if "=" in part)
+            result["dmarc"] = {"status": "found", "domain": dmarc_domain, "record": dmarc_records[0],
+                               "policy": tags.get("p", "").strip().lower() or None}
+        else:
+            result["dmarc"] = {"status": "missing"}
+    return result
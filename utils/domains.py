@@ -0,0 +1,26 @@
+from functools import lru_cache
+
+# second-level public suffixes common enough to matter for grouping hosts by site
+_MULTI_LABEL_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "com.au", "net.au", "org.au", "co.nz", "co.jp", "ne.jp",
+    "co.in", "co.za", "com.br", "com.mx", "com.tr", "com.cn", "com.sg", "com.hk", "co.kr", "com.ar",
+}
+
+
+@lru_cache(maxsize=16384)
+def registrable_domain(host: str) -> str:
+    """example.co.uk for www.shop.example.co.uk; IP addresses are returned as-is."""
+    host = (host or "").lower().rstrip(".")
+    labels = host.split(".")
+    if len(labels) <= 2 or host.replace(".", "").isdigit():
+        return host
+    keep = 3 if ".".join(labels[-2:]) in _MULTI_LABEL_SUFFIXES else 2
+    return ".".join(labels[-keep:])
+
+
+def parent_domains(host: str) -> list:
+    """The host and its parents down to the registrable domain, never a public suffix."""
+    host = (host or "").lower().strip(".")
+    labels = host.split(".")
+    keep = len(registrable_domain(host).split("."))
+    return [".".join(labels[i:]) for i in range(max(1, len(labels) - keep + 1))]
@@ -0,0 +1,29 @@
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_encode_pool() -> ProcessPoolExecutor:
+    """
+    Process-wide pool for CPU-bound encoding (image re-encoding, text
+    minification and compression), so that work neither blocks the event loop
+    nor holds the GIL of the API process. ENCODE_WORKERS sets its size
+    (IMAGE_ENCODE_WORKERS is still honoured). Workers are spawned, never forked
+    from the threaded server. A pool broken by a dead worker is replaced.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool._broken:
+            # a worker died (e.g. OOM-killed on a huge image); the executor never recovers
+            logging.warning("Encode process pool is broken; starting a new one.")
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            workers = int(os.getenv("ENCODE_WORKERS") or os.getenv("IMAGE_ENCODE_WORKERS") or min(4, os.cpu_count() or 1))
+            _pool = ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn"))
+        return _pool
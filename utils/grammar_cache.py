@@ -0,0 +1,94 @@
+import os
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 100_000
+# bump when the stored issue format or the checker configuration changes
+CACHE_VERSION = "2"
+_SQL_BATCH = 500
+
+
+def sentence_key(language: str, sentence: str) -> str:
+    return hashlib.sha1(f"{CACHE_VERSION}\0{language}\0{sentence}".encode("utf-8", errors="replace")).hexdigest()
+
+
+class GrammarCache:
+    """
+    LanguageTool results per normalized sentence, keyed by sentence hash and
+    language. Each value is the list of issues with offsets relative to the
+    sentence. The in-memory tier is an LRU bounded by entry count. With
+    `path`, entries are also kept in a SQLite file that survives restarts and
+    is shared by every worker process on the host.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: str | None = None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS grammar (key TEXT PRIMARY KEY, issues TEXT NOT NULL)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"Grammar cache file {path} unavailable, using memory only: {e}")
+                self._db = None
+
+    def _remember(self, key: str, issues: list):
+        self._entries[key] = issues
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys: list) -> dict:
+        """{key: issues} for every key found in memory or on disk."""
+        found, missing = {}, []
+        with self._lock:
+            for key in keys:
+                if (issues := self._entries.get(key)) is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = issues
+                else:
+                    missing.append(key)
+            if self._db is not None and missing:
+                try:
+                    for i in range(0, len(missing), _SQL_BATCH):
+                        batch = missing[i:i + _SQL_BATCH]
+                        rows = self._db.execute(
+                            f"SELECT key, issues FROM grammar WHERE key IN ({','.join('?' * len(batch))})", batch
+                        ).fetchall()
+                        for key, issues in rows:
+                            found[key] = json.loads(issues)
+                            self._remember(key, found[key])
+                except sqlite3.Error as e:
+                    logging.warning(f"Grammar cache read failed: {e}")
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict):
+        with self._lock:
+            for key, issues in items.items():
+                self._remember(key, issues)
+            if self._db is not None and items:
+                try:
+                    self._db.executemany("INSERT OR REPLACE INTO grammar (key, issues) VALUES (?, ?)",
+                                         [(key, json.dumps(issues)) for key, issues in items.items()])
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logging.warning(f"Grammar cache write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "persistent": self._db is not None}
+
+
+grammar_cache = GrammarCache(int(os.getenv("GRAMMAR_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)), os.getenv("GRAMMAR_CACHE_PATH") or None)
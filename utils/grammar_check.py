@@ -0,0 +1,192 @@
+import re
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.grammar_cache import grammar_cache, sentence_key, GrammarCache
+from utils.languagetool_pool import get_language_tool_pool, LanguageToolPool
+
+# LanguageTool answers a few thousand characters fastest; larger texts are split
+DEFAULT_CHUNK_CHARS = 4000
+# upper bound per page, so a pathological document cannot occupy the pool
+MAX_CHECK_CHARS = 300_000
+
+# end of a sentence: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a blank line / line break between text blocks
+_SENTENCE_END = re.compile(r"""[.!?…]+["'”’)\]]*\s+|\n\s*""")
+# uncached sentences are checked as separate lines of one synthetic text
+SENTENCE_SEPARATOR = "\n\n"
+# characters of surrounding text shown on each side of an issue, as LanguageTool does
+CONTEXT_CHARS = 40
+
+
+def split_sentences(text: str) -> list:
+    """(start, end) spans of the sentences in `text`; together they cover all of it."""
+    spans, start = [], 0
+    for match in _SENTENCE_END.finditer(text):
+        if match.end() > start:
+            spans.append((start, match.end()))
+            start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def build_chunks(spans: list, max_chars: int = DEFAULT_CHUNK_CHARS) -> list:
+    """
+    Groups consecutive sentence spans into (start, end) chunks of at most
+    `max_chars`. A single longer sentence becomes its own chunk.
+    """
+    chunks = []
+    chunk_start = chunk_end = None
+    for start, end in spans:
+        if chunk_start is not None and end - chunk_start > max_chars:
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = None
+        if chunk_start is None:
+            chunk_start = start
+        chunk_end = end
+    if chunk_start is not None:
+        chunks.append((chunk_start, chunk_end))
+    return chunks
+
+
+def match_to_issue(match, base_offset: int = 0) -> dict:
+    """
+    A LanguageTool match as a plain dict, with its offset moved by
+    `base_offset`. Attribute names differ between language_tool_python
+    versions, so every known spelling is tried.
+    """
+    offset = getattr(match, 'offset', getattr(match, 'fromx', 0)) or 0
+
+    error_length = getattr(match, 'errorLength', None)
+    if error_length is None: error_length = getattr(match, 'error_length', None)
+    if error_length is None: error_length = getattr(match, 'len', None)
+    if error_length is None: error_length = getattr(match, 'length', None)
+    if error_length is None:
+        tox, fromx = getattr(match, 'tox', None), getattr(match, 'fromx', None)
+        if tox is not None and fromx is not None:
+            error_length = tox - fromx
+    if error_length is None:
+        error_length = 0
+
+    return {
+        "offset": base_offset + offset,
+        "length": error_length,
+        "rule_id": getattr(match, 'ruleId', getattr(match, 'rule_id', 'UNKNOWN')) or 'UNKNOWN',
+        "message": getattr(match, 'message', getattr(match, 'msg', '')),
+        "context": getattr(match, 'context', ''),
+        "replacements": list(getattr(match, 'replacements', []) or []),
+        "rule_issue_type": getattr(match, 'ruleIssueType', getattr(match, 'rule_issue_type', '')) or '',
+        "category": getattr(match, 'category', '') or '',
+    }
+
+
+def normalize_sentence(raw: str) -> tuple:
+    """
+    The sentence with surrounding whitespace stripped and inner runs collapsed
+    to one space, plus positions[i]: the index in `raw` of normalized char i.
+    """
+    normalized = " ".join(raw.split())
+    lead = len(raw) - len(raw.lstrip())
+    if raw[lead:lead + len(normalized)] == normalized:
+        return normalized, range(lead, lead + len(normalized))
+    positions, pending_space = [], None
+    for index, char in enumerate(raw):
+        if char.isspace():
+            if positions and pending_space is None:
+                pending_space = index
+            continue
+        if pending_space is not None:
+            positions.append(pending_space)
+            pending_space = None
+        positions.append(index)
+    return normalized, positions
+
+
+def _remap(issues: list, text: str, base: int, positions) -> list:
+    """
+    Sentence-relative issues moved to offsets in the original text, with their
+    context rebuilt from that text.
+    """
+    remapped = []
+    for issue in issues:
+        start = min(issue["offset"], len(positions) - 1)
+        end = min(issue["offset"] + max(issue["length"], 1), len(positions)) - 1
+        offset = base + positions[start]
+        length = positions[end] + 1 - positions[start] if issue["length"] else 0
+        context = " ".join(text[max(0, offset - CONTEXT_CHARS):offset + length + CONTEXT_CHARS].split())
+        remapped.append(issue | {"offset": offset, "length": length, "context": context})
+    return remapped
+
+
+def _check_sentences(sentences: list, pool: LanguageToolPool, max_chunk_chars: int) -> list:
+    """
+    Checks normalized sentences in parallel chunks. Returns one list of
+    sentence-relative issues per sentence.
+    """
+    spans, offset = [], 0
+    for sentence in sentences:
+        spans.append((offset, offset + len(sentence) + len(SENTENCE_SEPARATOR)))
+        offset = spans[-1][1]
+    text = "".join(sentence + SENTENCE_SEPARATOR for sentence in sentences)
+    chunks = build_chunks(spans, max_chunk_chars)
+
+    def check_chunk(chunk):
+        start, end = chunk
+        return [match_to_issue(match, start) for match in pool.check(text[start:end])]
+
+    if len(chunks) == 1:
+        results = [check_chunk(chunks[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(pool.size, len(chunks))) as executor:
+            results = list(executor.map(check_chunk, chunks))
+
+    starts = [start for start, _ in spans]
+    per_sentence = [[] for _ in sentences]
+    for issue in (issue for chunk_issues in results for issue in chunk_issues):
+        index = bisect_right(starts, issue["offset"]) - 1
+        relative = issue["offset"] - starts[index]
+        if relative >= len(sentences[index]):
+            continue  # flagged the separator itself
+        length = min(issue["length"], len(sentences[index]) - relative)
+        # LanguageTool's context spans the neighbouring sentences of this chunk,
+        # which belong to another page once cached; _remap rebuilds it
+        per_sentence[index].append({k: v for k, v in issue.items() if k != "context"} | {"offset": relative, "length": length})
+    return per_sentence
+
+
+def check_text(text: str, pool: LanguageToolPool | None = None, max_chunk_chars: int = DEFAULT_CHUNK_CHARS,
+               cache: GrammarCache | None = grammar_cache, stats: dict | None = None) -> list:
+    """
+    Checks `text` with LanguageTool one sentence at a time. Sentences already
+    in the cache (same normalized text and language) are answered from it; the
+    rest are grouped into chunks that run in parallel across the instance
+    pool, and their results are cached. Returns issue dicts with offsets into
+    `text`, in text order.
+
+    If `stats` is given, it is filled with the number of sentences, how many
+    came from the cache and how many were sent to LanguageTool.
+    """
+    pool = pool or get_language_tool_pool()
+    sentences = []
+    for start, end in split_sentences(text):
+        normalized, positions = normalize_sentence(text[start:end])
+        if normalized:
+            sentences.append((start, normalized, positions, sentence_key(pool.language, normalized)))
+
+    unique_keys = list(dict.fromkeys(key for *_, key in sentences))
+    results = cache.get_many(unique_keys) if cache is not None else {}
+    pending = {key: normalized for _, normalized, _, key in sentences if key not in results}
+    if pending:
+        checked = dict(zip(pending, _check_sentences(list(pending.values()), pool, max_chunk_chars)))
+        if cache is not None:
+            cache.put_many(checked)
+        results.update(checked)
+
+    if stats is not None:
+        stats.update({"sentences": len(sentences), "sentences_cached": len(sentences) - sum(
+            1 for *_, key in sentences if key in pending), "sentences_checked": len(pending)})
+    issues = []
+    for start, _, positions, key in sentences:
+        issues.extend(_remap(results[key], text, start, positions))
+    return issues
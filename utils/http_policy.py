@@ -0,0 +1,272 @@
+import time
+import random
+import logging
+import threading
+from statistics import median
+from collections import deque
+from urllib.parse import urlparse
+
+from requests import Session, exceptions
+from requests.adapters import HTTPAdapter
+
+# a host is backed off when it signals overload or gets much slower than its median latency
+BACKOFF_STATUSES = {429, 503}
+FAILURE_STATUSES = {429, 500, 502, 503, 504}
+LATENCY_BACKOFF_FACTOR = 2.5
+# the median is taken over this many recent successful responses
+LATENCY_WINDOW = 31
+
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 16
+DEFAULT_INITIAL_LIMIT = 4
+
+# circuit breaker: open after this many consecutive failures, retry one request after the cooldown
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_OPEN_SECONDS = 30.0
+
+# adaptive timeouts never go below this and never above the caller's timeout
+MIN_ADAPTIVE_TIMEOUT = 3.0
+TIMEOUT_LATENCY_MULTIPLIER = 8.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(exceptions.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+class HostState:
+    __slots__ = ("limit", "latency", "recent", "error_rate", "failures", "circuit",
+                 "opened_at", "trial_in_flight", "retry_after_until", "samples")
+
+    def __init__(self, initial_limit: float):
+        self.limit = float(initial_limit)
+        self.latency = None        # EWMA of request latency (seconds)
+        self.recent = deque(maxlen=LATENCY_WINDOW)  # latencies of recent successful requests
+        self.error_rate = 0.0      # EWMA of failures (0..1)
+        self.failures = 0          # consecutive failures
+        self.circuit = CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.retry_after_until = 0.0
+        self.samples = 0
+
+
+class AdaptiveHostPolicy:
+    """
+    Per-host AIMD concurrency control with a circuit breaker.
+
+    Each completed request is recorded with its latency and outcome. Healthy
+    responses grow the host's concurrency limit additively; 429/503 responses,
+    errors and latency well above the host's median latency halve it. After enough
+    consecutive failures the host's circuit opens and requests fail fast until
+    a single trial request succeeds.
+
+    State is shared by the sync requests adapter and the async link checker,
+    so it is guarded by a lock rather than asyncio primitives.
+    """
+
+    def __init__(
+        self,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        open_seconds: float = DEFAULT_OPEN_SECONDS,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.initial_limit = initial_limit
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.initial_limit)
+        return state
+
+    def allow(self, host: str) -> bool:
+        """Whether a request to this host may be sent now (circuit breaker check)."""
+        with self._lock:
+            state = self._state(host)
+            if state.circuit == CLOSED:
+                return True
+            if state.circuit == OPEN and time.monotonic() - state.opened_at >= self.open_seconds:
+                state.circuit = HALF_OPEN
+                state.trial_in_flight = False
+            now = time.monotonic()
+            if state.circuit == HALF_OPEN and (not state.trial_in_flight or now - state.opened_at >= self.open_seconds):
+                # let exactly one trial request through; a trial that never reported back expires
+                state.trial_in_flight = True
+                state.opened_at = now
+                return True
+            return False
+
+    def limit(self, host: str) -> int:
+        with self._lock:
+            state = self._state(host)
+            if state.circuit == HALF_OPEN:
+                return 1
+            return max(self.min_limit, int(state.limit))
+
+    def delay(self, host: str) -> float:
+        """Seconds to wait before the next request because the host sent Retry-After."""
+        with self._lock:
+            return max(0.0, self._state(host).retry_after_until - time.monotonic())
+
+    def timeout(self, host: str, default: float) -> float:
+        """A timeout scaled to the host's observed latency, capped at `default`."""
+        with self._lock:
+            latency = self._state(host).latency
+        if latency is None:
+            return default
+        return min(default, max(MIN_ADAPTIVE_TIMEOUT, latency * TIMEOUT_LATENCY_MULTIPLIER))
+
+    def record(self, host: str, latency: float | None, status: int | None = None, retry_after: float | None = None):
+        """Records the outcome of one request. `status` is None for network errors and timeouts."""
+        failed = status is None or status in FAILURE_STATUSES
+        with self._lock:
+            state = self._state(host)
+            state.samples += 1
+            state.error_rate = state.error_rate * 0.8 + (0.2 if failed else 0.0)
+
+            if retry_after:
+                state.retry_after_until = max(state.retry_after_until, time.monotonic() + retry_after)
+
+            slow = False
+            if latency is not None and not failed:
+                state.latency = latency if state.latency is None else state.latency * 0.7 + latency * 0.3
+                state.recent.append(latency)
+                # the median is robust to a single unusually fast response
+                slow = len(state.recent) > 3 and state.latency > median(state.recent) * LATENCY_BACKOFF_FACTOR
+
+            if failed or slow or status in BACKOFF_STATUSES:
+                # multiplicative decrease
+                state.limit = max(float(self.min_limit), state.limit / 2)
+            else:
+                # additive increase: roughly +1 per "window" of `limit` requests
+                state.limit = min(float(self.max_limit), state.limit + 1.0 / state.limit)
+
+            if failed:
+                state.failures += 1
+                if state.circuit == HALF_OPEN or state.failures >= self.failure_threshold:
+                    if state.circuit != OPEN:
+                        logging.warning(f"Circuit opened for {host} after {state.failures} consecutive failures.")
+                    state.circuit = OPEN
+                    state.opened_at = time.monotonic()
+                    state.trial_in_flight = False
+            else:
+                state.failures = 0
+                if state.circuit != CLOSED:
+                    state.circuit = CLOSED
+                    state.trial_in_flight = False
+
+    def snapshot(self, host: str) -> dict:
+        with self._lock:
+            state = self._state(host)
+            return {
+                "limit": max(self.min_limit, int(state.limit)), "latency": state.latency,
+                "median_latency": median(state.recent) if state.recent else None, "error_rate": round(state.error_rate, 3),
+                "circuit": state.circuit, "consecutive_failures": state.failures,
+            }
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        # HTTP-date form; not worth parsing for a back-off hint
+        return None
+
+
+# process-wide: hosts are shared between audits, so their health is too
+http_policy = AdaptiveHostPolicy()
+
+
+class AdaptiveHTTPAdapter(HTTPAdapter):
+    """
+    requests adapter that records every response in the shared host policy,
+    fails fast on hosts with an open circuit and only retries while the
+    request's time budget allows it. The budget covers one request together
+    with its retries and back-off waits, so a long audit does not starve its
+    last requests.
+    """
+
+    def __init__(self, policy: AdaptiveHostPolicy = http_policy, request_budget_seconds: float | None = None,
+                 max_retries_per_request: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        self.policy = policy
+        self.request_budget_seconds = request_budget_seconds
+        self.max_retries_per_request = max_retries_per_request
+
+    @staticmethod
+    def _remaining(deadline: float | None) -> float | None:
+        return None if deadline is None else deadline - time.monotonic()
+
+    def send(self, request, **kwargs):
+        host = urlparse(request.url).netloc
+        deadline = time.monotonic() + self.request_budget_seconds if self.request_budget_seconds else None
+        attempt = 0
+        while True:
+            if not self.policy.allow(host):
+                raise CircuitOpenError(f"Circuit breaker open for {host}; skipping request.", request=request)
+            if (wait := self.policy.delay(host)) > 0:
+                remaining = self._remaining(deadline)
+                time.sleep(wait if remaining is None else max(0.0, min(wait, remaining)))
+
+            remaining = self._remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise exceptions.Timeout(f"Time budget exhausted before requesting {request.url}", request=request)
+            timeout = kwargs.get("timeout")
+            if isinstance(timeout, (int, float)):
+                timeout = self.policy.timeout(host, timeout)
+                if remaining is not None:
+                    timeout = max(0.5, min(timeout, remaining))
+                kwargs["timeout"] = timeout
+
+            started = time.monotonic()
+            try:
+                response = super().send(request, **kwargs)
+            except (exceptions.ConnectionError, exceptions.Timeout):
+                self.policy.record(host, None, None)
+                if not self._should_retry(attempt, None, deadline):
+                    raise
+            else:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                self.policy.record(host, time.monotonic() - started, response.status_code, retry_after)
+                if response.status_code not in FAILURE_STATUSES or not self._should_retry(attempt, retry_after, deadline):
+                    return response
+                response.close()
+
+            attempt += 1
+            time.sleep(self._backoff(attempt, host))
+
+    def _backoff(self, attempt: int, host: str) -> float:
+        return max(self.policy.delay(host), 0.5 * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+    def _should_retry(self, attempt: int, retry_after: float | None, deadline: float | None) -> bool:
+        if attempt >= self.max_retries_per_request:
+            return False
+        remaining = self._remaining(deadline)
+        if remaining is None:
+            return True
+        # only retry if the wait plus a reasonable request still fits in the budget
+        expected_wait = retry_after if retry_after is not None else 0.5 * (2 ** attempt)
+        return remaining > expected_wait + MIN_ADAPTIVE_TIMEOUT
+
+
+def build_session(request_budget_seconds: float | None = None, policy: AdaptiveHostPolicy = http_policy) -> Session:
+    """
+    A requests Session whose transports go through the adaptive host policy.
+    `request_budget_seconds` bounds each request including its retries.
+    """
+    session = Session()
+    adapter = AdaptiveHTTPAdapter(policy=policy, request_budget_seconds=request_budget_seconds)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
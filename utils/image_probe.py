@@ -0,0 +1,210 @@
+import time
+import struct
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+
+from utils.link_checker import LinkChecker
+
+# enough for almost every header; JPEGs with large EXIF/ICC blocks can need more
+IMAGE_PROBE_MAX_BYTES = 256 * 1024
+IMAGE_SIZE_CACHE_TTL = 6 * 3600
+IMAGE_SIZE_CACHE_MAX_ENTRIES = 20000
+
+# a parser returns this when it knows the format but needs more bytes
+NEED_MORE = "need_more"
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, ...); C4/C8/CC are not frames
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+_size_cache = OrderedDict()
+_size_cache_lock = threading.Lock()
+
+
+def _png_size(data: bytes):
+    if len(data) < 24:
+        return NEED_MORE
+    width, height = struct.unpack(">II", data[16:24])
+    return "png", width, height
+
+
+def _gif_size(data: bytes):
+    if len(data) < 10:
+        return NEED_MORE
+    width, height = struct.unpack("<HH", data[6:10])
+    return "gif", width, height
+
+
+def _jpeg_exif_swaps_axes(segment: bytes) -> bool:
+    # EXIF orientations 5-8 rotate by 90 degrees; browsers apply them by default
+    if not segment.startswith(b"Exif\x00\x00") or len(segment) < 14:
+        return False
+    tiff = segment[6:]
+    endian = "<" if tiff[:2] == b"II" else ">"
+    try:
+        ifd_offset = struct.unpack(endian + "I", tiff[4:8])[0]
+        entries = struct.unpack(endian + "H", tiff[ifd_offset:ifd_offset + 2])[0]
+        for i in range(entries):
+            entry = ifd_offset + 2 + i * 12
+            tag, _, _, value = struct.unpack(endian + "HHIH", tiff[entry:entry + 10])
+            if tag == 0x0112:
+                return value in (5, 6, 7, 8)
+    except struct.error:
+        pass
+    return False
+
+
+def _jpeg_size(data: bytes):
+    offset, swap = 2, False
+    while True:
+        # markers may be padded with any number of 0xFF bytes
+        while offset < len(data) and data[offset] == 0xFF:
+            offset += 1
+        if offset + 3 > len(data):
+            return NEED_MORE
+        marker = data[offset]
+        offset += 1
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # standalone markers have no length
+        length = struct.unpack(">H", data[offset:offset + 2])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 7 > len(data):
+                return NEED_MORE
+            height, width = struct.unpack(">HH", data[offset + 3:offset + 7])
+            return ("jpeg", height, width) if swap else ("jpeg", width, height)
+        if marker == 0xE1:
+            if offset + length > len(data):
+                return NEED_MORE
+            swap = swap or _jpeg_exif_swaps_axes(data[offset + 2:offset + length])
+        if marker == 0xDA:
+            return None  # image data started without a frame header
+        offset += length
+
+
+def _webp_size(data: bytes):
+    if len(data) < 30:
+        return NEED_MORE
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        # lossy: 14-bit dimensions after the 3-byte frame tag and start code
+        width, height = struct.unpack("<HH", data[26:30])
+        return "webp", width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = int.from_bytes(data[21:25], "little")
+        return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return "webp", width, height
+    return None
+
+
+def _avif_size(data: bytes):
+    # ISOBMFF: every image item has an 'ispe' (image spatial extents) property;
+    # the primary image is the largest one (others are thumbnails, alpha or tiles)
+    meta_at = data.find(b"meta")
+    if meta_at < 0:
+        return NEED_MORE
+    best, offset = None, data.find(b"ispe", meta_at)
+    while offset >= 0:
+        if offset + 16 > len(data):
+            return NEED_MORE
+        width, height = struct.unpack(">II", data[offset + 8:offset + 16])
+        if best is None or width * height > best[0] * best[1]:
+            best = (width, height)
+        offset = data.find(b"ispe", offset + 16)
+    if best is None:
+        # 'meta' is usually small; once 'mdat' shows up no property is coming
+        return None if b"mdat" in data[meta_at:] else NEED_MORE
+    # 'irot' rotations by 90/270 degrees swap the displayed axes
+    if (irot := data.find(b"irot", meta_at)) >= 0 and irot + 5 <= len(data) and data[irot + 4] & 0x03 in (1, 3):
+        best = (best[1], best[0])
+    return ("avif",) + best
+
+
+def parse_image_size(data: bytes):
+    """
+    Reads (format, width, height) from the first bytes of a PNG, JPEG, GIF,
+    WebP or AVIF file. Returns NEED_MORE if the header is cut short and None
+    for unknown or unparseable data.
+    """
+    try:
+        if data.startswith(b"\x89PNG\r\n\x1a\n"):
+            return _png_size(data)
+        if data[:6] in (b"GIF87a", b"GIF89a"):
+            return _gif_size(data)
+        if data.startswith(b"\xff\xd8"):
+            return _jpeg_size(data)
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            return _webp_size(data)
+        if data[4:8] == b"ftyp" and (b"avif" in data[8:32] or b"avis" in data[8:32]):
+            return _avif_size(data)
+    except (struct.error, IndexError):
+        return None
+    return NEED_MORE if len(data) < 32 else None
+
+
+def _cached_size(url: str):
+    with _size_cache_lock:
+        entry = _size_cache.get(url)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del _size_cache[url]
+            return None
+        _size_cache.move_to_end(url)
+        return entry[1]
+
+
+def _cache_size(url: str, info: dict):
+    with _size_cache_lock:
+        _size_cache[url] = (time.time() + IMAGE_SIZE_CACHE_TTL, info)
+        _size_cache.move_to_end(url)
+        while len(_size_cache) > IMAGE_SIZE_CACHE_MAX_ENTRIES:
+            _size_cache.popitem(last=False)
+
+
+async def probe_image_sizes(urls: list, timeout: float = 8, use_cache: bool = True, checker: LinkChecker | None = None, **limits) -> dict:
+    """
+    Returns {url: {"format", "width", "height", "bytes_read"}} for every image
+    URL, or {"error": ...} when its size could not be read. Only the first
+    bytes of each file are fetched (ranged, streamed and closed early), through
+    the bounded LinkChecker (the audit's `checker` when given); sizes are
+    cached per URL across audits.
+    """
+    results = {}
+    pending = []
+    for url in dict.fromkeys(urls):
+        cached = _cached_size(url) if use_cache else None
+        if cached is not None:
+            results[url] = cached
+        else:
+            pending.append(url)
+    if not pending:
+        return results
+
+    def parse(prefix: bytes):
+        parsed = parse_image_size(prefix)
+        return None if parsed == NEED_MORE else (parsed or "unknown")
+
+    async with nullcontext(checker) if checker is not None else LinkChecker(timeout=timeout, **limits) as checker:
+
+        async def measure(url):
+            try:
+                peeked = await checker.peek(url, parse, max_bytes=IMAGE_PROBE_MAX_BYTES)
+            except Exception as e:
+                return url, {"error": str(e)}
+            if peeked["status"] >= 400:
+                return url, {"error": f"HTTP {peeked['status']}"}
+            parsed = peeked["result"]
+            if parsed is None or parsed == "unknown":
+                return url, {"error": "Unrecognised image format or header not found.", "bytes_read": peeked["bytes_read"]}
+            image_format, width, height = parsed
+            info = {"format": image_format, "width": width, "height": height, "bytes_read": peeked["bytes_read"]}
+            _cache_size(url, info)
+            return url, info
+
+        for url, info in await asyncio.gather(*(measure(url) for url in pending)):
+            results[url] = info
+    return results
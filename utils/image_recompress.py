@@ -0,0 +1,118 @@
+import io
+import asyncio
+import logging
+from contextlib import nullcontext
+
+from utils.encode_pool import get_encode_pool
+from utils.link_checker import LinkChecker
+
+# Optional: Pillow does the decoding and re-encoding
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+DEFAULT_RECOMPRESS_IMAGES = 8
+DEFAULT_TARGET_QUALITY = 80
+# bodies above this are skipped rather than decoded in a worker
+MAX_RECOMPRESS_BYTES = 8 * 1024 * 1024
+MAX_RECOMPRESS_PIXELS = 40_000_000
+RECOMPRESS_TIMEOUT = 60
+
+def _encode_candidates(data: bytes, quality: int) -> dict:
+    """
+    Runs in a worker process: decodes one image and re-encodes it as WebP,
+    AVIF (when Pillow was built with it) and optimized progressive JPEG.
+    Returns the encoded size per format.
+    """
+    Image.MAX_IMAGE_PIXELS = MAX_RECOMPRESS_PIXELS
+    image = Image.open(io.BytesIO(data))
+    if getattr(image, "n_frames", 1) > 1:
+        return {"skipped": "animated image"}
+    image.load()
+    source_format = (image.format or "").lower()
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    sizes = {}
+    targets = [("webp", "WEBP", {"quality": quality, "method": 4})]
+    if features.check("avif"):
+        # AVIF at the same nominal quality looks similar to WebP; speed 8 keeps encoding cheap
+        targets.append(("avif", "AVIF", {"quality": max(1, quality - 20), "speed": 8}))
+    if not has_alpha:
+        targets.append(("jpeg", "JPEG", {"quality": quality, "optimize": True, "progressive": True}))
+    for name, pil_format, options in targets:
+        out = io.BytesIO()
+        try:
+            image.save(out, pil_format, **options)
+        except Exception:
+            continue
+        sizes[name] = out.tell()
+    return {"source_format": source_format, "width": image.width, "height": image.height, "sizes": sizes}
+
+
+async def _fetch_body(checker: LinkChecker, url: str) -> bytes | None:
+    # streamed and abandoned as soon as it passes the cap, never held in full
+    try:
+        fetched = await checker.fetch(url, max_bytes=MAX_RECOMPRESS_BYTES)
+    except Exception as e:
+        logging.warning(f"Could not fetch image {url}: {e}")
+        return None
+    if fetched["truncated"]:
+        logging.info(f"Image {url} is larger than {MAX_RECOMPRESS_BYTES} bytes; recompression skipped.")
+    return fetched["body"]
+
+
+async def estimate_image_savings(urls: list, quality: int = DEFAULT_TARGET_QUALITY, timeout: float = 15, bodies: dict | None = None,
+                                 checker: LinkChecker | None = None) -> dict:
+    """
+    Re-encodes the given images at `quality` and reports how many bytes the
+    best of WebP/AVIF/optimized JPEG would save, per image and in total.
+    Bodies already held by the caller can be passed in `bodies` ({url: bytes});
+    the rest are fetched, through the audit's `checker` when given.
+    """
+    result = {"quality": quality, "images": [], "total_original_bytes": 0, "total_savings_bytes": 0, "error": None}
+    if Image is None:
+        result["error"] = "Pillow is not installed; image recompression was skipped."
+        return result
+    if not urls:
+        return result
+
+    bodies = dict(bodies or {})
+    missing = [url for url in urls if url not in bodies]
+    if missing:
+        async with nullcontext(checker) if checker is not None else LinkChecker(timeout=timeout) as checker:
+            fetched = await asyncio.gather(*(_fetch_body(checker, url) for url in missing))
+        bodies.update(zip(missing, fetched))
+
+    loop = asyncio.get_running_loop()
+    pool = get_encode_pool()
+
+    async def recompress(url):
+        data = bodies.get(url)
+        if not data:
+            return {"url": url, "error": "Image body unavailable."}
+        try:
+            encoded = await asyncio.wait_for(loop.run_in_executor(pool, _encode_candidates, data, quality), RECOMPRESS_TIMEOUT)
+        except Exception as e:
+            return {"url": url, "error": f"Re-encoding failed: {e}"}
+        if "skipped" in encoded:
+            return {"url": url, "original_bytes": len(data), "error": f"Skipped: {encoded['skipped']}."}
+        sizes = encoded["sizes"]
+        best_format = min(sizes, key=sizes.get) if sizes else None
+        savings = max(0, len(data) - sizes[best_format]) if best_format else 0
+        return {
+            "url": url, "source_format": encoded["source_format"],
+            "width": encoded["width"], "height": encoded["height"],
+            "original_bytes": len(data), "encoded_bytes": sizes,
+            "best_format": best_format, "savings_bytes": savings,
+            "savings_percent": round(savings / len(data) * 100, 1) if data else 0.0,
+            "error": None,
+        }
+
+    result["images"] = sorted(await asyncio.gather(*(recompress(url) for url in urls)),
+                              key=lambda i: i.get("savings_bytes") or 0, reverse=True)
+    result["total_original_bytes"] = sum(i.get("original_bytes") or 0 for i in result["images"])
+    result["total_savings_bytes"] = sum(i.get("savings_bytes") or 0 for i in result["images"])
+    return result
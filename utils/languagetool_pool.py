@@ -0,0 +1,187 @@
+import os
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+
+# Optional: grammar and spell checks are skipped when the package is missing
+try:
+    import language_tool_python
+except ImportError:
+    language_tool_python = None
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_LANGUAGE = "en-US"
+# callers wait this long for a free instance before giving up
+DEFAULT_ACQUIRE_TIMEOUT = 120
+# an instance idle for longer is pinged before it is handed out
+HEALTH_CHECK_IDLE_SECONDS = 60
+
+
+class LanguageToolUnavailable(RuntimeError):
+    pass
+
+
+class _Slot:
+    __slots__ = ("tool", "last_used", "index")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.tool = None
+        self.last_used = 0.0
+
+
+class LanguageToolPool:
+    """
+    A fixed number of warm LanguageTool instances, each backed by its own Java
+    server, shared by every thread of the process.
+
+    Callers borrow an instance through acquire() (or check()) and queue when
+    all of them are busy. Instances idle for a while are health-checked before
+    use, and an instance whose server died is closed and restarted instead of
+    failing the request.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, language: str = DEFAULT_LANGUAGE, factory=None,
+                 acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT):
+        self.size = max(1, size)
+        self.language = language
+        self.acquire_timeout = acquire_timeout
+        self._factory = factory
+        self._idle = queue.LifoQueue()  # the most recently used instance is the warmest
+        for index in range(self.size):
+            self._idle.put(_Slot(index))
+        self._lock = threading.Lock()
+        self._closed = False
+        self.restarts = 0
+        self.last_error = None
+
+    def _start(self, slot: _Slot):
+        try:
+            slot.tool = self._factory() if self._factory else language_tool_python.LanguageTool(self.language)
+        except Exception as e:
+            slot.tool = None
+            with self._lock:
+                self.last_error = str(e)
+            raise LanguageToolUnavailable(f"Could not start LanguageTool: {e}") from e
+        slot.last_used = time.monotonic()
+
+    def _restart(self, slot: _Slot):
+        logging.warning(f"Restarting LanguageTool instance {slot.index}.")
+        self._close_tool(slot)
+        with self._lock:
+            self.restarts += 1
+        self._start(slot)
+
+    @staticmethod
+    def _close_tool(slot: _Slot):
+        if slot.tool is not None:
+            try:
+                slot.tool.close()
+            except Exception:
+                pass
+            slot.tool = None
+
+    @staticmethod
+    def _is_healthy(tool) -> bool:
+        try:
+            tool.check("ping")
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def acquire(self, timeout: float | None = None):
+        """Borrows a started, healthy instance; blocks while all are in use."""
+        if self._closed:
+            raise LanguageToolUnavailable("LanguageTool pool is closed.")
+        if language_tool_python is None and self._factory is None:
+            raise LanguageToolUnavailable("language-tool-python is not installed.")
+        try:
+            slot = self._idle.get(timeout=self.acquire_timeout if timeout is None else timeout)
+        except queue.Empty:
+            raise LanguageToolUnavailable("Timed out waiting for a free LanguageTool instance.")
+        try:
+            if slot.tool is None:
+                self._start(slot)
+            elif time.monotonic() - slot.last_used > HEALTH_CHECK_IDLE_SECONDS and not self._is_healthy(slot.tool):
+                self._restart(slot)
+            yield slot
+        finally:
+            slot.last_used = time.monotonic()
+            if self._closed:
+                self._close_tool(slot)
+            self._idle.put(slot)
+
+    def check(self, text: str) -> list:
+        """Runs one LanguageTool check; a failed instance is restarted and the check retried once."""
+        with self.acquire() as slot:
+            try:
+                return slot.tool.check(text)
+            except Exception as e:
+                logging.warning(f"LanguageTool check failed ({e}); retrying on a fresh instance.")
+                self._restart(slot)
+                return slot.tool.check(text)
+
+    def start(self):
+        """Starts every idle instance concurrently, so the first checks find them warm."""
+        slots = []
+        while True:
+            try:
+                slots.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        def warm(slot):
+            try:
+                if slot.tool is None:
+                    self._start(slot)
+            except LanguageToolUnavailable as e:
+                logging.error(f"LanguageTool warm-up failed: {e}")
+
+        threads = [threading.Thread(target=warm, args=(slot,), daemon=True) for slot in slots]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            for slot in slots:
+                self._idle.put(slot)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_tool(slot)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": self._idle.qsize(), "restarts": self.restarts, "last_error": self.last_error}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_language_tool_pool() -> LanguageToolPool:
+    """
+    The process-wide pool. LANGUAGETOOL_POOL_SIZE sets the number of Java
+    servers (each needs a few hundred MB of memory).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = LanguageToolPool(int(os.getenv("LANGUAGETOOL_POOL_SIZE", DEFAULT_POOL_SIZE)))
+        return _pool
+
+
+def shutdown_language_tool_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
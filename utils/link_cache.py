@@ -0,0 +1,204 @@
+import os
+import time
+import atexit
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+# how long a link status stays valid, by status class. healthy links are
+# stable for a long time; failures are re-checked soon in case they were transient
+STATUS_TTLS = {
+    2: 24 * 3600,
+    3: 6 * 3600,
+    4: 3600,
+    5: 300,
+}
+ERROR_TTL = 120  # network errors / timeouts (status None)
+DEFAULT_MAX_ENTRIES = 50000
+# queued disk writes are flushed this often, or as soon as a batch is full
+FLUSH_INTERVAL_SECONDS = 1.0
+FLUSH_BATCH_SIZE = 500
+
+
+def normalize_url(url: str) -> str:
+    """Normalizes a URL into a cache key: lowercase scheme/host, no default port, no fragment."""
+    try:
+        parts = urlsplit(url.strip())
+        # .port raises for out-of-range or non-numeric ports
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = port if port and (scheme, port) not in (("http", 80), ("https", 443)) else None
+    netloc = f"{host}:{port}" if port else host
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def ttl_for_status(status: int | None) -> int:
+    if status is None:
+        return ERROR_TTL
+    return STATUS_TTLS.get(status // 100, ERROR_TTL)
+
+
+class LinkStatusCache:
+    """
+    Two-tier cache of link check results keyed by normalized URL.
+
+    The in-memory tier is an LRU shared by every audit in the process;
+    the optional on-disk tier (sqlite) survives restarts and can be shared
+    by several workers pointing at the same file. Disk writes are queued
+    and flushed in batches by a writer thread, and get_async() reads the
+    disk tier in the default executor, so the event loop never waits on
+    sqlite.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: str | None = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._pending = {}  # key -> (status, expires), waiting for the writer thread
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # WAL lets several API workers read the file while one writes
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS link_status (url TEXT PRIMARY KEY, status INTEGER, expires REAL)"
+            )
+            self._db.commit()
+            threading.Thread(target=self._writer, name="link-cache-writer", daemon=True).start()
+            atexit.register(self.flush)
+
+    def _get_memory(self, key: str, now: float) -> tuple:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                status, expires = entry
+                if expires > now:
+                    self._memory.move_to_end(key)
+                    return True, status
+                del self._memory[key]
+        return False, None
+
+    def _get_disk(self, key: str, now: float) -> tuple:
+        with self._pending_lock:
+            entry = self._pending.get(key)
+        if entry is None:
+            with self._db_lock:
+                entry = self._db.execute(
+                    "SELECT status, expires FROM link_status WHERE url = ?", (key,)
+                ).fetchone()
+        if entry and entry[1] > now:
+            with self._lock:
+                self._remember(key, entry[0], entry[1])
+            return True, entry[0]
+        return False, None
+
+    def _count(self, found: bool):
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, url: str) -> tuple:
+        """Returns (found, status). `status` may be None for a cached network error."""
+        key, now = normalize_url(url), time.time()
+        found, status = self._get_memory(key, now)
+        if not found and self._db is not None:
+            found, status = self._get_disk(key, now)
+        self._count(found)
+        return found, status
+
+    async def get_async(self, url: str) -> tuple:
+        """get() for coroutines: memory hits return inline, disk reads run in the executor."""
+        key, now = normalize_url(url), time.time()
+        found, status = self._get_memory(key, now)
+        if not found and self._db is not None:
+            found, status = await asyncio.get_running_loop().run_in_executor(None, self._get_disk, key, now)
+        self._count(found)
+        return found, status
+
+    def put(self, url: str, status: int | None):
+        key = normalize_url(url)
+        expires = time.time() + ttl_for_status(status)
+        with self._lock:
+            self._remember(key, status, expires)
+        if self._db is not None:
+            with self._pending_lock:
+                self._pending[key] = (status, expires)
+                full = len(self._pending) >= FLUSH_BATCH_SIZE
+            if full:
+                self._wakeup.set()
+
+    def _remember(self, key: str, status: int | None, expires: float):
+        self._memory[key] = (status, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def flush(self):
+        """Writes queued entries to disk in one transaction."""
+        if self._db is None:
+            return
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        try:
+            with self._db_lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO link_status (url, status, expires) VALUES (?, ?, ?)",
+                    [(key, status, expires) for key, (status, expires) in batch.items()],
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Link cache write failed: {e}")
+
+    def _writer(self):
+        while True:
+            self._wakeup.wait(FLUSH_INTERVAL_SECONDS)
+            self._wakeup.clear()
+            self.flush()
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (_, expires) in self._memory.items() if expires <= now]:
+                del self._memory[key]
+        if self._db is not None:
+            self.flush()
+            with self._db_lock:
+                self._db.execute("DELETE FROM link_status WHERE expires <= ?", (now,))
+                self._db.commit()
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_link_cache() -> LinkStatusCache:
+    """
+    Returns the process-wide link status cache. Set LINK_CACHE_PATH to a
+    sqlite file to enable the on-disk tier.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LinkStatusCache(
+                max_entries=int(os.getenv("LINK_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                path=os.getenv("LINK_CACHE_PATH") or None,
+            )
+        return _shared_cache
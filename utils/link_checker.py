@@ -0,0 +1,361 @@
+import asyncio
+import re
+import time
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+import httpx
+
+from utils.http_policy import http_policy, CircuitOpenError, parse_retry_after
+from utils.redirects import redirect_graph
+
+# status reported for links not requested because their host's circuit was open
+SKIPPED_STATUS = "skipped"
+
+# defaults are tuned to be polite to a single origin while still
+# checking a few hundred links per page in a couple of seconds
+DEFAULT_MAX_CONCURRENCY = 20
+DEFAULT_PER_HOST_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_SECOND = 8.0
+DEFAULT_TIMEOUT = 10
+
+# statuses that many servers return for HEAD even though GET works fine
+HEAD_UNRELIABLE_STATUSES = {400, 403, 405, 501}
+# when a server gives no usable size header, read at most this much to measure it
+PROBE_MAX_BYTES = 512 * 1024
+_CONTENT_RANGE_TOTAL = re.compile(r"/\s*(\d+)\s*$")
+
+
+class ProbeMethodMemory:
+    """Remembers, per host, whether HEAD can be trusted or probes should go straight to GET."""
+
+    def __init__(self):
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> str:
+        with self._lock:
+            return self._methods.get(host, "HEAD")
+
+    def remember(self, host: str, method: str):
+        with self._lock:
+            self._methods[host] = method
+
+
+# shared by every audit in the process so each host is only "learned" once
+probe_methods = ProbeMethodMemory()
+
+
+def _header_size(response: httpx.Response) -> int | None:
+    """Total body size from Content-Range (ranged GET) or Content-Length."""
+    if content_range := response.headers.get("Content-Range"):
+        if match := _CONTENT_RANGE_TOTAL.search(content_range):
+            return int(match.group(1))
+    if response.status_code != 206 and (length := response.headers.get("Content-Length")):
+        try:
+            return int(length)
+        except ValueError:
+            return None
+    return None
+
+
+class HostRateLimiter:
+    """Spaces out request start times per host to stay within a requests-per-second budget."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second and requests_per_second > 0 else 0.0
+        self._next_slot = defaultdict(float)
+
+    async def wait(self, host: str):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        # reserve the next free slot before sleeping so concurrent callers queue up behind it
+        slot = max(now, self._next_slot[host])
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class _HostGate:
+    __slots__ = ("inflight", "condition")
+
+    def __init__(self):
+        self.inflight = 0
+        self.condition = asyncio.Condition()
+
+
+class LinkChecker:
+    """
+    Bounded-concurrency HTTP prober used for link and resource checks.
+
+    Every request goes through three gates: a per-host concurrency cap,
+    a per-host requests-per-second budget and a global concurrency cap.
+    Requests waiting on a busy host do not hold a global slot, so one slow
+    origin cannot starve the others.
+
+    The per-host cap is the lower of `per_host_concurrency` and the limit the
+    shared adaptive host policy currently allows; every response is fed back
+    into that policy, and hosts with an open circuit fail fast.
+
+    Redirect hops are recorded in the shared redirect graph, and URLs whose
+    redirects are already known are probed at their final target directly.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache=None,
+        policy=http_policy,
+        redirects=redirect_graph,
+    ):
+        self.client = client
+        self.cache = cache
+        self.policy = policy
+        self.redirects = redirects
+        self.timeout = timeout
+        self.per_host_concurrency = per_host_concurrency
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts = {}
+        self._rate = HostRateLimiter(requests_per_second)
+        self._owns_client = client is None
+        self._max_concurrency = max_concurrency
+
+    async def __aenter__(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self._max_concurrency),
+            )
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _host_gate(self, host: str) -> _HostGate:
+        if host not in self._hosts:
+            self._hosts[host] = _HostGate()
+        return self._hosts[host]
+
+    def _host_limit(self, host: str) -> int:
+        return min(self.per_host_concurrency, self.policy.limit(host))
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Holds the per-host, rate and global gates for the duration of the block."""
+        host = urlparse(url).netloc
+        gate = self._host_gate(host)
+        async with gate.condition:
+            await gate.condition.wait_for(lambda: gate.inflight < self._host_limit(host))
+            gate.inflight += 1
+        try:
+            if not self.policy.allow(host):
+                raise CircuitOpenError(f"Circuit breaker open for {host}; skipping {url}")
+            if (retry_after := self.policy.delay(host)) > 0:
+                await asyncio.sleep(retry_after)
+            await self._rate.wait(host)
+            async with self._global:
+                yield
+        finally:
+            async with gate.condition:
+                gate.inflight -= 1
+                gate.condition.notify_all()
+
+    def _record(self, url: str, started: float, response: httpx.Response | None):
+        host = urlparse(url).netloc
+        if response is None:
+            self.policy.record(host, None, None)
+        else:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.policy.record(host, time.monotonic() - started, response.status_code, retry_after)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Sends one request through the concurrency and rate gates."""
+        kwargs.setdefault("timeout", self.policy.timeout(urlparse(url).netloc, self.timeout))
+        async with self.slot(url):
+            started = time.monotonic()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                self._record(url, started, None)
+                raise
+            self._record(url, started, response)
+            if response.history:
+                self.redirects.record(response)
+            return response
+
+    async def _probe_get(self, url: str, need_size: bool) -> dict:
+        # a ranged GET: servers that honour Range send one byte plus the total
+        # size in Content-Range; the rest close as soon as we stop reading
+        timeout = self.policy.timeout(urlparse(url).netloc, self.timeout)
+        request = self.client.build_request("GET", url, headers={"Range": "bytes=0-0"}, timeout=timeout)
+        async with self.slot(url):
+            started = time.monotonic()
+            try:
+                response = await self.client.send(request, stream=True)
+            except httpx.TransportError:
+                self._record(url, started, None)
+                raise
+            self._record(url, started, response)
+            if response.history:
+                self.redirects.record(response)
+            try:
+                size = _header_size(response)
+                # a 206 body is only the requested range (its total may be "*"), so
+                # counting it would report the range length as the size
+                if need_size and size is None and response.status_code < 400 and response.status_code != 206:
+                    # no size header at all (chunked): count the first bytes only
+                    size = 0
+                    async for chunk in response.aiter_raw():
+                        size += len(chunk)
+                        if size >= PROBE_MAX_BYTES:
+                            break
+            finally:
+                await response.aclose()
+
+        status = response.status_code
+        if status in (206, 416):
+            # 416 is what servers answer for a range on an empty body
+            status = 200
+        return {"status": status, "headers": response.headers, "content_length": size, "method": "GET"}
+
+    async def peek(self, url: str, parse, max_bytes: int = PROBE_MAX_BYTES) -> dict:
+        """
+        Streams the start of a body, calling `parse(prefix)` after every chunk,
+        and closes the response as soon as it returns something other than
+        None or `max_bytes` have been read. The Range header keeps servers that
+        honour it from sending more than that in the first place.
+        """
+        url = self.redirects.final_url(url) or url
+        timeout = self.policy.timeout(urlparse(url).netloc, self.timeout)
+        request = self.client.build_request("GET", url, headers={"Range": f"bytes=0-{max_bytes - 1}"}, timeout=timeout)
+        async with self.slot(url):
+            started = time.monotonic()
+            try:
+                response = await self.client.send(request, stream=True)
+            except httpx.TransportError:
+                self._record(url, started, None)
+                raise
+            self._record(url, started, response)
+            if response.history:
+                self.redirects.record(response)
+            prefix = b""
+            parsed = None
+            try:
+                if response.status_code < 400:
+                    async for chunk in response.aiter_bytes():
+                        prefix += chunk
+                        if (parsed := parse(prefix)) is not None or len(prefix) >= max_bytes:
+                            break
+            finally:
+                await response.aclose()
+
+        status = 200 if response.status_code == 206 else response.status_code
+        return {"status": status, "headers": response.headers, "result": parsed, "bytes_read": len(prefix)}
+
+    async def fetch(self, url: str, max_bytes: int, headers: dict | None = None, keep_truncated: bool = False) -> dict:
+        """
+        GETs a whole body through the gates. `body` is None unless the status
+        is 200 and the body fits in `max_bytes`; larger bodies are abandoned
+        as soon as they cross the limit (`truncated`). With `keep_truncated`,
+        such a body is returned cut at `max_bytes` instead.
+        """
+        url = self.redirects.final_url(url) or url
+        timeout = self.policy.timeout(urlparse(url).netloc, self.timeout)
+        request = self.client.build_request("GET", url, headers=headers, timeout=timeout)
+        async with self.slot(url):
+            started = time.monotonic()
+            try:
+                response = await self.client.send(request, stream=True)
+            except httpx.TransportError:
+                self._record(url, started, None)
+                raise
+            self._record(url, started, response)
+            if response.history:
+                self.redirects.record(response)
+            chunks, size, truncated = [], 0, False
+            try:
+                if response.status_code == 200:
+                    async for chunk in response.aiter_bytes():
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size > max_bytes:
+                            truncated = True
+                            break
+            finally:
+                await response.aclose()
+
+        body = None
+        if response.status_code == 200 and (keep_truncated or not truncated):
+            body = b"".join(chunks)[:max_bytes]
+        return {"url": str(response.url), "status": response.status_code, "headers": response.headers,
+                "body": body, "truncated": truncated}
+
+    async def probe(self, url: str, need_size: bool = False) -> dict:
+        """
+        Probes a URL with HEAD, falling back to a ranged/streamed GET when the
+        server rejects HEAD or (when `need_size` is set) gives no usable size.
+        Which method worked is remembered per host.
+        """
+        # skip redirect hops we have already followed once
+        url = self.redirects.final_url(url) or url
+        host = urlparse(url).netloc
+        if probe_methods.get(host) == "HEAD":
+            response = await self.request("HEAD", url)
+            size = _header_size(response)
+            head_ok = response.status_code not in HEAD_UNRELIABLE_STATUSES
+            if head_ok and not (need_size and not size and response.status_code < 400):
+                return {"status": response.status_code, "headers": response.headers, "content_length": size, "method": "HEAD"}
+
+            result = await self._probe_get(url, need_size)
+            if not head_ok and result["status"] < 400:
+                # HEAD is broken on this host; skip it from now on
+                probe_methods.remember(host, "GET")
+            return result
+
+        return await self._probe_get(url, need_size)
+
+    async def check(self, url: str) -> tuple:
+        """
+        Returns (url, status_code), with None as the status when the request
+        failed and SKIPPED_STATUS when the host's circuit breaker was open.
+        """
+        try:
+            if self.cache is not None:
+                found, status = await self.cache.get_async(url)
+                if found:
+                    return url, status
+            status = (await self.probe(url))["status"]
+        except CircuitOpenError:
+            # never requested, so it says nothing about the link: not cached, not broken
+            return url, SKIPPED_STATUS
+        except Exception:
+            # one malformed link (bad port, invalid host) must not abort the whole check
+            status = None
+
+        if self.cache is not None:
+            try:
+                self.cache.put(url, status)
+            except Exception as e:
+                logging.warning(f"Could not cache link status for {url}: {e}")
+        return url, status
+
+    async def stream(self, urls: list):
+        """Yields (url, status_code) tuples in completion order."""
+        tasks = [asyncio.create_task(self.check(url)) for url in dict.fromkeys(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
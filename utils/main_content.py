@@ -0,0 +1,244 @@
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+
+from bs4 import NavigableString, Tag
+from bs4.element import PreformattedString
+
+# elements that start a new text block; inline elements (a, span, em, ...) stay in their block
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "body", "dd", "details", "dialog", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+    "nav", "ol", "p", "pre", "section", "summary", "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# never visible text
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "object", "canvas", "select", "button"}
+# page chrome, dropped as a whole
+BOILERPLATE_TAGS = {"nav", "footer", "aside", "dialog", "menu"}
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search", "menu", "menubar", "dialog"}
+_BOILERPLATE_HINT = re.compile(r"\b(cookies?|consent|gdpr|breadcrumbs?|sidebar|navbar|nav|menu|footer|social|share|newsletter|skip-link)\b")
+
+# block classification thresholds, in characters (after jusText)
+MAX_LINK_DENSITY = 0.33
+SHORT_BLOCK_CHARS = 40
+GOOD_BLOCK_CHARS = 150
+# a container named like chrome is only dropped when it holds less than this share of the page text
+HINTED_CHROME_MAX_SHARE = 0.25
+
+
+def _is_boilerplate_container(tag: Tag) -> bool:
+    if tag.name in BOILERPLATE_TAGS:
+        return True
+    if tag.get("role", "").lower() in BOILERPLATE_ROLES:
+        return True
+    return tag.has_attr("hidden") or tag.get("aria-hidden", "").lower() == "true"
+
+
+def _is_hinted_chrome(tag: Tag, page_chars: int) -> bool:
+    """
+    Whether a container whose class or id names page chrome ("sidebar",
+    "menu", "share", ...) really is chrome. Layout wrappers often carry such
+    names ("layout-with-sidebar", "menu-open"), so the hint only counts for
+    containers that hold no main or article content and whose text is
+    link-heavy or a small share of the page.
+    """
+    if tag.name in ("html", "body", "main", "article"):
+        return False
+    hints = " ".join(tag.get("class", [])) + " " + tag.get("id", "")
+    if not hints.strip() or not _BOILERPLATE_HINT.search(hints.lower()):
+        return False
+    if tag.find(["main", "article"]) or tag.find(attrs={"role": "main"}):
+        return False
+    chars = len(tag.get_text(" ", strip=True))
+    if not chars:
+        return True
+    link_chars = sum(len(a.get_text(" ", strip=True)) for a in tag.find_all("a"))
+    return link_chars / chars > MAX_LINK_DENSITY or chars < page_chars * HINTED_CHROME_MAX_SHARE
+
+
+def _content_root(body: Tag) -> Tag:
+    """The page's single <main> (or role=main) element if it has one, else the body."""
+    mains = body.find_all("main") or body.find_all(attrs={"role": "main"})
+    return mains[0] if len(mains) == 1 else body
+
+
+def segment_blocks(root: Tag) -> list:
+    """
+    Splits the visible text under `root` into blocks: runs of text owned by
+    the same block-level element. Each block records its text, length, how
+    much of it is link text and the owning tag. Text inside page chrome
+    (nav, footer, aside, navigation roles, cookie/menu containers) and hidden
+    elements is left out.
+    """
+    blocks, current = [], None
+    page_chars = len(root.get_text(" ", strip=True))
+    # iterative walk: (node, owner, in_link); owner is the nearest block element
+    stack = [(root, root, False)]
+    while stack:
+        node, owner, in_link = stack.pop()
+        if isinstance(node, Tag):
+            if node.name in SKIP_TAGS or (node is not root and (_is_boilerplate_container(node) or _is_hinted_chrome(node, page_chars))):
+                continue
+            if node.name in BLOCK_TAGS:
+                owner = node
+            in_link = in_link or node.name == "a"
+            stack.extend((child, owner, in_link) for child in reversed(node.contents))
+        elif isinstance(node, NavigableString) and not isinstance(node, PreformattedString):
+            text = " ".join(node.split())
+            if not text:
+                continue
+            if current is None or current["owner"] is not owner:
+                current = {"owner": owner, "tag": owner.name, "parts": [], "chars": 0, "link_chars": 0}
+                blocks.append(current)
+            current["parts"].append(text)
+            current["chars"] += len(text)
+            if in_link:
+                current["link_chars"] += len(text)
+    for block in blocks:
+        block["text"] = " ".join(block.pop("parts"))
+        del block["owner"]
+    return blocks
+
+
+def classify_blocks(blocks: list, template: set = frozenset()):
+    """
+    Labels every block "good" or "bad" in place. Link-heavy blocks and blocks
+    in `template` (fingerprints of text repeated across pages) are bad, long
+    blocks are good, and short or medium blocks take the label of their
+    neighbours, so a short paragraph inside an article is kept while a short
+    line between menus is not. Headings are kept when content follows them.
+    """
+    for block in blocks:
+        link_density = block["link_chars"] / block["chars"]
+        if link_density > MAX_LINK_DENSITY or block_fingerprint(block["text"]) in template:
+            block["class"] = "bad"
+        elif block["chars"] >= GOOD_BLOCK_CHARS:
+            block["class"] = "good"
+        elif block["chars"] < SHORT_BLOCK_CHARS:
+            block["class"] = "short"
+        else:
+            block["class"] = "near-good"
+
+    def neighbour(index, step):
+        index += step
+        while 0 <= index < len(blocks):
+            if blocks[index]["class"] in ("good", "bad"):
+                return blocks[index]["class"]
+            index += step
+        return "bad"
+
+    labels = []
+    for index, block in enumerate(blocks):
+        label = block["class"]
+        if label in ("short", "near-good"):
+            before, after = neighbour(index, -1), neighbour(index, 1)
+            if block["tag"] in HEADING_TAGS:
+                label = "good" if after == "good" else "bad"
+            elif before == after == "good" or (label == "near-good" and "good" in (before, after)):
+                label = "good"
+            else:
+                label = "bad"
+        labels.append(label)
+    for block, label in zip(blocks, labels):
+        block["class"] = label
+
+
+def block_fingerprint(text: str) -> str:
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8", errors="replace")).hexdigest()
+
+
+class TemplateLearner:
+    """
+    Remembers which text blocks each host repeats on different pages, so
+    blocks that belong to the site template (footers, disclaimers, cookie
+    notices, sidebars) can be dropped from later pages of the same crawl.
+    A block is template once it was seen on `min_pages` other pages.
+    Bounded per host and in the number of hosts.
+    """
+
+    def __init__(self, min_pages: int = 2, max_hosts: int = 500, max_blocks_per_host: int = 5000):
+        self.min_pages = min_pages
+        self.max_hosts = max_hosts
+        self.max_blocks_per_host = max_blocks_per_host
+        self._hosts = OrderedDict()  # host -> OrderedDict(fingerprint -> set of page keys)
+        self._lock = threading.Lock()
+
+    def observe(self, host: str, page: str, fingerprints: list) -> set:
+        """Records the page's blocks and returns those that are template for the host."""
+        page_key = hashlib.sha1(page.encode("utf-8", errors="replace")).hexdigest()[:16]
+        template = set()
+        with self._lock:
+            seen = self._hosts.setdefault(host, OrderedDict())
+            self._hosts.move_to_end(host)
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+            for fingerprint in set(fingerprints):
+                pages = seen.setdefault(fingerprint, set())
+                seen.move_to_end(fingerprint)
+                if len(pages - {page_key}) >= self.min_pages:
+                    template.add(fingerprint)
+                elif len(pages) <= self.min_pages:
+                    pages.add(page_key)
+            while len(seen) > self.max_blocks_per_host:
+                seen.popitem(last=False)
+        return template
+
+
+_template_learner = None
+_learner_lock = threading.Lock()
+
+
+def get_template_learner() -> TemplateLearner | None:
+    """
+    The process-wide template learner, or None when cross-page learning is
+    off. CONTENT_TEMPLATE_LEARNING=1 turns it on for crawls that audit many
+    pages of the same site in one process.
+    """
+    global _template_learner
+    if os.getenv("CONTENT_TEMPLATE_LEARNING", "").lower() not in ("1", "true", "yes"):
+        return None
+    with _learner_lock:
+        if _template_learner is None:
+            _template_learner = TemplateLearner()
+        return _template_learner
+
+
+def extract_main_content(soup, page_url: str = "", host: str = "", learner: TemplateLearner | None = None) -> dict:
+    """
+    Separates a page's main content from its boilerplate using block text
+    length and link density (and, with a `learner`, text repeated across
+    pages of the same host).
+
+    Returns:
+        A dictionary with body_text (all visible body text, as before),
+        main_text, their word counts, and block counts.
+    """
+    result = {"body_text": "", "main_text": "", "body_word_count": 0, "main_word_count": 0,
+              "blocks": 0, "content_blocks": 0, "template_blocks": 0, "scope": "body"}
+    body = soup.body
+    if body is None:
+        return result
+    result["body_text"] = body.get_text(separator=" ", strip=True)
+    result["body_word_count"] = len(result["body_text"].split())
+
+    root = _content_root(body)
+    result["scope"] = root.name
+    blocks = segment_blocks(root)
+    template = set()
+    if learner is not None and host:
+        template = learner.observe(host, page_url, [block_fingerprint(b["text"]) for b in blocks])
+    classify_blocks(blocks, template)
+
+    content = [b["text"] for b in blocks if b["class"] == "good"]
+    if not content:
+        # nothing reads like an article (short landing pages): keep every block that is not chrome
+        content = [b["text"] for b in blocks if b["link_chars"] / b["chars"] <= MAX_LINK_DENSITY] or [b["text"] for b in blocks]
+    result["main_text"] = " ".join(content) or result["body_text"]
+    result["main_word_count"] = len(result["main_text"].split())
+    result["blocks"] = len(blocks)
+    result["content_blocks"] = len(content)
+    result["template_blocks"] = sum(1 for b in blocks if block_fingerprint(b["text"]) in template) if template else 0
+    return result
@@ -0,0 +1,93 @@
+from collections import deque
+
+# Optional: the C automaton from pyahocorasick is used when installed
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class MultiPatternMatcher:
+    """
+    Aho-Corasick automaton over a set of literal patterns. One pass over the
+    text reports every occurrence of every pattern, so the scan cost depends on
+    the text length and the number of matches, not on the number of patterns.
+
+    Patterns map to values (several patterns may share a value, and one
+    pattern may carry several values). Matching is case-insensitive unless
+    `case_sensitive` is set.
+    """
+
+    def __init__(self, patterns, case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        values = {}
+        for pattern, value in (patterns.items() if isinstance(patterns, dict) else patterns):
+            if not pattern:
+                continue
+            key = pattern if case_sensitive else pattern.lower()
+            values.setdefault(key, []).append(value)
+        self._values = values
+        self._automaton = None
+        if not values:
+            return
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for key, key_values in values.items():
+                automaton.add_word(key, (key, key_values))
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            self._build(values)
+
+    def _build(self, values: dict):
+        goto, fail, output = [{}], [0], [[]]
+        for key in values:
+            state = 0
+            for char in key:
+                if char not in goto[state]:
+                    goto.append({})
+                    fail.append(0)
+                    output.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            output[state].append(key)
+        # breadth-first: a state's failure link is the longest proper suffix that is also a prefix
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                queue.append(child)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[child] = goto[link].get(char, 0)
+                output[child] = output[child] + output[fail[child]]
+        self._goto, self._fail, self._output = goto, fail, output
+        self._automaton = True
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def iter_matches(self, text: str):
+        """Yields (start, end, pattern, values) for every occurrence, by end offset."""
+        if not self._automaton or not text:
+            return
+        if not self.case_sensitive:
+            text = text.lower()
+        if ahocorasick is not None:
+            for end, (key, key_values) in self._automaton.iter(text):
+                yield end - len(key) + 1, end + 1, key, key_values
+            return
+        goto, fail, output, values = self._goto, self._fail, self._output, self._values
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for key in output[state]:
+                    yield index - len(key) + 1, index + 1, key, values[key]
+
+    def matched_values(self, text: str) -> set:
+        """The distinct values whose patterns occur anywhere in `text`."""
+        return {value for _, _, _, key_values in self.iter_matches(text) for value in key_values}
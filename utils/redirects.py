@@ -0,0 +1,94 @@
+import time
+import threading
+from urllib.parse import urljoin
+
+from utils.link_cache import normalize_url
+
+# permanent redirects are stable; temporary ones are re-followed sooner
+PERMANENT_REDIRECT_TTL = 24 * 3600
+TEMPORARY_REDIRECT_TTL = 3600
+MAX_REDIRECT_HOPS = 10
+
+
+class RedirectGraph:
+    """
+    Memoized redirect edges (source URL -> status, target URL).
+
+    Every fetch that followed redirects records its hops here, so a URL seen
+    once — by the main fetch, the canonicalization check or the link checker —
+    can later be resolved to its final target and full chain without sending
+    the same 301s again. One graph is shared by every audit in the process,
+    which makes it span a whole crawl.
+    """
+
+    def __init__(self, max_edges: int = 200000):
+        self.max_edges = max_edges
+        self._edges = {}
+        self._lock = threading.Lock()
+
+    def add(self, source: str, status: int, target: str):
+        ttl = PERMANENT_REDIRECT_TTL if status in (301, 308) else TEMPORARY_REDIRECT_TTL
+        key = normalize_url(source)
+        with self._lock:
+            if len(self._edges) >= self.max_edges and key not in self._edges:
+                # drop the oldest edge; dicts keep insertion order
+                self._edges.pop(next(iter(self._edges)))
+            self._edges[key] = (status, target, time.time() + ttl)
+
+    def record(self, response) -> list:
+        """
+        Records the hops of a requests or httpx response that followed redirects
+        and returns them as a chain: [{"from", "url", "status_code"}, ...] where
+        "url" is where that hop pointed to.
+        """
+        history = list(getattr(response, "history", None) or [])
+        chain = []
+        for index, hop in enumerate(history):
+            source = str(hop.url)
+            if index + 1 < len(history):
+                target = str(history[index + 1].url)
+            else:
+                target = str(response.url)
+            # prefer the Location header, resolved against the hop, when present
+            if location := hop.headers.get("location"):
+                target = urljoin(source, location)
+            self.add(source, hop.status_code, target)
+            chain.append({"from": source, "url": target, "status_code": hop.status_code})
+        return chain
+
+    def _edge(self, url: str):
+        with self._lock:
+            edge = self._edges.get(normalize_url(url))
+        if edge and edge[2] > time.time():
+            return edge
+        return None
+
+    def resolve(self, url: str) -> dict:
+        """
+        Follows memoized edges from `url`. `complete` is False when the walk
+        stopped on a loop or hit the hop limit.
+        """
+        chain = []
+        seen = {normalize_url(url)}
+        current = url
+        complete = True
+        while (edge := self._edge(current)) is not None:
+            status, target, _ = edge
+            chain.append({"from": current, "url": target, "status_code": status})
+            key = normalize_url(target)
+            if key in seen or len(chain) >= MAX_REDIRECT_HOPS:
+                complete = False
+                break
+            seen.add(key)
+            current = target
+        return {"url": url, "final_url": current, "chain": chain, "complete": complete}
+
+    def final_url(self, url: str) -> str | None:
+        """The memoized final target of `url`, or None if no redirect is known for it."""
+        resolved = self.resolve(url)
+        if not resolved["chain"] or not resolved["complete"]:
+            return None
+        return resolved["final_url"]
+
+
+redirect_graph = RedirectGraph()
@@ -0,0 +1,161 @@
+import os
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+
+from utils.link_checker import LinkChecker
+
+# per audit: stop fetching once this many body bytes are held
+DEFAULT_AUDIT_BYTE_CAP = 20 * 1024 * 1024
+DEFAULT_MAX_BODY_BYTES = 5 * 1024 * 1024
+# across audits: validated with If-None-Match, evicted least recently used
+DEFAULT_SHARED_BYTE_CAP = 64 * 1024 * 1024
+
+
+class ResourceBody:
+    """One fetched body. `text` is decoded once and shared by every consumer."""
+
+    __slots__ = ("url", "status", "content_type", "etag", "body", "_text", "error")
+
+    def __init__(self, url: str, status: int | None = None, content_type: str = "", etag: str | None = None,
+                 body: bytes | None = None, error: str | None = None):
+        self.url = url
+        self.status = status
+        self.content_type = content_type
+        self.etag = etag
+        self.body = body
+        self.error = error
+        self._text = None
+
+    @property
+    def text(self) -> str | None:
+        if self.body is None:
+            return None
+        if self._text is None:
+            charset = "utf-8"
+            for part in self.content_type.split(";"):
+                name, _, value = part.strip().partition("=")
+                if name.lower() == "charset" and value:
+                    charset = value.strip('"\'')
+            try:
+                self._text = self.body.decode(charset, errors="replace")
+            except LookupError:
+                self._text = self.body.decode("utf-8", errors="replace")
+        return self._text
+
+
+class SharedBodyCache:
+    """Cross-audit LRU of bodies keyed by (URL, ETag), bounded by total bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_SHARED_BYTE_CAP):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._latest_etag = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def latest(self, url: str) -> ResourceBody | None:
+        """The most recently stored body for `url`, to revalidate with its ETag."""
+        with self._lock:
+            key = (url, self._latest_etag.get(url))
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, entry: ResourceBody):
+        if not entry.etag or entry.body is None or len(entry.body) > self.max_bytes:
+            return
+        key = (entry.url, entry.etag)
+        with self._lock:
+            if (old := self._entries.pop(key, None)) is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._latest_etag[entry.url] = entry.etag
+            self._bytes += len(entry.body)
+            while self._bytes > self.max_bytes:
+                (url, etag), evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                if self._latest_etag.get(url) == etag:
+                    del self._latest_etag[url]
+
+
+shared_bodies = SharedBodyCache(int(os.getenv("RESOURCE_CACHE_MAX_BYTES", DEFAULT_SHARED_BYTE_CAP)))
+
+
+class ResourceStore:
+    """
+    Per-audit store of CSS/JS (and other text) bodies.
+
+    fetch_all() downloads every requested body concurrently, once, through the
+    bounded LinkChecker. Bodies seen by an earlier audit are revalidated with
+    If-None-Match and reused on 304. Consumers read the same bytes and the same
+    decoded text through get()/text(); nothing is copied or fetched twice.
+    """
+
+    def __init__(self, max_total_bytes: int = DEFAULT_AUDIT_BYTE_CAP, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+                 shared: SharedBodyCache | None = shared_bodies, checker: LinkChecker | None = None):
+        self.max_total_bytes = max_total_bytes
+        self.checker = checker  # the audit's checker, used by fetch_all unless one is passed
+        self.max_body_bytes = max_body_bytes
+        self.shared = shared
+        self.total_bytes = 0
+        self.revalidated = 0
+        self._entries = {}
+
+    def get(self, url: str) -> ResourceBody | None:
+        return self._entries.get(url)
+
+    def text(self, url: str) -> str | None:
+        entry = self._entries.get(url)
+        return entry.text if entry else None
+
+    def items(self):
+        return self._entries.items()
+
+    def add(self, url: str, body: bytes, content_type: str = ""):
+        """Registers a body the caller already holds (e.g. the HTML document)."""
+        self._entries[url] = ResourceBody(url, 200, content_type, body=body)
+
+    async def _fetch(self, checker: LinkChecker, url: str) -> ResourceBody:
+        cached = self.shared.latest(url) if self.shared is not None else None
+        headers = {"If-None-Match": cached.etag} if cached else None
+        budget = min(self.max_body_bytes, self.max_total_bytes - self.total_bytes)
+        if budget <= 0:
+            return ResourceBody(url, error="Audit byte cap reached; body not fetched.")
+        try:
+            fetched = await checker.fetch(url, max_bytes=budget, headers=headers)
+        except Exception as e:
+            logging.warning(f"Could not fetch resource body {url}: {e}")
+            return ResourceBody(url, error=str(e))
+
+        if fetched["status"] == 304 and cached is not None:
+            entry = cached
+            self.revalidated += 1
+        elif fetched["body"] is not None:
+            entry = ResourceBody(url, 200, fetched["headers"].get("Content-Type", ""),
+                                 fetched["headers"].get("ETag"), fetched["body"])
+            if self.shared is not None:
+                self.shared.put(entry)
+        elif fetched["truncated"]:
+            return ResourceBody(url, 200, error=f"Body larger than {budget} bytes; skipped.")
+        else:
+            return ResourceBody(url, fetched["status"], error=f"HTTP {fetched['status']}")
+
+        if self.total_bytes + len(entry.body) > self.max_total_bytes:
+            return ResourceBody(url, entry.status, error="Audit byte cap reached; body dropped.")
+        self.total_bytes += len(entry.body)
+        return entry
+
+    async def fetch_all(self, urls: list, timeout: float = 10, checker: LinkChecker | None = None, **limits):
+        """Fetches every URL not already in the store, concurrently (through the audit's `checker` when given)."""
+        pending = [url for url in dict.fromkeys(urls) if url and url not in self._entries]
+        if not pending:
+            return self
+        checker = checker or self.checker
+        async with nullcontext(checker) if checker is not None else LinkChecker(timeout=timeout, **limits) as checker:
+            entries = await asyncio.gather(*(self._fetch(checker, url) for url in pending))
+        self._entries.update(zip(pending, entries))
+        return self
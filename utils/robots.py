@@ -0,0 +1,183 @@
+import re
+import time
+import threading
+from urllib.parse import urlparse, unquote
+
+# robots.txt files are small and rarely change during an audit or crawl,
+# so a compiled model is kept per host and reused for every url check
+ROBOTS_CACHE_TTL = 3600
+ROBOTS_CACHE_MAX_HOSTS = 1024
+
+
+def _normalize_path(path: str) -> str:
+    # rules and urls are compared on their decoded form so that
+    # "/caf%C3%A9" and "/café" match the same rule
+    try:
+        return unquote(path)
+    except Exception:
+        return path
+
+
+class RobotsRule:
+    """A single Allow/Disallow line compiled for fast matching."""
+
+    __slots__ = ("pattern", "allow", "length", "_prefix", "_regex")
+
+    def __init__(self, pattern: str, allow: bool):
+        self.pattern = pattern
+        self.allow = allow
+        # longest-match precedence is measured on the raw rule text (RFC 9309)
+        self.length = len(pattern)
+
+        normalized = _normalize_path(pattern)
+        if "*" not in normalized and not normalized.endswith("$"):
+            # the common case: a plain prefix, no regex needed
+            self._prefix = normalized
+            self._regex = None
+        else:
+            self._prefix = None
+            anchored = normalized.endswith("$")
+            body = normalized[:-1] if anchored else normalized
+            regex = ".*".join(re.escape(part) for part in body.split("*"))
+            self._regex = re.compile(regex + ("$" if anchored else ""), re.DOTALL)
+
+    def matches(self, path: str) -> bool:
+        if self._regex is None:
+            return path.startswith(self._prefix)
+        return self._regex.match(path) is not None
+
+
+class RobotsRules:
+    """
+    A parsed robots.txt, compiled once into per-agent rule tables.
+
+    Rules inside a group are sorted by descending length so the first
+    match is the most specific one; on a tie, Allow wins over Disallow.
+    """
+
+    def __init__(self, content: str = ""):
+        self.groups = {}
+        self.sitemaps = []
+        self._agent_cache = {}
+        self._parse(content or "")
+
+    def _parse(self, content: str):
+        current_agents = []
+        in_rules = False
+
+        for raw_line in content.splitlines():
+            line = raw_line.split("#", 1)[0].strip()
+            if not line or ":" not in line:
+                continue
+            field, value = line.split(":", 1)
+            field = field.strip().lower()
+            value = value.strip()
+
+            if field == "user-agent":
+                # a user-agent line after rules starts a new group
+                if in_rules:
+                    current_agents = []
+                    in_rules = False
+                agent = value.lower()
+                current_agents.append(agent)
+                self.groups.setdefault(agent, [])
+            elif field in ("allow", "disallow"):
+                in_rules = True
+                # an empty Disallow means "allow everything" and adds no rule
+                if not value:
+                    continue
+                rule = RobotsRule(value, allow=(field == "allow"))
+                for agent in current_agents:
+                    self.groups[agent].append(rule)
+            elif field == "sitemap":
+                if value:
+                    self.sitemaps.append(value)
+
+        for rules in self.groups.values():
+            rules.sort(key=lambda r: (r.length, r.allow), reverse=True)
+
+    def _rules_for(self, agent: str) -> list:
+        agent = (agent or "*").lower()
+        if agent in self._agent_cache:
+            return self._agent_cache[agent]
+
+        # the product token is the part before "/", e.g. "Googlebot/2.1"
+        token = agent.split("/", 1)[0].strip()
+        best_name = None
+        for name in self.groups:
+            if name == "*":
+                continue
+            if token.startswith(name) and (best_name is None or len(name) > len(best_name)):
+                best_name = name
+
+        if best_name is not None:
+            rules = self.groups[best_name]
+        else:
+            rules = self.groups.get("*", [])
+        self._agent_cache[agent] = rules
+        return rules
+
+    def blocking_rule(self, url: str, agent: str = "*") -> str | None:
+        """Returns the Disallow rule that blocks the url, or None if it is allowed."""
+        parsed = urlparse(url)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        path = _normalize_path(path)
+
+        # robots.txt itself is always allowed
+        if path == "/robots.txt":
+            return None
+
+        for rule in self._rules_for(agent):
+            if rule.matches(path):
+                return None if rule.allow else rule.pattern
+        return None
+
+    def is_allowed(self, url: str, agent: str = "*") -> bool:
+        return self.blocking_rule(url, agent) is None
+
+    def filter_allowed(self, urls, agent: str = "*"):
+        """Yields only the urls this agent may crawl, e.g. to prune a crawl frontier."""
+        self._rules_for(agent)
+        for url in urls:
+            if self.blocking_rule(url, agent) is None:
+                yield url
+
+    def disallow_rules(self, agent: str = "*") -> list:
+        return [rule.pattern for rule in self._rules_for(agent) if not rule.allow]
+
+
+_robots_cache = {}
+_robots_cache_lock = threading.Lock()
+
+
+def get_robots_rules(host: str, content: str | None, ttl: int = ROBOTS_CACHE_TTL) -> RobotsRules:
+    """
+    Returns the compiled rules for a host. `content` is only parsed when the
+    host is not cached yet, its entry has expired, or the text has changed.
+    """
+    now = time.monotonic()
+    content = content or ""
+    with _robots_cache_lock:
+        entry = _robots_cache.get(host)
+        if entry and entry[0] > now and entry[1] == content:
+            return entry[2]
+
+    rules = RobotsRules(content)
+    with _robots_cache_lock:
+        if host not in _robots_cache and len(_robots_cache) >= ROBOTS_CACHE_MAX_HOSTS:
+            # drop the entry closest to expiry to make room
+            oldest = min(_robots_cache, key=lambda h: _robots_cache[h][0])
+            _robots_cache.pop(oldest, None)
+        _robots_cache[host] = (now + ttl, content, rules)
+    return rules
+
+
+def get_cached_robots_rules(host: str) -> RobotsRules | None:
+    """Returns the cached rules for a host without fetching or parsing anything."""
+    with _robots_cache_lock:
+        entry = _robots_cache.get(host)
+    if entry and entry[0] > time.monotonic():
+        return entry[2]
+    return None
@@ -0,0 +1,150 @@
+import re
+import time
+import asyncio
+import logging
+import threading
+from urllib.parse import urljoin, urlparse
+
+from utils.link_checker import LinkChecker
+from utils.robots import get_robots_rules
+
+# site files change rarely; one probe per host serves every page of a crawl
+SITE_FILES_CACHE_TTL = 3600
+SITE_FILES_ERROR_TTL = 120
+SITE_FILES_CACHE_MAX_HOSTS = 1024
+# robots.txt is capped at 500 KiB by Google; the other files are tiny
+MAX_SITE_FILE_BYTES = 512 * 1024
+
+SECURITY_TXT_PATHS = ("/.well-known/security.txt", "/security.txt")
+
+_CHARSET = re.compile(r"charset=[\"']?([\w-]+)", re.I)
+
+_site_files_cache = {}
+_site_files_cache_lock = threading.Lock()
+
+
+def _looks_like_text_file(fetched: dict) -> bool:
+    # plenty of sites answer unknown paths with a 200 HTML page (soft 404)
+    if fetched["status"] != 200 or fetched["body"] is None:
+        return False
+    content_type = fetched["headers"].get("Content-Type", "").lower()
+    return "html" not in content_type
+
+
+async def _fetch_file(checker: LinkChecker, url: str) -> tuple:
+    """
+    (status, text) of a site file; text is None when it is missing or a soft
+    404, status is None when the request failed. Only the first
+    MAX_SITE_FILE_BYTES are downloaded, which is also all Google reads of robots.txt.
+    """
+    try:
+        fetched = await checker.fetch(url, max_bytes=MAX_SITE_FILE_BYTES, keep_truncated=True)
+    except Exception as e:
+        logging.warning(f"Could not fetch {url}: {e}")
+        return None, None
+    if not _looks_like_text_file(fetched):
+        return fetched["status"], None
+    charset = "utf-8"
+    if match := _CHARSET.search(fetched["headers"].get("Content-Type", "")):
+        charset = match.group(1)
+    try:
+        return fetched["status"], fetched["body"].decode(charset, errors="replace")
+    except LookupError:
+        return fetched["status"], fetched["body"].decode("utf-8", errors="replace")
+
+
+async def _fetch_text(checker: LinkChecker, url: str) -> str | None:
+    return (await _fetch_file(checker, url))[1]
+
+
+async def _exists(checker: LinkChecker, url: str) -> bool:
+    try:
+        return (await checker.probe(url))["status"] == 200
+    except Exception:
+        return False
+
+
+async def _fetch_security_txt(checker: LinkChecker, base_url: str) -> str | None:
+    # RFC 9116 puts it under /.well-known/; the root location is the legacy fallback
+    for path in SECURITY_TXT_PATHS:
+        url = f"{base_url}{path}"
+        content = await _fetch_text(checker, url)
+        if content and "contact:" in content.lower():
+            return url
+    return None
+
+
+async def probe_site_files(base_url: str, timeout: float = 6, use_cache: bool = True, checker: LinkChecker | None = None) -> dict:
+    """
+    Probes robots.txt, the sitemap, ads.txt, security.txt and favicon.ico of
+    a site concurrently and returns the `site_files` flags the analyzer reads,
+    plus the robots.txt text and status for the directive test, so it does not
+    fetch robots.txt again (not even when it was missing). Pass the audit's
+    `checker` to share its connections and per-host limits.
+
+    The sitemap is looked up at /sitemap.xml in the same round trip; the
+    sitemaps listed in robots.txt are only probed if that one is missing.
+    Results are cached per scheme and host.
+    """
+    parsed = urlparse(base_url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}"
+    if use_cache:
+        with _site_files_cache_lock:
+            entry = _site_files_cache.get(base_url)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+    async def run(checker):
+        (robots_status, robots_txt), default_sitemap, ads_txt, security_txt_url, favicon = await asyncio.gather(
+            _fetch_file(checker, f"{base_url}/robots.txt"),
+            _exists(checker, f"{base_url}/sitemap.xml"),
+            _fetch_text(checker, f"{base_url}/ads.txt"),
+            _fetch_security_txt(checker, base_url),
+            _exists(checker, f"{base_url}/favicon.ico"),
+        )
+
+        sitemaps = []
+        if robots_txt is not None:
+            # compiled once here and reused by the directive test
+            sitemaps = [urljoin(f"{base_url}/", sitemap) for sitemap in get_robots_rules(parsed.netloc, robots_txt).sitemaps]
+        sitemap_url = f"{base_url}/sitemap.xml" if default_sitemap else None
+        if sitemap_url is None:
+            for candidate in sitemaps:
+                if await _exists(checker, candidate):
+                    sitemap_url = candidate
+                    break
+
+        return {
+            "has_robots_txt": robots_txt is not None,
+            "has_sitemap": sitemap_url is not None,
+            "has_ads_txt": bool(ads_txt and ads_txt.strip()),
+            "has_security_txt": security_txt_url is not None,
+            "has_favicon_ico": favicon,
+            "sitemap_url": sitemap_url,
+            "sitemaps_in_robots": sitemaps,
+            "security_txt_url": security_txt_url,
+            "robots_txt_content": robots_txt,
+            "robots_txt_status": robots_status,
+        }
+
+    try:
+        if checker is not None:
+            result = await run(checker)
+        else:
+            async with LinkChecker(timeout=timeout) as own_checker:
+                result = await run(own_checker)
+        ttl = SITE_FILES_CACHE_TTL
+    except Exception as e:
+        logging.warning(f"Site file probe failed for {base_url}: {e}")
+        result = {"has_robots_txt": False, "has_sitemap": False, "has_ads_txt": False,
+                  "has_security_txt": False, "has_favicon_ico": False, "sitemap_url": None,
+                  "sitemaps_in_robots": [], "security_txt_url": None, "robots_txt_content": None,
+                  "robots_txt_status": None}
+        ttl = SITE_FILES_ERROR_TTL
+
+    with _site_files_cache_lock:
+        if base_url not in _site_files_cache and len(_site_files_cache) >= SITE_FILES_CACHE_MAX_HOSTS:
+            oldest = min(_site_files_cache, key=lambda k: _site_files_cache[k][0])
+            _site_files_cache.pop(oldest, None)
+        _site_files_cache[base_url] = (time.monotonic() + ttl, result)
+    return result
@@ -0,0 +1,156 @@
+from collections import defaultdict
+
+from utils.multi_match import MultiPatternMatcher
+
+# Bundled signature database. Per technology:
+#   html     - literal snippets found anywhere in the document (script/link URLs, inline code, markup)
+#   headers  - {header name: value substring, or None for "header present"}
+#   cookies  - cookie names; a trailing "*" makes it a prefix
+#   meta     - substrings of <meta name="generator">
+TECH_SIGNATURES = {
+    # CMS and site builders
+    "WordPress": {"category": "cms", "html": ["/wp-content/", "/wp-includes/"], "headers": {"x-pingback": None, "link": "api.w.org"},
+                  "cookies": ["wordpress_*", "wp-settings-*"], "meta": ["wordpress"]},
+    "Drupal": {"category": "cms", "html": ["drupal-settings-json", "/sites/default/files/", "drupal.settings"],
+               "headers": {"x-drupal-cache": None, "x-drupal-dynamic-cache": None, "x-generator": "drupal"}, "meta": ["drupal"]},
+    "Joomla": {"category": "cms", "html": ["/media/jui/", "/components/com_"], "meta": ["joomla"]},
+    "Shopify": {"category": "cms", "html": ["cdn.shopify.com", "shopify.theme"], "headers": {"x-shopid": None, "x-shopify-stage": None},
+                "cookies": ["_shopify_y", "_shopify_s"]},
+    "Wix": {"category": "cms", "html": ["static.wixstatic.com", "static.parastorage.com"], "headers": {"x-wix-request-id": None}, "meta": ["wix.com"]},
+    "Squarespace": {"category": "cms", "html": ["static1.squarespace.com", "squarespace-cdn.com"], "meta": ["squarespace"]},
+    "Webflow": {"category": "cms", "html": ["data-wf-page", "data-wf-site"], "meta": ["webflow"]},
+    "Ghost": {"category": "cms", "html": ["ghost-portal", "/ghost/api/"], "meta": ["ghost"]},
+    "Magento": {"category": "cms", "html": ["mage/cookies", "magento_"], "cookies": ["mage-cache-storage", "mage-cache-sessid"]},
+    "PrestaShop": {"category": "cms", "html": ["prestashop"], "cookies": ["prestashop-*"], "meta": ["prestashop"]},
+    "TYPO3": {"category": "cms", "html": ["/typo3conf/", "/typo3temp/"], "meta": ["typo3"]},
+    "HubSpot CMS": {"category": "cms", "html": ["hs-sites.com", "hubspot-topic"], "meta": ["hubspot"]},
+    # JavaScript frameworks and libraries
+    "React": {"category": "framework", "html": ["data-reactroot", "react-dom.production.min.js", "react.production.min.js"]},
+    "Next.js": {"category": "framework", "html": ["__next_data__", "/_next/static/"], "headers": {"x-powered-by": "next.js", "x-nextjs-cache": None}},
+    "Nuxt": {"category": "framework", "html": ["__nuxt", "/_nuxt/"]},
+    "Vue.js": {"category": "framework", "html": ["data-v-app", "vue.min.js", "vue.global.prod.js", "data-server-rendered"]},
+    "Angular": {"category": "framework", "html": ["ng-version=", "ng-app="]},
+    "Svelte": {"category": "framework", "html": ["svelte-", "__sveltekit"]},
+    "Gatsby": {"category": "framework", "html": ["___gatsby", "/page-data/"], "meta": ["gatsby"]},
+    "Astro": {"category": "framework", "html": ["astro-island"], "meta": ["astro"]},
+    "jQuery": {"category": "library", "html": ["jquery.min.js", "/jquery.js", "code.jquery.com/jquery"]},
+    "Bootstrap": {"category": "library", "html": ["bootstrap.min.css", "bootstrap.min.js", "bootstrap.bundle"]},
+    # server software
+    "PHP": {"category": "server", "headers": {"x-powered-by": "php"}, "cookies": ["phpsessid"]},
+    "ASP.NET": {"category": "server", "html": ["__viewstate"], "headers": {"x-powered-by": "asp.net", "x-aspnet-version": None},
+                "cookies": ["asp.net_sessionid"]},
+    "Express": {"category": "server", "headers": {"x-powered-by": "express"}},
+    "Nginx": {"category": "server", "headers": {"server": "nginx"}},
+    "Apache": {"category": "server", "headers": {"server": "apache"}},
+    "LiteSpeed": {"category": "server", "headers": {"server": "litespeed"}},
+    # analytics
+    "Google Analytics": {"category": "analytics", "html": ["google-analytics.com/analytics.js", "google-analytics.com/ga.js",
+                                                          "googletagmanager.com/gtag/js", "gtag('config'", 'gtag("config"',
+                                                          "ga('create'", 'ga("create"'], "cookies": ["_ga", "_ga_*", "_gid"]},
+    "Facebook Pixel": {"category": "analytics", "html": ["connect.facebook.net/en_us/fbevents.js", "fbq('init'", 'fbq("init"'], "cookies": ["_fbp"]},
+    "Hotjar": {"category": "analytics", "html": ["static.hotjar.com", "hjsiteid"], "cookies": ["_hjsession*"]},
+    "Matomo": {"category": "analytics", "html": ["matomo.js", "piwik.js", "_paq.push"], "cookies": ["_pk_id*"]},
+    "Plausible": {"category": "analytics", "html": ["plausible.io/js"]},
+    "Microsoft Clarity": {"category": "analytics", "html": ["clarity.ms/tag"]},
+    "Adobe Analytics": {"category": "analytics", "html": ["appmeasurement.js", "s_code.js", "omtrdc.net"]},
+    "Mixpanel": {"category": "analytics", "html": ["cdn.mxpnl.com", "mixpanel.init"]},
+    "Yandex Metrica": {"category": "analytics", "html": ["mc.yandex.ru/metrika"], "cookies": ["_ym_uid"]},
+    "LinkedIn Insight": {"category": "analytics", "html": ["snap.licdn.com/li.lms-analytics"]},
+    "TikTok Pixel": {"category": "analytics", "html": ["analytics.tiktok.com"]},
+    # tag managers
+    "Google Tag Manager": {"category": "tag-manager", "html": ["googletagmanager.com/gtm.js", "googletagmanager.com/ns.html"]},
+    "Tealium": {"category": "tag-manager", "html": ["tags.tiqcdn.com"]},
+    "Adobe Experience Platform Launch": {"category": "tag-manager", "html": ["assets.adobedtm.com"]},
+    "Segment": {"category": "tag-manager", "html": ["cdn.segment.com/analytics.js"]},
+    # CDNs (names match the cdn_providers list of earlier reports)
+    "Cloudflare": {"category": "cdn", "headers": {"cf-ray": None, "cf-cache-status": None, "server": "cloudflare"}},
+    "Amazon CloudFront": {"category": "cdn", "headers": {"x-amz-cf-id": None, "x-amz-cf-pop": None, "via": "cloudfront", "x-cache": "cloudfront"}},
+    "Fastly": {"category": "cdn", "headers": {"x-served-by": "cache-", "x-fastly-request-id": None}},
+    "Akamai": {"category": "cdn", "headers": {"x-akamai-transformed": None, "server": "akamaighost"}},
+    "StackPath": {"category": "cdn", "headers": {"x-sp-cache": None}},
+    "Edgecast": {"category": "cdn", "headers": {"x-ec-cache": None}},
+    "Google Frontend": {"category": "cdn", "headers": {"server": "google frontend"}},
+    "Vercel": {"category": "cdn", "headers": {"x-vercel-id": None, "server": "vercel"}},
+    "Netlify": {"category": "cdn", "headers": {"x-nf-request-id": None, "server": "netlify"}},
+    "Sucuri": {"category": "cdn", "headers": {"x-sucuri-id": None}},
+    "BunnyCDN": {"category": "cdn", "headers": {"server": "bunnycdn"}},
+}
+
+
+def _compile(signatures: dict) -> dict:
+    html, meta, cookie_prefixes = [], [], []
+    headers, cookies = defaultdict(list), {}
+    for name, signature in signatures.items():
+        html.extend((snippet, name) for snippet in signature.get("html", []))
+        meta.extend((snippet, name) for snippet in signature.get("meta", []))
+        for header, value in signature.get("headers", {}).items():
+            headers[header.lower()].append(((value or "").lower(), name))
+        for cookie in signature.get("cookies", []):
+            if cookie.endswith("*"):
+                # cookie names are scanned as "\0name\0name...", so a prefix is "\0" + prefix
+                cookie_prefixes.append(("\0" + cookie[:-1], name))
+            else:
+                cookies[cookie.lower()] = name
+    return {
+        "html": MultiPatternMatcher(html),
+        "meta": MultiPatternMatcher(meta),
+        "cookie_prefixes": MultiPatternMatcher(cookie_prefixes),
+        "headers": dict(headers),
+        "cookies": cookies,
+    }
+
+
+# compiled once at import: one automaton per text source and dict indexes for
+# headers and cookies, so the cost of a scan does not grow with the database
+_COMPILED = _compile(TECH_SIGNATURES)
+
+
+def _match_headers(headers: dict, found: dict, evidence: str):
+    for header, value in headers.items():
+        for expected, name in _COMPILED["headers"].get(header.lower(), ()):
+            if not expected or expected in str(value).lower():
+                found[name].add(evidence)
+
+
+def detect_technologies(html: str, headers: dict | None = None, resource_headers: list | None = None,
+                        cookies: list | None = None, meta_generator: str | None = None) -> dict:
+    """
+    Fingerprints the CMS, frameworks, analytics, tag managers, CDNs and server
+    software of a page. The document is scanned once by a single automaton;
+    headers, cookie names and the generator tag use indexed lookups.
+
+    Args:
+        html: The document (raw or rendered).
+        headers: The document's response headers.
+        resource_headers: Response headers of the page's resources, for CDNs
+            that only serve the static assets.
+        cookies: Cookie names set by the site.
+        meta_generator: The content of <meta name="generator">.
+
+    Returns:
+        A dictionary with the detected technologies (name, category, evidence)
+        and their names grouped by category.
+    """
+    found = defaultdict(set)
+    for name in _COMPILED["html"].matched_values(html or ""):
+        found[name].add("html")
+    _match_headers(headers or {}, found, "headers")
+    for resource in resource_headers or []:
+        _match_headers(resource, found, "resource headers")
+    cookie_names = [c.lower() for c in cookies or []]
+    for cookie in cookie_names:
+        if name := _COMPILED["cookies"].get(cookie):
+            found[name].add("cookies")
+    for name in _COMPILED["cookie_prefixes"].matched_values("".join("\0" + c for c in cookie_names)):
+        found[name].add("cookies")
+    for name in _COMPILED["meta"].matched_values(meta_generator or ""):
+        found[name].add("meta generator")
+
+    technologies = sorted(
+        ({"name": name, "category": TECH_SIGNATURES[name]["category"], "evidence": sorted(evidence)} for name, evidence in found.items()),
+        key=lambda t: (t["category"], t["name"]),
+    )
+    by_category = defaultdict(list)
+    for tech in technologies:
+        by_category[tech["category"]].append(tech["name"])
+    return {"technologies": technologies, "by_category": dict(by_category)}
@@ -0,0 +1,196 @@
+import re
+import gzip
+import asyncio
+import logging
+
+from utils.encode_pool import get_encode_pool
+
+# Optional: brotli sizes are only reported when the package is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+# static assets can be precompressed at the maximum level; HTML is usually compressed per request
+BROTLI_STATIC_QUALITY = 11
+BROTLI_DYNAMIC_QUALITY = 5
+# bodies above this are minified and compressed in the process pool
+INLINE_MAX_BYTES = 16 * 1024
+
+_CSS_COMMENT = re.compile(r"/\*[\s\S]*?\*/")
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_CSS_AFTER_COLON = re.compile(r":\s+")
+
+_JS_TOKEN = re.compile(r"""
+    (?P<str>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*[\s\S]*?\*/)
+  | (?P<ws>\s+)
+  | (?P<slash>/)
+  | (?P<code>[^"'`/\s]+)
+  | (?P<other>.)
+""", re.X | re.S)
+_JS_REGEX_LITERAL = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*")
+_JS_TRAILING_WORD = re.compile(r"[A-Za-z_$]+$")
+# after these a "/" starts a regular expression rather than a division
+_JS_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "void", "yield",
+                      "await", "delete", "instanceof", "new", "throw"}
+
+
+def _is_ident(char: str) -> bool:
+    return char.isalnum() or char in "_$" or ord(char) > 127
+
+
+def minify_css(css: str) -> str:
+    """Comment and whitespace removal, the bulk of what CSS minifiers save."""
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_SPACE.sub(" ", css)
+    css = _CSS_PUNCTUATION.sub(r"\1", css)
+    css = _CSS_AFTER_COLON.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js: str) -> str:
+    """
+    Conservative JS minification: strips comments and collapses whitespace,
+    keeping strings, template literals and regex literals intact. Line breaks
+    are kept where automatic semicolon insertion could depend on them. No
+    renaming, so the result is a lower bound of what a real minifier saves.
+    """
+    out = []
+    last = ""            # last emitted character
+    last_word = ""       # trailing identifier of the last code token
+    pending_ws = None    # whitespace waiting for the next token: None, " " or "\n"
+    pos, length = 0, len(js)
+
+    def emit(token: str):
+        nonlocal last, pending_ws
+        if pending_ws and last:
+            first = token[0]
+            if pending_ws == "\n" and last not in "{};,(" and first not in "});,.)":
+                out.append("\n")
+            elif (_is_ident(last) and _is_ident(first)) or (last == first and last in "+-"):
+                out.append(" ")
+        pending_ws = None
+        out.append(token)
+        last = token[-1]
+
+    while pos < length:
+        match = _JS_TOKEN.match(js, pos)
+        kind, token = match.lastgroup, match.group()
+        pos = match.end()
+        if kind in ("ws", "line_comment", "block_comment"):
+            if kind == "line_comment" or "\n" in token:
+                pending_ws = "\n"
+            elif pending_ws is None:
+                pending_ws = " "
+            continue
+        if kind == "slash":
+            regex_allowed = not last or last in "(,=:[!&|?{};+-*%<>~^" or last_word in _JS_REGEX_KEYWORDS
+            if regex_allowed and (literal := _JS_REGEX_LITERAL.match(js, pos - 1)):
+                token = literal.group()
+                pos = literal.end()
+            last_word = ""
+        elif kind == "code":
+            trailing = _JS_TRAILING_WORD.search(token)
+            last_word = trailing.group() if trailing else ""
+        else:
+            last_word = ""
+        emit(token)
+    return "".join(out)
+
+
+def compressed_sizes(data: bytes, brotli_quality: int = BROTLI_STATIC_QUALITY) -> dict:
+    return {
+        "gzip": len(gzip.compress(data, compresslevel=GZIP_LEVEL)),
+        "brotli": len(brotli.compress(data, quality=brotli_quality)) if brotli else None,
+    }
+
+
+def analyze_text(body: bytes, kind: str, served_encoding: str | None = None) -> dict:
+    """
+    Minifies one CSS/JS/HTML body and compresses it before and after
+    minification. Returns the sizes plus what is currently transferred and the
+    best achievable size. Runs inline or in a worker process.
+    """
+    served_encoding = (served_encoding or "").lower()
+    text = body.decode("utf-8", errors="replace")
+    if kind == "css":
+        minified = minify_css(text).encode("utf-8")
+    elif kind == "js":
+        minified = minify_js(text).encode("utf-8")
+    else:
+        minified = body  # HTML is only compressed; minifying it rarely pays off
+
+    quality = BROTLI_DYNAMIC_QUALITY if kind == "html" else BROTLI_STATIC_QUALITY
+    original = compressed_sizes(body, quality)
+    best_minified = compressed_sizes(minified, quality) if minified is not body else original
+
+    if "br" in served_encoding and original["brotli"] is not None:
+        current = original["brotli"]
+    elif "gzip" in served_encoding or "br" in served_encoding or "deflate" in served_encoding:
+        current = original["gzip"]
+    else:
+        current = len(body)
+    # tiny bodies can grow when compressed, so sending them as-is is also a candidate
+    best = min([len(minified)] + [size for size in best_minified.values() if size is not None])
+    best_original = min([len(body)] + [size for size in original.values() if size is not None])
+
+    return {
+        "kind": kind,
+        "original_bytes": len(body),
+        "minified_bytes": len(minified),
+        "served_encoding": served_encoding or None,
+        "compressed": original,
+        "compressed_minified": best_minified,
+        "current_transfer_bytes": current,
+        "best_transfer_bytes": best,
+        "minify_savings_bytes": len(body) - len(minified),
+        "compression_savings_bytes": max(0, current - best_original),
+        "potential_savings_bytes": max(0, current - best),
+    }
+
+
+async def estimate_text_savings(store, resources: list, html: bytes | None = None, html_encoding: str | None = None) -> dict:
+    """
+    Runs analyze_text() for the HTML document and every CSS/JS body in the
+    audit's resource store. Small bodies are handled inline; larger ones go
+    to the shared process pool. Resources are ranked by potential savings.
+    """
+    jobs = []
+    if html:
+        jobs.append(("document", "html", html, html_encoding))
+    for resource in resources:
+        kind = resource.get("type")
+        if kind not in ("css", "js") or (entry := store.get(resource["url"])) is None or entry.body is None:
+            continue
+        jobs.append((resource["url"], kind, entry.body, resource.get("content_encoding")))
+
+    loop = asyncio.get_running_loop()
+    pool = None
+
+    async def run(url, kind, body, encoding):
+        nonlocal pool
+        try:
+            if len(body) <= INLINE_MAX_BYTES:
+                result = analyze_text(body, kind, encoding)
+            else:
+                pool = pool or get_encode_pool()
+                result = await loop.run_in_executor(pool, analyze_text, body, kind, encoding)
+        except Exception as e:
+            logging.warning(f"Could not estimate text savings for {url}: {e}")
+            return None
+        result["url"] = url
+        return result
+
+    analyzed = [r for r in await asyncio.gather(*(run(*job) for job in jobs)) if r]
+    html_result = next((r for r in analyzed if r["url"] == "document"), None)
+    ranked = sorted((r for r in analyzed if r["url"] != "document"), key=lambda r: r["potential_savings_bytes"], reverse=True)
+    return {
+        "html": html_result,
+        "resources": ranked,
+        "total_potential_savings_bytes": sum(r["potential_savings_bytes"] for r in analyzed),
+        "brotli_available": brotli is not None,
+    }
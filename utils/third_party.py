@@ -0,0 +1,154 @@
+from functools import lru_cache
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from utils.domains import registrable_domain
+
+# bundled entity map: who owns the domains a page commonly loads from
+THIRD_PARTY_ENTITIES = {
+    "Google Analytics": {"category": "analytics", "domains": ["google-analytics.com", "analytics.google.com", "ssl.google-analytics.com"]},
+    "Google Tag Manager": {"category": "tag-manager", "domains": ["googletagmanager.com", "tagmanager.google.com"]},
+    "Google Ads": {"category": "ad", "domains": ["googleadservices.com", "googlesyndication.com", "doubleclick.net", "adservice.google.com", "googletagservices.com", "2mdn.net"]},
+    "Google Fonts": {"category": "font", "domains": ["fonts.googleapis.com", "fonts.gstatic.com"]},
+    "Google APIs": {"category": "cdn", "domains": ["ajax.googleapis.com", "www.gstatic.com", "apis.google.com", "www.google.com", "maps.googleapis.com", "recaptcha.net"]},
+    "YouTube": {"category": "video", "domains": ["youtube.com", "ytimg.com", "youtube-nocookie.com", "googlevideo.com"]},
+    "Facebook": {"category": "social", "domains": ["facebook.com", "facebook.net", "fbcdn.net"]},
+    "Twitter": {"category": "social", "domains": ["twitter.com", "twimg.com", "x.com", "t.co", "ads-twitter.com"]},
+    "LinkedIn": {"category": "social", "domains": ["linkedin.com", "licdn.com", "ads.linkedin.com"]},
+    "Pinterest": {"category": "social", "domains": ["pinterest.com", "pinimg.com"]},
+    "TikTok": {"category": "ad", "domains": ["tiktok.com", "analytics.tiktok.com", "tiktokcdn.com"]},
+    "Microsoft Advertising": {"category": "ad", "domains": ["bat.bing.com", "bing.com", "clarity.ms"]},
+    "Amazon Ads": {"category": "ad", "domains": ["amazon-adsystem.com"]},
+    "Criteo": {"category": "ad", "domains": ["criteo.com", "criteo.net"]},
+    "Taboola": {"category": "ad", "domains": ["taboola.com"]},
+    "Outbrain": {"category": "ad", "domains": ["outbrain.com", "outbrainimg.com"]},
+    "AppNexus": {"category": "ad", "domains": ["adnxs.com"]},
+    "Rubicon Project": {"category": "ad", "domains": ["rubiconproject.com"]},
+    "PubMatic": {"category": "ad", "domains": ["pubmatic.com"]},
+    "Adobe Analytics": {"category": "analytics", "domains": ["omtrdc.net", "2o7.net", "demdex.net", "adobedtm.com", "assets.adobedtm.com"]},
+    "Hotjar": {"category": "analytics", "domains": ["hotjar.com", "hotjar.io"]},
+    "Segment": {"category": "analytics", "domains": ["segment.com", "segment.io", "cdn.segment.com"]},
+    "Mixpanel": {"category": "analytics", "domains": ["mixpanel.com", "mxpnl.com"]},
+    "Amplitude": {"category": "analytics", "domains": ["amplitude.com"]},
+    "Heap": {"category": "analytics", "domains": ["heapanalytics.com", "heap.io"]},
+    "FullStory": {"category": "analytics", "domains": ["fullstory.com"]},
+    "New Relic": {"category": "analytics", "domains": ["newrelic.com", "nr-data.net"]},
+    "Yandex Metrica": {"category": "analytics", "domains": ["mc.yandex.ru", "yandex.ru"]},
+    "Matomo Cloud": {"category": "analytics", "domains": ["matomo.cloud"]},
+    "Plausible": {"category": "analytics", "domains": ["plausible.io"]},
+    "Tealium": {"category": "tag-manager", "domains": ["tealiumiq.com", "tiqcdn.com"]},
+    "Ensighten": {"category": "tag-manager", "domains": ["ensighten.com"]},
+    "Adobe Fonts": {"category": "font", "domains": ["typekit.net", "use.typekit.net"]},
+    "Font Awesome": {"category": "font", "domains": ["fontawesome.com", "kit.fontawesome.com"]},
+    "Cloudflare": {"category": "cdn", "domains": ["cloudflare.com", "cdnjs.cloudflare.com", "cloudflareinsights.com"]},
+    "jsDelivr": {"category": "cdn", "domains": ["jsdelivr.net"]},
+    "unpkg": {"category": "cdn", "domains": ["unpkg.com"]},
+    "jQuery CDN": {"category": "cdn", "domains": ["code.jquery.com"]},
+    "Amazon CloudFront": {"category": "cdn", "domains": ["cloudfront.net"]},
+    "Akamai": {"category": "cdn", "domains": ["akamaihd.net", "akamaized.net", "akamai.net"]},
+    "Fastly": {"category": "cdn", "domains": ["fastly.net", "fastly.com"]},
+    "Shopify": {"category": "hosting", "domains": ["shopify.com", "shopifycdn.com", "myshopify.com"]},
+    "WordPress.com": {"category": "hosting", "domains": ["wp.com", "wordpress.com", "gravatar.com"]},
+    "Wix": {"category": "hosting", "domains": ["wix.com", "wixstatic.com", "parastorage.com"]},
+    "Squarespace": {"category": "hosting", "domains": ["squarespace.com", "squarespace-cdn.com"]},
+    "HubSpot": {"category": "marketing", "domains": ["hubspot.com", "hs-scripts.com", "hs-analytics.net", "hsforms.net", "hubspot.net", "hs-banner.com"]},
+    "Intercom": {"category": "customer-success", "domains": ["intercom.io", "intercomcdn.com"]},
+    "Zendesk": {"category": "customer-success", "domains": ["zendesk.com", "zdassets.com"]},
+    "Drift": {"category": "customer-success", "domains": ["drift.com", "driftt.com"]},
+    "OneTrust": {"category": "consent", "domains": ["onetrust.com", "cookielaw.org"]},
+    "Cookiebot": {"category": "consent", "domains": ["cookiebot.com"]},
+    "Stripe": {"category": "payment", "domains": ["stripe.com", "stripe.network"]},
+    "PayPal": {"category": "payment", "domains": ["paypal.com", "paypalobjects.com"]},
+    "Vimeo": {"category": "video", "domains": ["vimeo.com", "vimeocdn.com"]},
+    "Sentry": {"category": "utility", "domains": ["sentry.io", "sentry-cdn.com"]},
+}
+
+def _build_domain_index(entities: dict) -> dict:
+    index = {}
+    for name, info in entities.items():
+        for domain in info["domains"]:
+            index[domain.lower()] = (name, info["category"])
+    return index
+
+
+# domain -> (entity, category); a lookup walks the host's suffixes, so its cost
+# depends on the number of labels, not on the size of the entity map
+_DOMAIN_INDEX = _build_domain_index(THIRD_PARTY_ENTITIES)
+
+
+@lru_cache(maxsize=16384)
+def entity_for_host(host: str) -> tuple | None:
+    """(entity, category) for a host name, matching the longest known domain suffix."""
+    labels = (host or "").lower().rstrip(".").split(".")
+    for i in range(len(labels) - 1):
+        if (match := _DOMAIN_INDEX.get(".".join(labels[i:]))) is not None:
+            return match
+    return None
+
+
+def third_party_breakdown(document_url: str, resources: list, network_requests: list | None = None,
+                          script_main_thread_ms: dict | None = None) -> dict:
+    """
+    Attributes every request to its origin and owning entity and aggregates
+    requests, transfer bytes and (when rendered) main-thread time per entity.
+
+    The browser's network log is used when available, since it includes
+    requests made by scripts; otherwise the statically discovered resources
+    and their Content-Length are used. A domain owned by the same entity as
+    the page itself counts as first party.
+    """
+    document_host = urlparse(document_url).hostname or ""
+    first_party_domain = registrable_domain(document_host)
+    first_party_entity = (entity_for_host(document_host) or (None,))[0]
+    script_main_thread_ms = script_main_thread_ms or {}
+
+    if network_requests:
+        entries = [(r["url"], r.get("encoded_bytes") or 0) for r in network_requests if r.get("url")]
+        source = "network"
+    else:
+        entries = [(r["url"], r.get("content_length") or 0) for r in resources if r.get("url")]
+        source = "resources"
+
+    # scripts that ran without a logged request (e.g. served from cache) still count
+    requested = {url for url, _ in entries}
+    entries += [(url, None) for url in script_main_thread_ms if url not in requested]
+
+    groups = defaultdict(lambda: {"requests": 0, "transfer_bytes": 0, "main_thread_ms": 0.0, "origins": set()})
+    timed = set()
+    for url, size in entries:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            continue
+        host = parsed.hostname
+        entity, category = entity_for_host(host) or (registrable_domain(host), "other")
+        first_party = registrable_domain(host) == first_party_domain or (first_party_entity is not None and entity == first_party_entity)
+        group = groups[("first party", "first-party") if first_party else (entity, category)]
+        if size is not None:
+            group["requests"] += 1
+            group["transfer_bytes"] += size
+        if url not in timed:
+            timed.add(url)
+            group["main_thread_ms"] += script_main_thread_ms.get(url, 0.0)
+        group["origins"].add(f"{parsed.scheme}://{parsed.netloc}")
+
+    summaries = []
+    for (entity, category), group in groups.items():
+        summaries.append({
+            "entity": entity, "category": category,
+            "requests": group["requests"], "transfer_bytes": group["transfer_bytes"],
+            "main_thread_ms": round(group["main_thread_ms"], 1) if script_main_thread_ms else None,
+            "origins": sorted(group["origins"]),
+        })
+    first_party = next((s for s in summaries if s["category"] == "first-party"), None)
+    third_parties = sorted((s for s in summaries if s["category"] != "first-party"),
+                           key=lambda s: (s["main_thread_ms"] or 0, s["transfer_bytes"]), reverse=True)
+
+    return {
+        "source": source,
+        "first_party_domain": first_party_domain,
+        "first_party": first_party,
+        "entities": third_parties,
+        "third_party_requests": sum(s["requests"] for s in third_parties),
+        "third_party_transfer_bytes": sum(s["transfer_bytes"] for s in third_parties),
+        "third_party_main_thread_ms": round(sum(s["main_thread_ms"] or 0 for s in third_parties), 1) if script_main_thread_ms else None,
+    }
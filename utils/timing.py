@@ -0,0 +1,149 @@
+import math
+import time
+import socket
+import asyncio
+import logging
+import statistics
+from urllib.parse import urlparse
+
+import httpcore
+
+# each sample refetches the document from the audited origin, so extra samples are opt-in
+DEFAULT_TIMING_SAMPLES = 1
+MAX_TIMING_SAMPLES = 10
+
+
+class _TimedBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that resolves DNS itself so its duration can be reported separately from TCP connect."""
+
+    def __init__(self, marks: dict):
+        self._inner = httpcore.AnyIOBackend()
+        self.marks = marks
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        started = time.perf_counter()
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        self.marks["dns"] = time.perf_counter() - started
+        # every resolved address is tried in order, like a normal connect
+        last_error = None
+        for address in dict.fromkeys(info[4][0] for info in infos):
+            try:
+                # TLS still uses the original hostname for SNI and verification
+                return await self._inner.connect_tcp(address, port, timeout=timeout, local_address=local_address,
+                                                     socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        raise last_error or httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._inner.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds):
+        await self._inner.sleep(seconds)
+
+
+def _percentile(values: list, pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # nearest-rank percentile
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _summary(values: list) -> dict:
+    return {
+        "median": round(statistics.median(values), 4) if values else None,
+        "p90": round(_percentile(values, 90), 4) if values else None,
+        "samples": len(values),
+    }
+
+
+async def _timed_get(pool: httpcore.AsyncConnectionPool, url: str, headers: dict, timeout: float, marks: dict) -> dict:
+    events = {}
+
+    async def trace(event_name, info):
+        events[event_name] = time.perf_counter()
+
+    marks.pop("dns", None)
+    started = time.perf_counter()
+    extensions = {"trace": trace, "timeout": {"connect": timeout, "read": timeout, "write": timeout, "pool": timeout}}
+    async with pool.stream("GET", url, headers=list(headers.items()), extensions=extensions) as response:
+        body_bytes = 0
+        async for chunk in response.aiter_stream():
+            body_bytes += len(chunk)
+        status = response.status
+        http_version = response.extensions.get("http_version", b"").decode() or None
+    finished = time.perf_counter()
+
+    def span(prefix_start, prefix_end=None):
+        start = events.get(f"{prefix_start}.started")
+        end = events.get(f"{prefix_end or prefix_start}.complete")
+        return (end - start) if start is not None and end is not None else 0.0
+
+    dns = marks.get("dns", 0.0)
+    connect = max(0.0, span("connection.connect_tcp") - dns)
+    tls = span("connection.start_tls")
+
+    # http/1.1 and http/2 emit differently named events for the same phases
+    proto = "http2" if any(name.startswith("http2.") for name in events) else "http11"
+    request_sent = events.get(f"{proto}.send_request_headers.started")
+    headers_received = events.get(f"{proto}.receive_response_headers.complete")
+    ttfb = (headers_received - request_sent) if request_sent and headers_received else None
+    download = (finished - headers_received) if headers_received else None
+
+    return {
+        "status": status,
+        "http_version": http_version,
+        "reused_connection": "connection.connect_tcp.started" not in events,
+        "dns": dns,
+        "connect": connect,
+        "tls": tls,
+        "ttfb": ttfb,
+        "download": download,
+        "total": finished - started,
+        "transfer_bytes": body_bytes,
+    }
+
+
+async def measure_document_timing(url: str, samples: int = DEFAULT_TIMING_SAMPLES, headers: dict | None = None,
+                                  timeout: float = 15) -> dict | None:
+    """
+    Fetches `url` `samples` times over one reused connection and breaks each
+    fetch down into DNS, TCP connect, TLS, time to first byte (request sent ->
+    response headers) and content download.
+
+    The first sample is the cold visit and is the only one that pays DNS,
+    connect and TLS; TTFB and download are summarised (median/p90) across all
+    samples so a slow origin can be told apart from a slow network.
+    Redirects are not followed, so pass the final document URL.
+    """
+    samples = max(1, min(int(samples or 1), MAX_TIMING_SAMPLES))
+    marks = {}
+    parsed = urlparse(url)
+    request_headers = {"Host": parsed.netloc, "Accept-Encoding": "gzip, deflate, br"}
+    request_headers.update(headers or {})
+
+    runs = []
+    try:
+        async with httpcore.AsyncConnectionPool(max_connections=1, network_backend=_TimedBackend(marks)) as pool:
+            for _ in range(samples):
+                runs.append(await _timed_get(pool, url, request_headers, timeout, marks))
+    except Exception as e:
+        logging.warning(f"Timing measurement failed for {url}: {e}")
+        if not runs:
+            return None
+
+    cold = runs[0]
+    ttfbs = [r["ttfb"] for r in runs if r["ttfb"] is not None]
+    downloads = [r["download"] for r in runs if r["download"] is not None]
+    return {
+        "url": url,
+        "samples": len(runs),
+        "http_version": cold["http_version"],
+        "transfer_bytes": cold["transfer_bytes"],
+        "cold": {k: round(cold[k], 4) if isinstance(cold[k], float) else cold[k]
+                 for k in ("dns", "connect", "tls", "ttfb", "download", "total")},
+        "ttfb": _summary(ttfbs),
+        "download": _summary(downloads),
+    }
@@ -0,0 +1,100 @@
+import ssl
+import time
+import asyncio
+import logging
+import threading
+
+# Optional: decode the intermediate certificates of the chain
+try:
+    from cryptography import x509
+except ImportError:
+    x509 = None
+
+TLS_CACHE_TTL = 3600
+ALPN_PROTOCOLS = ["h2", "http/1.1"]
+
+_tls_cache = {}
+_tls_cache_lock = threading.Lock()
+
+
+def _describe_der_cert(der: bytes) -> dict:
+    if x509 is None:
+        return {}
+    try:
+        cert = x509.load_der_x509_certificate(der)
+        return {
+            "subject": cert.subject.rfc4514_string(),
+            "issuer": cert.issuer.rfc4514_string(),
+            "not_after": cert.not_valid_after_utc.isoformat() if hasattr(cert, "not_valid_after_utc") else cert.not_valid_after.isoformat(),
+        }
+    except Exception:
+        return {}
+
+
+def _certificate_chain(ssl_object: ssl.SSLObject) -> list:
+    # get_verified_chain() only exists on Python 3.13+
+    get_chain = getattr(ssl_object, "get_verified_chain", None)
+    if get_chain is None:
+        return []
+    try:
+        chain = get_chain()
+    except Exception:
+        return []
+    # the chain comes back as DER bytes, leaf first
+    return [_describe_der_cert(der) for der in chain]
+
+
+async def probe_tls(hostname: str, port: int = 443, timeout: float = 5, use_cache: bool = True) -> dict | None:
+    """
+    Opens one TLS connection to the host and reads everything the audit needs
+    from the handshake: the certificate (and chain when available), its expiry,
+    the ALPN-negotiated protocol and the TLS version. Results are cached per
+    host:port for TLS_CACHE_TTL seconds. Returns None if the handshake fails.
+    """
+    key = f"{hostname}:{port}"
+    if use_cache:
+        with _tls_cache_lock:
+            entry = _tls_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+    ctx = ssl.create_default_context()
+    ctx.set_alpn_protocols(ALPN_PROTOCOLS)
+    writer = None
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(hostname, port, ssl=ctx, server_hostname=hostname),
+            timeout=timeout,
+        )
+        ssl_object = writer.get_extra_info("ssl_object")
+        cert = ssl_object.getpeercert()
+        alpn = ssl_object.selected_alpn_protocol()
+        expires = ssl.cert_time_to_seconds(cert.get("notAfter"))
+        cipher = ssl_object.cipher()
+        info = {
+            "days_to_expiry": int((expires - time.time()) // 86400),
+            "not_after": cert.get("notAfter"),
+            "issuer": cert.get("issuer", ()),
+            "subjectAltName": cert.get("subjectAltName", ()),
+            "alpn_protocol": alpn,
+            "http2_supported": alpn == "h2",
+            "tls_version": ssl_object.version(),
+            "cipher": cipher[0] if cipher else None,
+            "chain": _certificate_chain(ssl_object),
+        }
+    except Exception as e:
+        logging.warning(f"TLS probe failed for {key}: {e}")
+        info = None
+    finally:
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    # failed handshakes are cached briefly so a crawl does not retry them per page
+    ttl = TLS_CACHE_TTL if info else 60
+    with _tls_cache_lock:
+        _tls_cache[key] = (time.monotonic() + ttl, info)
+    return info